@@ -1,17 +1,30 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.database.connection import get_db
+from app.database.connection import SessionLocal
 from app.models import Admin, Company
-from app.auth.security import verify_token
+from app.auth.security import verify_token, EVENT_STREAM_PURPOSE
+from app.auth.principal_cache import principal_cache, snapshot_principal
 
 security = HTTPBearer()
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    """Get current authenticated user (admin or company)"""
-    token = credentials.credentials
-    payload = verify_token(token)
-    
+def _load_principal(user_type: str, user_id: int):
+    """Load a principal snapshot from the database, or None if the user does not exist"""
+    model = Admin if user_type == "admin" else Company
+    db = SessionLocal()
+    try:
+        db_user = db.query(model).filter(model.id == user_id).first()
+        return snapshot_principal(db_user) if db_user else None
+    finally:
+        db.close()
+
+async def resolve_principal(payload: dict) -> dict:
+    """
+    Resolve a verified token payload to {"user": ..., "user_type": ...}.
+
+    Declared async so that cache hits are resolved on the event loop without a
+    threadpool hop; only cache misses touch the database (in the threadpool).
+    """
     user_type = payload.get("user_type")
     user_id = payload.get("sub")
     
@@ -30,30 +43,60 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
             detail="Invalid user ID in token"
         )
     
-    if user_type == "admin":
-        user = db.query(Admin).filter(Admin.id == user_id).first()
-    elif user_type == "company":
-        user = db.query(Company).filter(Company.id == user_id).first()
-        if user and not user.is_approved:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Company account not approved"
-            )
-    else:
+    if user_type not in ("admin", "company"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid user type"
         )
     
-    if not user:
+    # Most requests (e.g. dashboard polls) are served from the principal cache
+    user = principal_cache.get(user_type, user_id)
+    if user is None:
+        user = await run_in_threadpool(_load_principal, user_type, user_id)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+        principal_cache.set(user_type, user_id, user)
+    
+    if user_type == "company" and not user.is_approved:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
+            detail="Company account not approved"
         )
     
     return {"user": user, "user_type": user_type}
 
-def get_admin_user(current_user: dict = Depends(get_current_user)):
+async def authenticate_token(token: str) -> dict:
+    """Resolve an admin or company access token; single-purpose tokens are refused"""
+    payload = verify_token(token)
+    if payload.get("purpose") is not None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token type"
+        )
+    return await resolve_principal(payload)
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Get current authenticated user (admin or company)"""
+    return await authenticate_token(credentials.credentials)
+
+async def get_event_stream_user(stream_token: str = Query(...)):
+    """
+    Authenticate an EventSource stream. Browsers cannot set headers on
+    EventSource, so the stream_token query parameter carries a short-lived
+    token from POST /api/auth/stream-token; access tokens are not accepted.
+    """
+    payload = verify_token(stream_token)
+    if payload.get("purpose") != EVENT_STREAM_PURPOSE:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token type"
+        )
+    return await resolve_principal(payload)
+
+async def get_admin_user(current_user: dict = Depends(get_current_user)):
     """Ensure current user is admin"""
     if current_user["user_type"] != "admin":
         raise HTTPException(
@@ -62,7 +105,7 @@ def get_admin_user(current_user: dict = Depends(get_current_user)):
         )
     return current_user["user"]
 
-def get_company_user(current_user: dict = Depends(get_current_user)):
+async def get_company_user(current_user: dict = Depends(get_current_user)):
     """Ensure current user is company"""
     if current_user["user_type"] != "company":
         raise HTTPException(
@@ -71,7 +114,7 @@ def get_company_user(current_user: dict = Depends(get_current_user)):
         )
     return current_user["user"]
 
-def get_company_or_admin_user(current_user: dict = Depends(get_current_user)):
+async def get_company_or_admin_user(current_user: dict = Depends(get_current_user)):
     """Allow both admin and company access - admin can access any company data"""
     if current_user["user_type"] not in ["admin", "company"]:
         raise HTTPException(
@@ -79,3 +122,22 @@ def get_company_or_admin_user(current_user: dict = Depends(get_current_user)):
             detail="Admin or Company access required"
         )
     return current_user
+
+async def get_current_student(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """
+    Resolve a student exam-session token to {"student_id": ..., "drive_id": ...}.
+    Student tokens are only accepted here, never by the admin/company dependencies.
+    """
+    payload = verify_token(credentials.credentials)
+    if payload.get("user_type") != "student":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Student access required"
+        )
+    try:
+        return {"student_id": int(payload["sub"]), "drive_id": int(payload["drive_id"])}
+    except (KeyError, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token payload"
+        )
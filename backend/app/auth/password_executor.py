@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from app.auth.security import verify_password, get_password_hash
+from app.database.config import settings
+from app.utils.request_metrics import percentiles_ms
+
+# Number of recent queue waits kept for percentile metrics
+WAIT_SAMPLE_SIZE = 1000
+
+
+class PasswordExecutor:
+    """
+    Dedicated, size-bounded executor for password hashing.
+
+    PBKDF2 is CPU bound but hashlib releases the GIL while it runs, so a separate
+    thread pool gives real parallelism. Callers (async routes) await the hash
+    without holding a thread of FastAPI's request threadpool, so a login storm
+    cannot starve other sync routes. At most max_pending hashes may be running
+    or queued; beyond that callers get 503 with Retry-After instead of piling up.
+    """
+
+    def __init__(self, workers: int, max_pending: int, retry_after_seconds: int = 1):
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self.retry_after_seconds = retry_after_seconds
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _record_wait(self, wait: float):
+        with self._lock:
+            self._waits.append(wait)
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+    def _finished(self, future):
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+        self._slots.release()
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on the hashing pool and await it, or raise 503 when the pool is saturated"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many login requests in progress. Please retry shortly.",
+                headers={"Retry-After": str(self.retry_after_seconds)}
+            )
+
+        submitted = time.perf_counter()
+
+        def task():
+            self._record_wait(time.perf_counter() - submitted)
+            return fn(*args)
+
+        with self._lock:
+            self._pending += 1
+        future = self._executor.submit(task)
+        # The slot is held until the hash finishes, even if the request is cancelled first
+        future.add_done_callback(self._finished)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        """Queue depth, rejections and queue wait time percentiles (milliseconds)"""
+        with self._lock:
+            waits = sorted(self._waits)
+            completed = self._completed
+
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": completed,
+                "rejected": self._rejected,
+                "queue_wait_ms": {
+                    "avg": round(self._wait_total / completed * 1000, 3) if completed else None,
+                    **percentiles_ms(waits),
+                    "max": round(self._wait_max * 1000, 3)
+                }
+            }
+
+
+password_executor = PasswordExecutor(settings.password_hash_workers, settings.password_hash_max_pending)
+
+
+async def verify_password_bounded(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the bounded hashing pool"""
+    return await password_executor.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_bounded(password: str) -> str:
+    """get_password_hash on the bounded hashing pool"""
+    return await password_executor.run(get_password_hash, password)
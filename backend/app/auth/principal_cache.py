@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Optional, Tuple
+from sqlalchemy import inspect
+from app.database.config import settings
+
+
+def snapshot_principal(user) -> SimpleNamespace:
+    """Copy an Admin/Company row's column values into a plain, session-independent object"""
+    return SimpleNamespace(**{
+        attr.key: getattr(user, attr.key)
+        for attr in inspect(user).mapper.column_attrs
+    })
+
+
+class PrincipalCache:
+    """
+    In-process TTL + LRU cache of authenticated principals keyed by (user_type, user_id).
+
+    Entries must be invalidated explicitly when a principal's access changes
+    (e.g. company approval); the TTL bounds staleness across worker processes,
+    which each keep their own cache.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, SimpleNamespace]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def get(self, user_type: str, user_id: int) -> Optional[SimpleNamespace]:
+        if not self.enabled:
+            return None
+        key = (user_type, user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def set(self, user_type: str, user_id: int, principal: SimpleNamespace):
+        if not self.enabled:
+            return
+        key = (user_type, user_id)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, principal)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_type: str, user_id: int):
+        with self._lock:
+            self._entries.pop((user_type, user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(settings.principal_cache_ttl_seconds, settings.principal_cache_max_size)
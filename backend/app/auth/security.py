@@ -43,6 +43,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
+# "purpose" claim of tokens that only open a drive event stream
+EVENT_STREAM_PURPOSE = "events"
+
+def create_event_stream_token(user_type: str, user_id: int) -> str:
+    """
+    Short-lived token accepted only by the drive event streams. EventSource
+    puts it in the URL, where it can end up in logs, so it must not double
+    as an access token.
+    """
+    return create_access_token(
+        data={"sub": str(user_id), "user_type": user_type, "purpose": EVENT_STREAM_PURPOSE},
+        expires_delta=timedelta(seconds=settings.event_stream_token_seconds)
+    )
+
 def verify_token(token: str):
     """Verify JWT token and return payload"""
     try:
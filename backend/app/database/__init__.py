@@ -1,13 +1,33 @@
+from sqlalchemy import inspect
 from app.database.connection import Base, engine, SessionLocal
+from app.database.migrations import BASELINE_REVISION, current_revision, head_revision, stamp
 from app.models import Admin, Company, Drive, Question, College, StudentGroup, Student
 import logging
 
 logger = logging.getLogger(__name__)
 
 def create_tables():
-    """Create all database tables"""
-    Base.metadata.create_all(bind=engine)
-    
+    """
+    Create all database tables on a new database and stamp it at the latest
+    migration. Existing databases are changed only by migrations
+    (`alembic upgrade head` from the backend directory), never at startup.
+    """
+    with engine.begin() as connection:
+        revision = current_revision(connection)
+        if revision is None:
+            # Made by create_all before migrations existed: add any missing
+            # tables, then let the migrations bring the rest up to date
+            had_tables = inspect(connection).has_table(Drive.__tablename__)
+            Base.metadata.create_all(bind=connection)
+            revision = BASELINE_REVISION if had_tables else head_revision()
+            stamp(connection, revision)
+
+    if revision != head_revision():
+        logger.warning(
+            f"⚠️ Database schema is at revision {revision}, latest is {head_revision()}; "
+            "run `alembic upgrade head` from the backend directory"
+        )
+
     # Seed initial data after creating tables
     seed_initial_data()
 
@@ -1,9 +1,13 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 import logging
 from app.database.config import settings
+from app.database.pool_metrics import PoolMetrics, instrumented_pool_class, listen_pool_events
+from app.database.query_metrics import listen_query_events
 
 logger = logging.getLogger(__name__)
 
@@ -21,14 +25,26 @@ def get_database_url():
     
     return db_url
 
+def get_async_database_url():
+    """Database URL for the async engine (psycopg3 serves both sync and async)"""
+    db_url = get_database_url()
+    if db_url.startswith("sqlite://"):
+        db_url = db_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return db_url
+
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
+
 # Create engine with proper connection pooling and error handling
 try:
     engine = create_engine(
         get_database_url(),
+        poolclass=instrumented_pool_class(QueuePool, sync_pool_metrics),
         pool_pre_ping=True,  # Validate connections before use
-        pool_recycle=3600,   # Recycle connections every hour
-        pool_size=5,         # Connection pool size
-        max_overflow=10,     # Additional connections allowed
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
         echo=False  # Disable SQL query logging
     )
 except Exception as e:
@@ -36,7 +52,26 @@ except Exception as e:
     logger.error(f"Database URL format: {get_database_url().split('@')[0]}@...")  # Log URL without password
     raise
 
+# Async engine for high-concurrency read paths; connects lazily on first use
+# (it has its own pool, sized by the same settings)
+async_engine = create_async_engine(
+    get_async_database_url(),
+    poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, async_pool_metrics),
+    pool_pre_ping=True,
+    pool_recycle=settings.db_pool_recycle_seconds,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout_seconds,
+    echo=False
+)
+
+listen_pool_events(engine, sync_pool_metrics)
+listen_pool_events(async_engine.sync_engine, async_pool_metrics)
+listen_query_events(engine)
+listen_query_events(async_engine.sync_engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 def get_db():
@@ -52,3 +87,19 @@ def get_db():
         raise
     finally:
         db.close()
+
+async def get_async_db():
+    """Async database dependency for routes declared with async def"""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+
+def get_pool_stats():
+    """Live metrics for the sync and async connection pools"""
+    return {
+        "sync": sync_pool_metrics.stats(engine.pool),
+        "async": async_pool_metrics.stats(async_engine.sync_engine.pool)
+    }
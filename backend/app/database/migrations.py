@@ -0,0 +1,37 @@
+from pathlib import Path
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.engine import Connection
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+# Schema of databases created by create_all before the migration history existed
+BASELINE_REVISION = "0001"
+
+
+def alembic_config(connection: Optional[Connection] = None) -> Config:
+    """Config for backend/alembic.ini that works from any directory; pass a connection to run on it"""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(connection: Connection) -> Optional[str]:
+    """Revision the database is stamped at; None if it has never been stamped"""
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def stamp(connection: Connection, revision: str):
+    command.stamp(alembic_config(connection), revision)
+
+
+def upgrade(connection: Connection, revision: str = "head"):
+    command.upgrade(alembic_config(connection), revision)
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import deque
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+from app.utils.request_metrics import percentiles_ms
+
+# Number of recent checkout waits kept for percentile metrics
+WAIT_SAMPLE_SIZE = 1000
+
+
+class PoolMetrics:
+    """Thread-safe counters and checkout wait samples for one connection pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self._checkouts = 0
+        self._timeouts = 0
+        self._connects = 0
+        self._invalidations = 0
+        self._peak_in_use = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def record_checkout(self, wait: float, in_use: int):
+        with self._lock:
+            self._checkouts += 1
+            self._waits.append(wait)
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._peak_in_use = max(self._peak_in_use, in_use)
+
+    def record_timeout(self, wait: float):
+        with self._lock:
+            self._timeouts += 1
+            self._wait_max = max(self._wait_max, wait)
+
+    def record_connect(self):
+        with self._lock:
+            self._connects += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self._invalidations += 1
+
+    def stats(self, pool) -> dict:
+        """Live pool occupancy plus checkout counters and wait time percentiles (milliseconds)"""
+        with self._lock:
+            waits = sorted(self._waits)
+            checkouts = self._checkouts
+
+            return {
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "timeout_seconds": pool.timeout(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+                "peak_in_use": self._peak_in_use,
+                "checkouts": checkouts,
+                "timeouts": self._timeouts,
+                "connects": self._connects,
+                "invalidations": self._invalidations,
+                "checkout_wait_ms": {
+                    "avg": round(self._wait_total / checkouts * 1000, 3) if checkouts else None,
+                    **percentiles_ms(waits),
+                    "max": round(self._wait_max * 1000, 3)
+                }
+            }
+
+
+def instrumented_pool_class(base: type, metrics: PoolMetrics) -> type:
+    """
+    Subclass a QueuePool variant so every checkout is timed.
+
+    SQLAlchemy's pool events fire only once a connection has been handed out, so
+    the time spent waiting for a free slot (and pool timeouts) is measured around
+    _do_get instead. The metrics live on the class so they survive the pool being
+    recreated by engine.dispose().
+    """
+    if not issubclass(base, QueuePool):
+        raise TypeError(f"{base.__name__} is not a QueuePool")
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = base._do_get(self)
+        except exc.TimeoutError:
+            metrics.record_timeout(time.perf_counter() - started)
+            raise
+        metrics.record_checkout(time.perf_counter() - started, self.checkedout())
+        return connection
+
+    return type(f"Instrumented{base.__name__}", (base,), {"_do_get": _do_get, "metrics": metrics})
+
+
+def listen_pool_events(engine, metrics: PoolMetrics):
+    """Count new DBAPI connections and invalidations (pass async_engine.sync_engine for async engines)"""
+    event.listen(engine, "connect", lambda dbapi_connection, record: metrics.record_connect())
+    event.listen(engine, "invalidate", lambda dbapi_connection, record, error: metrics.record_invalidation())
@@ -0,0 +1,116 @@
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+from app.database.config import settings
+from app.database.query_metrics import LOGGED_STATEMENT_CHARS, QueryStats, current_query_stats
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def repeated_statements(stats: QueryStats, max_repeats: int) -> List[Tuple[str, int]]:
+    """Statement shapes executed more than max_repeats times, most frequent first"""
+    if not stats.fingerprints:
+        return []
+    return [(shape, count) for shape, count in stats.fingerprints.most_common() if count > max_repeats]
+
+
+class QueryBudget:
+    """
+    Statement limits checked for every request that finishes inside a
+    query_auditor.budget() block, and for statements run directly in the block.
+    """
+
+    def __init__(self, max_statements: Optional[int], max_repeats: Optional[int]):
+        self.max_statements = max_statements
+        self.max_repeats = max_repeats
+        self.direct = QueryStats(track_fingerprints=True)
+        self.requests: List[Tuple[str, QueryStats]] = []
+        self._lock = threading.Lock()
+
+    def add(self, label: str, stats: QueryStats):
+        with self._lock:
+            self.requests.append((label, stats))
+
+    def violations(self) -> List[str]:
+        with self._lock:
+            measured = list(self.requests)
+        if self.direct.statements:
+            measured.append(("statements outside requests", self.direct))
+
+        problems = []
+        for label, stats in measured:
+            if self.max_statements is not None and stats.statements > self.max_statements:
+                problems.append(f"{label}: {stats.statements} statements (budget {self.max_statements})")
+            if self.max_repeats is not None:
+                for shape, count in repeated_statements(stats, self.max_repeats):
+                    problems.append(
+                        f"{label}: {count} x {shape[:LOGGED_STATEMENT_CHARS]} (at most {self.max_repeats} allowed)"
+                    )
+        return problems
+
+
+class QueryAuditor:
+    """
+    Opt-in (QUERY_AUDIT=true) detector for N+1 query patterns.
+
+    Statements are fingerprinted per request (literals and placeholders
+    stripped), and any shape executed more than max_repeats times in one
+    request is logged with the route, which is how a per-row lookup inside a
+    loop shows up. Slow statements are logged by the engine hooks in
+    app.database.query_metrics. Budgets work whether or not auditing is enabled.
+    """
+
+    def __init__(self, enabled: bool, max_repeats: int):
+        self.enabled = enabled
+        self.max_repeats = max_repeats
+        self._budgets: List[QueryBudget] = []
+        self._lock = threading.Lock()
+
+    def new_stats(self) -> QueryStats:
+        """Stats for a new request, with fingerprints only when someone will read them"""
+        return QueryStats(track_fingerprints=self.enabled or bool(self._budgets))
+
+    def request_finished(self, method: str, route: str, stats: QueryStats):
+        if stats.fingerprints is None:
+            return
+        if self.enabled:
+            for shape, count in repeated_statements(stats, self.max_repeats):
+                logger.warning(
+                    f"🔁 Possible N+1 in {method} {route}: {count} x {shape[:LOGGED_STATEMENT_CHARS]}"
+                )
+        with self._lock:
+            budgets = list(self._budgets)
+        for budget in budgets:
+            budget.add(f"{method} {route}", stats)
+
+    @contextmanager
+    def budget(self, max_statements: Optional[int] = None, max_repeats: Optional[int] = None) -> Iterator[QueryBudget]:
+        """
+        Raise QueryBudgetExceeded when a request finished in the block (or code
+        run directly in it) issues more than max_statements statements, or
+        repeats one statement shape more than max_repeats times:
+
+            with query_auditor.budget(max_statements=4, max_repeats=1):
+                client.get("/api/company/drives", headers=headers)
+        """
+        budget = QueryBudget(max_statements, max_repeats)
+        with self._lock:
+            self._budgets.append(budget)
+        token = current_query_stats.set(budget.direct)
+        try:
+            yield budget
+        finally:
+            current_query_stats.reset(token)
+            with self._lock:
+                self._budgets.remove(budget)
+        problems = budget.violations()
+        if problems:
+            raise QueryBudgetExceeded("Query budget exceeded:\n  " + "\n  ".join(problems))
+
+
+query_auditor = QueryAuditor(enabled=settings.query_audit_enabled, max_repeats=settings.query_audit_max_repeats)
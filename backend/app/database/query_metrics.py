@@ -0,0 +1,127 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional
+from sqlalchemy import event
+from app.database.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this are logged with their parameter shapes (QUERY_AUDIT only)
+SLOW_STATEMENT_SECONDS = settings.query_audit_slow_ms / 1000 if settings.query_audit_enabled else None
+# Longest statement text written to a log line
+LOGGED_STATEMENT_CHARS = 500
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|\?")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_ROW_LIST = re.compile(r"\(\?, \.\.\.\)(?:\s*,\s*\(\?, \.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryStats:
+    """
+    SQL statements issued on behalf of one request and the time spent executing
+    them. fingerprints counts statements by shape when the query auditor asks
+    for it (see app.database.query_audit); it is None otherwise.
+    """
+
+    __slots__ = ("statements", "db_seconds", "fingerprints")
+
+    def __init__(self, track_fingerprints: bool = False):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.fingerprints: Optional[Counter] = Counter() if track_fingerprints else None
+
+
+# Set by the request metrics middleware; threadpool and asyncio work spawned by
+# a request copy the context, so their statements are counted too. Statements
+# run outside a request (scheduler, answer flushes, email jobs) are not.
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    A statement with literals and placeholders replaced by ? and value lists
+    collapsed, so the same query for different ids (or IN lists of different
+    lengths) counts as one shape.
+    """
+    text = _STRING_LITERAL.sub("?", statement)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    text = _PLACEHOLDER_LIST.sub("?, ...", text)
+    return _ROW_LIST.sub("(?, ...), ...", text)
+
+
+def _value_types(values) -> str:
+    """Type names with runs collapsed: (int, str x 3)"""
+    runs = []
+    for value in values:
+        name = type(value).__name__
+        if runs and runs[-1][0] == name:
+            runs[-1][1] += 1
+        else:
+            runs.append([name, 1])
+    return "(" + ", ".join(name if count == 1 else f"{name} x {count}" for name, count in runs) + ")"
+
+
+def parameter_shape(parameters, executemany: bool = False) -> str:
+    """Bound parameters described by type only, so logs carry no student data"""
+    if executemany:
+        rows = list(parameters or ())
+        return f"{len(rows)} rows of {parameter_shape(rows[0]) if rows else '()'}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return _value_types(parameters)
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _finish(conn, statement, parameters, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+        if stats.fingerprints is not None:
+            stats.fingerprints[fingerprint(statement)] += 1
+    if SLOW_STATEMENT_SECONDS is not None and elapsed >= SLOW_STATEMENT_SECONDS:
+        logger.warning(
+            f"🐢 Slow statement ({elapsed * 1000:.1f} ms): {statement[:LOGGED_STATEMENT_CHARS]} "
+            f"| parameters {parameter_shape(parameters, executemany)}"
+        )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _finish(conn, statement, parameters, executemany)
+
+
+def _handle_error(exception_context):
+    # A failed statement gets no after_cursor_execute, but it still took a round trip.
+    # Only errors raised after before_cursor_execute left a start time to close;
+    # ExceptionContext.cursor is not set on every SQLAlchemy release, so it is not used
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        _finish(
+            connection,
+            exception_context.statement or "",
+            exception_context.parameters,
+            bool(exception_context.execution_context and exception_context.execution_context.executemany)
+        )
+
+
+def listen_query_events(engine):
+    """Time every statement on an engine (pass async_engine.sync_engine for async engines)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -1,13 +1,20 @@
 from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+import hmac
 import logging
 import sys
 from contextlib import asynccontextmanager
 from datetime import datetime
-from app.routes import auth_router, admin_router, company_router
+from anyio import to_thread
+from app.routes import auth_router, admin_router, company_router, student_router
 from app.database import create_tables
 from app.database.config import settings
+from app.database.connection import async_engine
+from app.utils.email_dispatch import start_email_dispatcher, shutdown_email_dispatcher
+from app.utils.exam_scheduler import exam_scheduler
+from app.utils.answer_buffer import answer_buffer
+from app.utils.request_metrics import RequestMetricsMiddleware, request_metrics
 
 # Configure logging
 logging.basicConfig(
@@ -33,10 +40,18 @@ async def lifespan(app: FastAPI):
         logger.error(f"❌ Database initialization failed: {str(e)}")
         raise
     
+    start_email_dispatcher()
+    await answer_buffer.start()
+    await exam_scheduler.start()
+    
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down Company Exam Portal API...")
+    await exam_scheduler.stop()
+    await answer_buffer.stop()
+    shutdown_email_dispatcher()
+    await async_engine.dispose()
 
 # Create FastAPI app
 app = FastAPI(
@@ -55,8 +70,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Per-route latency, DB time and statement counts (served on /metrics and in Server-Timing)
+app.add_middleware(RequestMetricsMiddleware)
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -71,13 +90,15 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     logger.warning(f"HTTP exception: {exc.status_code} - {exc.detail}")
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail}
+        content={"detail": exc.detail},
+        headers=exc.headers
     )
 
 # Include API routes
 app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(admin_router, prefix="/api/admin", tags=["Admin"])
 app.include_router(company_router, prefix="/api/company", tags=["Company"])
+app.include_router(student_router, prefix="/api/student", tags=["Student"])
 
 @app.get("/")
 async def root():
@@ -90,12 +111,34 @@ async def root():
         "redoc": "/redoc"
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    """Per-route request metrics in the Prometheus text format"""
+    if settings.metrics_token:
+        expected = f"Bearer {settings.metrics_token}".encode()
+        if not hmac.compare_digest(request.headers.get("authorization", "").encode(), expected):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid metrics token",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+    return PlainTextResponse(request_metrics.prometheus(), media_type="text/plain; version=0.0.4")
+
+def get_threadpool_stats() -> dict:
+    """Occupancy of the threadpool that runs sync routes and run_in_threadpool work"""
+    limiter = to_thread.current_default_thread_limiter()
+    return {
+        "size": int(limiter.total_tokens),
+        "in_use": limiter.borrowed_tokens,
+        "waiting": limiter.statistics().tasks_waiting
+    }
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint for production monitoring"""
     try:
         # Test database connection
-        from app.database.connection import engine
+        from app.database.connection import engine, get_pool_stats
         from sqlalchemy import text
         
         with engine.connect() as conn:
@@ -107,6 +150,8 @@ async def health_check():
             "version": "1.0.0",
             "environment": settings.environment,
             "database": "connected",
+            "database_pool": get_pool_stats(),
+            "threadpool": get_threadpool_stats(),
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
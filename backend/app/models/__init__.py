@@ -7,6 +7,11 @@ from app.models.drive import Drive
 from app.models.question import Question
 from app.models.drive_target import DriveTarget
 from app.models.student import Student
+from app.models.email_job import EmailJob
+from app.models.email_delivery import EmailDelivery
+from app.models.exam_attempt import ExamAttempt
+from app.models.student_answer import StudentAnswer
+from app.models.exam_result import ExamResult
 
 # Export all models
 __all__ = [
@@ -17,5 +22,10 @@ __all__ = [
     "Drive",
     "Question",
     "DriveTarget",
-    "Student"
+    "Student",
+    "EmailJob",
+    "EmailDelivery",
+    "ExamAttempt",
+    "StudentAnswer",
+    "ExamResult"
 ]
@@ -8,6 +8,6 @@ class College(Base):
     __tablename__ = "colleges"
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     is_approved = Column(Boolean, default=True)  # Pre-approved colleges are True
     created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
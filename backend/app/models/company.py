@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -7,6 +7,11 @@ from app.database.connection import Base
 
 class Company(Base):
     __tablename__ = "companies"
+    __table_args__ = (
+        # Keyset pagination indexes for the admin company listing
+        Index("ix_companies_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_companies_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     company_name = Column(String, nullable=False)
@@ -31,6 +36,7 @@ class Company(Base):
 You have been selected for the recruitment drive: {{drive_title}}
 
 Your login credentials are:
+• Exam ID: {{exam_id}}
 • Username: {{roll_number}}
 • Password: {{password}}
 • Login URL: {{login_url}}
@@ -49,7 +55,7 @@ This is an automated email. Please do not reply to this message.""")
     use_custom_template = Column(Boolean, default=False)
     template_updated_at = Column(DateTime, nullable=True)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # Keyset pagination position
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
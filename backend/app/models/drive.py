@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -7,6 +7,13 @@ from app.database.connection import Base
 
 class Drive(Base):
     __tablename__ = "drives"
+    __table_args__ = (
+        # Keyset pagination indexes for the admin and company drive listings
+        Index("ix_drives_created_at_id", "created_at", "id"),
+        Index("ix_drives_company_id_created_at_id", "company_id", "created_at", "id"),
+        # Admin review filters (submitted, rejected, suspended) in the same order
+        Index("ix_drives_status_created_at_id", "status", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
@@ -20,7 +27,7 @@ class Drive(Base):
     status = Column(String, default="draft")  # draft, submitted, approved, rejected, upcoming, live, ongoing, completed
     is_approved = Column(Boolean, default=False)
     admin_notes = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # Keyset pagination position
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
@@ -28,6 +35,9 @@ class Drive(Base):
     questions = relationship("Question", back_populates="drive", cascade="all, delete-orphan")
     targets = relationship("DriveTarget", back_populates="drive", cascade="all, delete-orphan")
     students = relationship("Student", back_populates="drive", cascade="all, delete-orphan")
+    email_jobs = relationship("EmailJob", back_populates="drive", cascade="all, delete-orphan")
+    exam_attempts = relationship("ExamAttempt", back_populates="drive", cascade="all, delete-orphan")
+    exam_results = relationship("ExamResult", back_populates="drive", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<Drive(id={self.id}, title='{self.title}', status='{self.status}')>"
\ No newline at end of file
@@ -9,7 +9,7 @@ class DriveTarget(Base):
     __tablename__ = "drive_targets"
     
     id = Column(Integer, primary_key=True, index=True)
-    drive_id = Column(Integer, ForeignKey("drives.id"), nullable=False)
+    drive_id = Column(Integer, ForeignKey("drives.id"), nullable=False, index=True)
     college_id = Column(Integer, ForeignKey("colleges.id"), nullable=True)  # Reference to master college
     custom_college_name = Column(String, nullable=True)  # For custom colleges
     student_group_id = Column(Integer, ForeignKey("student_groups.id"), nullable=True)  # Reference to master group
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+# Import base from database connection to use the same instance
+from app.database.connection import Base
+
+class EmailDelivery(Base):
+    """Latest credentials email outcome for a student; a rerun skips students already sent"""
+    __tablename__ = "email_deliveries"
+    __table_args__ = (
+        UniqueConstraint("drive_id", "student_id", name="uq_email_deliveries_drive_id_student_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("email_jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    drive_id = Column(Integer, ForeignKey("drives.id", ondelete="CASCADE"), nullable=False)
+    student_id = Column(Integer, ForeignKey("students.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String, nullable=False)  # sent, failed
+    error = Column(Text, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    job = relationship("EmailJob", back_populates="deliveries")
+    student = relationship("Student")
+
+    def __repr__(self):
+        return f"<EmailDelivery(student_id={self.student_id}, status='{self.status}')>"
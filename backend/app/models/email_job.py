@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, text
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+# Import base from database connection to use the same instance
+from app.database.connection import Base
+
+class EmailJob(Base):
+    __tablename__ = "email_jobs"
+    __table_args__ = (
+        # At most one queued or running job per drive, however many workers take the request
+        Index(
+            "uq_email_jobs_active_drive_id", "drive_id",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+            sqlite_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    drive_id = Column(Integer, ForeignKey("drives.id", ondelete="CASCADE"), nullable=False, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    status = Column(String, default="queued")  # queued, running, completed, failed
+    total_count = Column(Integer, nullable=False, default=0)
+    sent_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # Lease: refreshed by the worker sending the job
+    lease_owner = Column(String, nullable=True)  # Worker (host:pid) that last claimed the job
+    lease_token = Column(String, nullable=True)  # New on every claim; progress writes must match it
+
+    # Relationships
+    drive = relationship("Drive", back_populates="email_jobs")
+    deliveries = relationship("EmailDelivery", back_populates="job", cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<EmailJob(id={self.id}, drive_id={self.drive_id}, status='{self.status}')>"
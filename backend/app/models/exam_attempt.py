@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+# Import base from database connection to use the same instance
+from app.database.connection import Base
+
+class ExamAttempt(Base):
+    """A student's sitting of a drive's exam; created when the paper is first fetched"""
+    __tablename__ = "exam_attempts"
+    __table_args__ = (
+        UniqueConstraint("drive_id", "student_id", name="uq_exam_attempts_drive_id_student_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    drive_id = Column(Integer, ForeignKey("drives.id", ondelete="CASCADE"), nullable=False)
+    student_id = Column(Integer, ForeignKey("students.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String, nullable=False, default="in_progress")  # in_progress, submitted
+    started_at = Column(DateTime, default=datetime.utcnow)
+    submitted_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    drive = relationship("Drive", back_populates="exam_attempts")
+    student = relationship("Student")
+    answers = relationship("StudentAnswer", back_populates="attempt", cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<ExamAttempt(drive_id={self.drive_id}, student_id={self.student_id}, status='{self.status}')>"
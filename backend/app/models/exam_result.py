@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+# Import base from database connection to use the same instance
+from app.database.connection import Base
+
+class ExamResult(Base):
+    """Graded outcome of one attempt; rewritten in bulk each time a drive is graded"""
+    __tablename__ = "exam_results"
+
+    id = Column(Integer, primary_key=True, index=True)
+    drive_id = Column(Integer, ForeignKey("drives.id", ondelete="CASCADE"), nullable=False, index=True)
+    attempt_id = Column(Integer, ForeignKey("exam_attempts.id", ondelete="CASCADE"), nullable=False, unique=True)
+    student_id = Column(Integer, ForeignKey("students.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Integer, nullable=False)
+    max_score = Column(Integer, nullable=False)
+    correct_count = Column(Integer, nullable=False)
+    answered_count = Column(Integer, nullable=False)
+    rank = Column(Integer, nullable=False)  # 1 = best; equal scores share a rank
+    percentile = Column(Float, nullable=False)  # Share of students scoring strictly lower, 0-100
+    graded_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    drive = relationship("Drive", back_populates="exam_results")
+    attempt = relationship("ExamAttempt")
+    student = relationship("Student")
+
+    def __repr__(self):
+        return f"<ExamResult(attempt_id={self.attempt_id}, score={self.score}, rank={self.rank})>"
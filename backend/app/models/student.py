@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -7,6 +7,11 @@ from app.database.connection import Base
 
 class Student(Base):
     __tablename__ = "students"
+    __table_args__ = (
+        # Bulk imports rely on this for ON CONFLICT (drive_id, roll_number) DO NOTHING;
+        # it also serves every drive_id lookup, so drive_id has no index of its own
+        UniqueConstraint("drive_id", "roll_number", name="uq_students_drive_id_roll_number"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     drive_id = Column(Integer, ForeignKey("drives.id", ondelete="CASCADE"), nullable=False)
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+# Import base from database connection to use the same instance
+from app.database.connection import Base
+
+class StudentAnswer(Base):
+    """Latest answer to one question within an attempt"""
+    __tablename__ = "student_answers"
+    __table_args__ = (
+        # Saves upsert on (attempt_id, question_id)
+        UniqueConstraint("attempt_id", "question_id", name="uq_student_answers_attempt_id_question_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    attempt_id = Column(Integer, ForeignKey("exam_attempts.id", ondelete="CASCADE"), nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
+    selected_option = Column(String(1), nullable=True)  # A, B, C, D or NULL when cleared
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    attempt = relationship("ExamAttempt", back_populates="answers")
+
+    def __repr__(self):
+        return f"<StudentAnswer(attempt_id={self.attempt_id}, question_id={self.question_id}, selected_option='{self.selected_option}')>"
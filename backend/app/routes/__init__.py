@@ -1,5 +1,6 @@
 from .auth import router as auth_router
 from .admin import router as admin_router
 from .company import router as company_router
+from .student import router as student_router
 
-__all__ = ["auth_router", "admin_router", "company_router"]
+__all__ = ["auth_router", "admin_router", "company_router", "student_router"]
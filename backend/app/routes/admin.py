@@ -1,71 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database.connection import get_db
-from app.models import Company, Drive, College, StudentGroup
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload, joinedload
+from typing import List, Optional
+from app.database.connection import get_db, get_async_db, get_pool_stats
+from app.models import Company, Drive, College, StudentGroup, ExamAttempt
 from app.schemas.company import CompanyResponse, CompanyApprovalUpdate, CollegeResponse, StudentGroupResponse
 from app.schemas.drive import DriveResponse, AdminDriveApprovalUpdate
-from app.auth import get_admin_user
-
-def format_drive_response(drive, db):
-    """Format drive response with resolved target names and company info"""
-    targets = []
-    for target in drive.targets:
-        college_name = target.custom_college_name
-        if not college_name and target.college_id:
-            college = db.query(College).filter(College.id == target.college_id).first()
-            college_name = college.name if college else "Unknown College"
-        
-        group_name = target.custom_student_group_name
-        if not group_name and target.student_group_id:
-            group = db.query(StudentGroup).filter(StudentGroup.id == target.student_group_id).first()
-            group_name = group.name if group else "Unknown Group"
-        
-        targets.append({
-            "id": target.id,
-            "college_id": target.college_id,
-            "custom_college_name": target.custom_college_name,
-            "college_name": college_name,
-            "student_group_id": target.student_group_id,
-            "custom_student_group_name": target.custom_student_group_name,
-            "student_group_name": group_name,
-            "batch_year": target.batch_year
-        })
-    
-    # Get company information
-    company_name = "Unknown Company"
-    if drive.company_id:
-        company = db.query(Company).filter(Company.id == drive.company_id).first()
-        company_name = company.company_name if company else "Unknown Company"
-    
+from app.auth import get_admin_user, get_event_stream_user
+from app.auth.principal_cache import principal_cache
+from app.auth.password_executor import password_executor
+from app.utils.drive_serializer import format_drive_response, format_drive_responses
+from app.utils.pagination import keyset_paginate, page_limit
+from app.utils.exam_scheduler import exam_scheduler
+from app.utils.exam_status import MAX_BATCH_DRIVES, admin_exam_status, load_student_counts
+from app.utils.drive_events import drive_events, drive_event_stream_response
+from app.utils.paper_snapshots import paper_snapshots
+from app.utils.answer_buffer import answer_buffer
+from app.utils.reference_cache import reference_cache, COLLEGES, STUDENT_GROUPS
+
+router = APIRouter()
+
+@router.get("/metrics")
+def get_metrics(
+    admin: dict = Depends(get_admin_user)
+):
+    """Runtime metrics for capacity planning (admin only)"""
     return {
-        "id": drive.id,
-        "company_id": drive.company_id,
-        "company_name": company_name,
-        "title": drive.title,
-        "description": drive.description,
-        "question_type": drive.question_type,
-        "targets": targets,
-        "duration_minutes": drive.duration_minutes,
-        "scheduled_start": drive.scheduled_start,
-        "status": drive.status,
-        "is_approved": drive.is_approved,
-        "admin_notes": drive.admin_notes,
-        "created_at": drive.created_at,
-        "updated_at": drive.updated_at
+        "password_hashing": password_executor.stats(),
+        "database_pool": get_pool_stats(),
+        "event_stream_subscribers": drive_events.subscriber_count(),
+        "answer_buffer": answer_buffer.stats()
     }
 
-router = APIRouter()
+@router.get("/events")
+async def stream_all_drive_events(
+    current_user: dict = Depends(get_event_stream_user)
+):
+    """Server-Sent Events firehose of drive status changes across all companies (admin only)"""
+    if current_user["user_type"] != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return drive_event_stream_response(None)
 
 @router.get("/companies", response_model=List[CompanyResponse])
 def get_all_companies(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = page_limit(),
     status_filter: str = "pending",  # pending, approved, suspended, rejected, all
     db: Session = Depends(get_db),
     admin: dict = Depends(get_admin_user)
 ):
-    """Get all companies (admin only)"""
+    """Get all companies (admin only), newest first. Pass X-Next-Cursor back as `cursor` for the next page"""
     query = db.query(Company)
     
     if status_filter == "pending":
@@ -78,7 +64,7 @@ def get_all_companies(
         query = query.filter(Company.status == "rejected")
     # "all" shows everything
     
-    companies = query.offset(skip).limit(limit).all()
+    companies = keyset_paginate(query, Company, cursor, limit, response)
     return companies
 
 @router.put("/companies/{company_id}/approve", response_model=CompanyResponse)
@@ -109,6 +95,7 @@ def approve_company(
     
     db.commit()
     db.refresh(company)
+    principal_cache.invalidate("company", company.id)
     
     return company
 
@@ -135,6 +122,7 @@ def reject_company(
     
     db.commit()
     db.refresh(company)
+    principal_cache.invalidate("company", company_id)
     
     return {"message": "Company rejected successfully", "company_id": company_id}
 
@@ -158,33 +146,67 @@ def delete_company(
     
     db.delete(company)
     db.commit()
+    principal_cache.invalidate("company", company_id)
     
     return {"message": "Company deleted successfully"}
 
 @router.get("/drives", response_model=List[DriveResponse])
-def get_all_drives(
-    skip: int = 0,
-    limit: int = 100,
+async def get_all_drives(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = page_limit(),
     status_filter: str = "pending",  # pending, all, approved, rejected, suspended
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin: dict = Depends(get_admin_user)
 ):
-    """Get drives for admin review"""
-    query = db.query(Drive)
-    
-    if status_filter == "pending":
-        # Show only drives that need approval
-        query = query.filter(Drive.is_approved == False, Drive.status == "submitted")
-    elif status_filter == "approved":
-        query = query.filter(Drive.is_approved == True)
-    elif status_filter == "rejected":
-        query = query.filter(Drive.status == "rejected")
-    elif status_filter == "suspended":
-        query = query.filter(Drive.status == "suspended")
-    # "all" shows everything
-    
-    drives = query.offset(skip).limit(limit).all()
-    return [format_drive_response(drive, db) for drive in drives]
+    """Get drives for admin review, newest first. Pass X-Next-Cursor back as `cursor` for the next page"""
+    def load(session: Session):
+        query = session.query(Drive).options(selectinload(Drive.targets))
+
+        if status_filter == "pending":
+            # Show only drives that need approval
+            query = query.filter(Drive.is_approved == False, Drive.status == "submitted")
+        elif status_filter == "approved":
+            query = query.filter(Drive.is_approved == True)
+        elif status_filter == "rejected":
+            query = query.filter(Drive.status == "rejected")
+        elif status_filter == "suspended":
+            query = query.filter(Drive.status == "suspended")
+        # "all" shows everything
+
+        drives = keyset_paginate(query, Drive, cursor, limit, response)
+        return format_drive_responses(drives, session, include_counts=True, admin_view=True)
+
+    return await db.run_sync(load)
+
+@router.get("/drives/exam-status")
+async def get_exam_statuses_admin(
+    response: Response,
+    drive_ids: Optional[List[int]] = Query(None),
+    cursor: Optional[str] = None,
+    limit: int = page_limit(),
+    db: AsyncSession = Depends(get_async_db),
+    admin: dict = Depends(get_admin_user)
+):
+    """
+    Exam status for several drives in two queries: pass drive_ids repeatedly
+    (?drive_ids=1&drive_ids=2, at most MAX_BATCH_DRIVES), or omit it for a
+    page of approved drives, newest first. Pass X-Next-Cursor back as
+    `cursor` for the next page.
+    """
+    if drive_ids is not None:
+        if len(drive_ids) > MAX_BATCH_DRIVES:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_DRIVES} drive ids per request")
+        drives = (await db.scalars(select(Drive).where(Drive.id.in_(drive_ids)).order_by(Drive.id))).all()
+    else:
+        def load(session: Session):
+            query = session.query(Drive).filter(Drive.is_approved == True)
+            return keyset_paginate(query, Drive, cursor, limit, response)
+
+        drives = await db.run_sync(load)
+
+    student_counts = await load_student_counts(db, [drive.id for drive in drives])
+    return [admin_exam_status(drive, student_counts[drive.id]) for drive in drives]
 
 @router.put("/drives/{drive_id}/approve", response_model=DriveResponse)
 def approve_drive(
@@ -207,20 +229,25 @@ def approve_drive(
         drive.status = "rejected"
     
     db.commit()
+    exam_scheduler.notify()
     db.refresh(drive)
+    drive_events.publish_drive(drive, "approved" if drive.is_approved else "rejected")
+    if drive.is_approved:
+        # Questions are locked from here on; freeze the paper before students arrive
+        paper_snapshots.freeze(db, drive)
     
-    return format_drive_response(drive, db)
+    return format_drive_response(drive, db, admin_view=True)
 
 @router.put("/drives/{drive_id}/suspend")
-def suspend_drive(
+async def suspend_drive(
     drive_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin: dict = Depends(get_admin_user)
 ):
     """Suspend a drive (prevent company from using it). If exam is ongoing, it will be ended immediately."""
     from datetime import datetime
     
-    drive = db.query(Drive).filter(Drive.id == drive_id).first()
+    drive = await db.scalar(select(Drive).where(Drive.id == drive_id))
     if not drive:
         raise HTTPException(status_code=404, detail="Drive not found")
     
@@ -234,12 +261,17 @@ def suspend_drive(
         was_ongoing = True
         # Mark as completed since exam has ended
         drive.status = "completed"
+        # Answers saved before the end, by any worker, must be in the database once the exam ends
+        attempt_ids = await db.scalars(select(ExamAttempt.id).where(ExamAttempt.drive_id == drive_id))
+        await answer_buffer.persist(db, attempt_ids)
     else:
         # If exam not ongoing, just suspend
         drive.status = "suspended"
     
-    db.commit()
-    db.refresh(drive)
+    await db.commit()
+    exam_scheduler.notify()
+    await db.refresh(drive)
+    drive_events.publish_drive(drive, "ended" if was_ongoing else "suspended")
     
     message = "Drive suspended successfully"
     if was_ongoing:
@@ -269,7 +301,9 @@ def reactivate_drive(
     drive.status = "approved"
     
     db.commit()
+    exam_scheduler.notify()
     db.refresh(drive)
+    drive_events.publish_drive(drive, "reactivated")
     
     return {
         "message": "Drive reactivated successfully",
@@ -286,12 +320,15 @@ def get_drive_detail(
     """Get detailed view of a drive including questions and students for admin review"""
     from app.models import Question, Student
     
-    drive = db.query(Drive).filter(Drive.id == drive_id).first()
+    drive = db.query(Drive).options(
+        selectinload(Drive.targets),
+        joinedload(Drive.company)
+    ).filter(Drive.id == drive_id).first()
     if not drive:
         raise HTTPException(status_code=404, detail="Drive not found")
     
     # Get basic drive info
-    drive_info = format_drive_response(drive, db)
+    drive_info = format_drive_response(drive, db, admin_view=True)
     
     # Get questions
     questions = db.query(Question).filter(Question.drive_id == drive_id).all()
@@ -324,7 +361,7 @@ def get_drive_detail(
     # Get company info
     company_info = None
     if drive.company_id:
-        company = db.query(Company).filter(Company.id == drive.company_id).first()
+        company = drive.company
         if company:
             company_info = {
                 "id": company.id,
@@ -350,12 +387,12 @@ def get_drive_detail(
 
 @router.get("/colleges", response_model=List[CollegeResponse])
 def get_all_colleges(
+    request: Request,
     db: Session = Depends(get_db),
     admin: dict = Depends(get_admin_user)
 ):
-    """Get all colleges"""
-    colleges = db.query(College).all()
-    return colleges
+    """Get all colleges (cached; send If-None-Match for a 304)"""
+    return reference_cache.response(request, COLLEGES, "all", lambda: db.query(College).all())
 
 @router.get("/colleges/pending")
 def get_pending_custom_colleges(
@@ -428,6 +465,7 @@ def approve_custom_college(
         target.custom_college_name = None  # Clear custom name
     
     db.commit()
+    reference_cache.invalidate(COLLEGES)
     
     return {
         "message": "College approved successfully", 
@@ -448,17 +486,18 @@ def approve_college(
     
     college.is_approved = True
     db.commit()
+    reference_cache.invalidate(COLLEGES)
     
     return {"message": "College approved successfully"}
 
 @router.get("/student-groups", response_model=List[StudentGroupResponse])
 def get_all_student_groups(
+    request: Request,
     db: Session = Depends(get_db),
     admin: dict = Depends(get_admin_user)
 ):
-    """Get all student groups"""
-    groups = db.query(StudentGroup).all()
-    return groups
+    """Get all student groups (cached; send If-None-Match for a 304)"""
+    return reference_cache.response(request, STUDENT_GROUPS, "all", lambda: db.query(StudentGroup).all())
 
 @router.get("/student-groups/pending")
 def get_pending_custom_student_groups(
@@ -531,6 +570,7 @@ def approve_custom_student_group(
         target.custom_student_group_name = None  # Clear custom name
     
     db.commit()
+    reference_cache.invalidate(STUDENT_GROUPS)
     
     return {
         "message": "Student group approved successfully", 
@@ -551,6 +591,7 @@ def approve_student_group(
     
     group.is_approved = True
     db.commit()
+    reference_cache.invalidate(STUDENT_GROUPS)
     
     return {"message": "Student group approved successfully"}
 
@@ -570,6 +611,7 @@ def create_college(
     college = College(name=college_data["name"], is_approved=True)
     db.add(college)
     db.commit()
+    reference_cache.invalidate(COLLEGES)
     db.refresh(college)
     
     return {"message": "College created successfully", "college": college}
@@ -597,6 +639,7 @@ def update_college(
         college.is_approved = college_data["is_approved"]
     
     db.commit()
+    reference_cache.invalidate(COLLEGES)
     db.refresh(college)
     
     return {"message": "College updated successfully", "college": college}
@@ -614,6 +657,7 @@ def delete_college(
     
     db.delete(college)
     db.commit()
+    reference_cache.invalidate(COLLEGES)
     
     return {"message": "College deleted successfully"}
 
@@ -632,6 +676,7 @@ def create_student_group(
     group = StudentGroup(name=group_data["name"], is_approved=True)
     db.add(group)
     db.commit()
+    reference_cache.invalidate(STUDENT_GROUPS)
     db.refresh(group)
     
     return {"message": "Student group created successfully", "group": group}
@@ -659,6 +704,7 @@ def update_student_group(
         group.is_approved = group_data["is_approved"]
     
     db.commit()
+    reference_cache.invalidate(STUDENT_GROUPS)
     db.refresh(group)
     
     return {"message": "Student group updated successfully", "group": group}
@@ -676,65 +722,21 @@ def delete_student_group(
     
     db.delete(group)
     db.commit()
+    reference_cache.invalidate(STUDENT_GROUPS)
     
     return {"message": "Student group deleted successfully"}
 
 @router.get("/drives/{drive_id}/exam-status")
-def get_exam_status_admin(
+async def get_exam_status_admin(
     drive_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin: dict = Depends(get_admin_user)
 ):
-    """Get exam status for a drive (Admin view)"""
-    from datetime import datetime, timezone
-    
-    drive = db.query(Drive).filter(Drive.id == drive_id).first()
+    """Get exam status for a drive (Admin view). Read-only: the exam scheduler persists auto-start/auto-end"""
+    drive = await db.scalar(select(Drive).where(Drive.id == drive_id))
     if not drive:
         raise HTTPException(status_code=404, detail="Drive not found")
-    
-    now = datetime.now(timezone.utc)
-    
-    # Determine exam state
-    exam_state = "not_started"
-    time_remaining = None
-    can_start = False
-    scheduled_has_passed = False
-    
-    if drive.actual_start:
-        if drive.actual_end:
-            exam_state = "completed"
-        else:
-            exam_state = "ongoing"
-            # Calculate time remaining
-            elapsed_minutes = (now - drive.actual_start.replace(tzinfo=timezone.utc)).total_seconds() / 60
-            time_remaining = max(0, (drive.duration_minutes or 0) - elapsed_minutes) * 60  # in seconds
-            
-            # Auto-end if duration exceeded
-            if time_remaining <= 0:
-                drive.actual_end = now
-                drive.status = "completed"
-                db.commit()
-                exam_state = "completed"
-                time_remaining = 0
-    else:
-        # Can start if approved and has students
-        can_start = drive.is_approved and len(drive.students) > 0
-    
-    # Count students
-    student_count = len(drive.students)
-    has_students = student_count > 0
-    
-    return {
-        "drive_id": drive.id,
-        "exam_state": exam_state,
-        "can_start": can_start and has_students,
-        "scheduled_start": drive.scheduled_start,
-        "scheduled_has_passed": scheduled_has_passed,
-        "actual_start": drive.actual_start,
-        "actual_end": drive.actual_end,
-        "time_remaining": time_remaining,
-        "time_remaining_minutes": time_remaining / 60 if time_remaining else None,
-        "duration_minutes": drive.duration_minutes,
-        "has_students": has_students,
-        "student_count": student_count
-    }
+
+    # Count students without loading them
+    student_counts = await load_student_counts(db, [drive_id])
+    return admin_exam_status(drive, student_counts[drive_id])
@@ -1,35 +1,38 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from app.database.connection import get_db
+from app.database.connection import get_async_db
 from app.models import Admin, Company
-from app.schemas.auth import AdminLogin, CompanyLogin, CompanyRegister, Token, UserResponse
-from app.auth.security import verify_password, get_password_hash, create_access_token
+from app.schemas.auth import AdminLogin, CompanyLogin, CompanyRegister, StreamToken, Token, UserResponse
+from app.auth import get_current_user
+from app.auth.security import create_access_token, create_event_stream_token
+from app.auth.password_executor import verify_password_bounded, get_password_hash_bounded
 from app.database.config import settings
 
 router = APIRouter()
 
 @router.post("/admin/login", response_model=Token)
-def admin_login(admin_data: AdminLogin, db: Session = Depends(get_db)):
+async def admin_login(admin_data: AdminLogin, db: AsyncSession = Depends(get_async_db)):
     """Admin login"""
     # Check if admin exists, if not create default admin
-    admin = db.query(Admin).filter(Admin.username == admin_data.username).first()
+    admin = await db.scalar(select(Admin).where(Admin.username == admin_data.username))
     
     if not admin:
         # Create default admin if doesn't exist
         if admin_data.username == settings.admin_username and admin_data.password == settings.admin_password:
-            hashed_password = get_password_hash(settings.admin_password)
+            hashed_password = await get_password_hash_bounded(settings.admin_password)
             admin = Admin(username=settings.admin_username, password_hash=hashed_password)
             db.add(admin)
-            db.commit()
-            db.refresh(admin)
+            await db.commit()
+            await db.refresh(admin)
         else:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
             )
     
-    if not verify_password(admin_data.password, admin.password_hash):
+    if not await verify_password_bounded(admin_data.password, admin.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
@@ -44,10 +47,10 @@ def admin_login(admin_data: AdminLogin, db: Session = Depends(get_db)):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/company/register", response_model=dict)
-def company_register(company_data: CompanyRegister, db: Session = Depends(get_db)):
+async def company_register(company_data: CompanyRegister, db: AsyncSession = Depends(get_async_db)):
     """Company registration (requires admin approval)"""
     # Check if email already exists
-    existing_company = db.query(Company).filter(Company.email == company_data.email).first()
+    existing_company = await db.scalar(select(Company).where(Company.email == company_data.email))
     if existing_company:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -55,7 +58,7 @@ def company_register(company_data: CompanyRegister, db: Session = Depends(get_db
         )
     
     # Check if username already exists
-    existing_username = db.query(Company).filter(Company.username == company_data.username).first()
+    existing_username = await db.scalar(select(Company).where(Company.username == company_data.username))
     if existing_username:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -63,7 +66,7 @@ def company_register(company_data: CompanyRegister, db: Session = Depends(get_db
         )
     
     # Create new company
-    hashed_password = get_password_hash(company_data.password)
+    hashed_password = await get_password_hash_bounded(company_data.password)
     company = Company(
         company_name=company_data.company_name,
         username=company_data.username,
@@ -73,17 +76,16 @@ def company_register(company_data: CompanyRegister, db: Session = Depends(get_db
     )
     
     db.add(company)
-    db.commit()
-    db.refresh(company)
+    await db.commit()
     
     return {"message": "Company registered successfully. Waiting for admin approval."}
 
 @router.post("/company/login", response_model=Token)
-def company_login(company_data: CompanyLogin, db: Session = Depends(get_db)):
+async def company_login(company_data: CompanyLogin, db: AsyncSession = Depends(get_async_db)):
     """Company login"""
-    company = db.query(Company).filter(Company.username == company_data.username).first()
+    company = await db.scalar(select(Company).where(Company.username == company_data.username))
     
-    if not company or not verify_password(company_data.password, company.hashed_password):
+    if not company or not await verify_password_bounded(company_data.password, company.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
@@ -115,3 +117,11 @@ def company_login(company_data: CompanyLogin, db: Session = Depends(get_db)):
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
+
+@router.post("/stream-token", response_model=StreamToken)
+async def issue_stream_token(current_user: dict = Depends(get_current_user)):
+    """Short-lived token for opening /api/company/events or /api/admin/events (pass it as stream_token)"""
+    return {
+        "stream_token": create_event_stream_token(current_user["user_type"], current_user["user"].id),
+        "expires_in": settings.event_stream_token_seconds
+    }
@@ -1,29 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Header
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File, Header
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
-import csv
-import io
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime
-from app.database.connection import get_db
+from app.database.connection import get_db, get_async_db
 from app.database.config import settings
-from app.models import Drive, Question, Student, College, StudentGroup, DriveTarget, Company
+from app.models import Drive, Question, Student, College, StudentGroup, DriveTarget, Company, EmailJob, EmailDelivery, ExamAttempt, ExamResult
 from app.schemas.drive import DriveCreate, DriveUpdate, DriveResponse, DriveStatusUpdate
 from app.schemas.question import QuestionResponse
 from app.schemas.student import StudentResponse
 from app.schemas.email import (
     EmailTemplateUpdate, EmailTemplateResponse, EmailTemplatePreview,
-    EmailTemplatePreviewResponse, EmailSendResponse, EmailStatusResponse
+    EmailTemplatePreviewResponse, EmailJobResponse, EmailStatusResponse
 )
 from app.schemas.company import CollegeResponse, StudentGroupResponse
-from app.auth import get_company_user, get_company_or_admin_user
+from app.schemas.result import GradingSummaryResponse, ExamResultResponse
+from app.auth import get_company_user, get_company_or_admin_user, get_event_stream_user
 from app.utils.email_processor import EmailTemplateProcessor, TEMPLATE_VARIABLES
+from app.utils.drive_serializer import format_drive_response, format_drive_responses, get_drive_counts
+from app.utils.pagination import keyset_paginate, page_limit
+from app.utils.exam_scheduler import exam_scheduler
+from app.utils.exam_status import MAX_BATCH_DRIVES, company_exam_status, load_student_counts
+from app.utils.drive_events import drive_events, drive_deleted_event, drive_event_stream_response, exam_end_deadline
+from app.utils.student_import import import_students_csv, StudentImportError
+from app.utils.student_directory import student_directory
+from app.utils.paper_snapshots import paper_snapshots
+from app.utils.answer_buffer import answer_buffer
+from app.utils.grading import grade_drive
+from app.utils.reference_cache import reference_cache, invalidate_custom_reference_data, COLLEGES, STUDENT_GROUPS
+from app.utils.question_import import import_questions_csv, QuestionImportError
+from app.utils.email_dispatch import ACTIVE_JOB_STATUSES, enqueue_email_job, pending_students_query
 
 router = APIRouter()
 
-def get_effective_company_id(
+async def get_effective_company_id(
     current_user: dict = Depends(get_company_or_admin_user),
     x_company_id: Optional[int] = Header(None, alias="X-Company-ID")
 ) -> int:
@@ -50,78 +63,56 @@ def get_effective_company_id(
             detail="Access denied"
         )
 
-def format_drive_response(drive: Drive, db: Session):
-    """Format drive response with resolved target information"""
-    targets = []
-    for target in drive.targets:
-        college_name = None
-        student_group_name = None
-
-        if target.college_id:
-            college = db.query(College).filter(College.id == target.college_id).first()
-            college_name = college.name if college else None
-        elif target.custom_college_name:
-            college_name = target.custom_college_name
-
-        if target.student_group_id:
-            group = db.query(StudentGroup).filter(StudentGroup.id == target.student_group_id).first()
-            student_group_name = group.name if group else None
-        elif target.custom_student_group_name:
-            student_group_name = target.custom_student_group_name
-
-        targets.append({
-            "id": target.id,
-            "college_id": target.college_id,
-            "custom_college_name": target.custom_college_name,
-            "student_group_id": target.student_group_id,
-            "custom_student_group_name": target.custom_student_group_name,
-            "batch_year": target.batch_year,
-            "college_name": college_name,
-            "student_group_name": student_group_name
-        })
-
-    # Get company name
-    company = db.query(Company).filter(Company.id == drive.company_id).first()
-    company_name = company.company_name if company else None
-
-    return {
-        "id": drive.id,
-        "company_id": drive.company_id,
-        "company_name": company_name,
-        "title": drive.title,
-        "description": drive.description,
-        "question_type": drive.question_type,
-        "targets": targets,
-        "duration_minutes": drive.duration_minutes,
-        "scheduled_start": drive.scheduled_start,
-        "status": drive.status,
-        "is_approved": drive.is_approved,
-        "admin_notes": drive.admin_notes,
-        "created_at": drive.created_at,
-        "updated_at": drive.updated_at
-    }
-
 @router.get("/drives", response_model=List[DriveResponse])
-def get_company_drives(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+async def get_company_drives(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = page_limit(),
+    db: AsyncSession = Depends(get_async_db),
     company_id: int = Depends(get_effective_company_id)
 ):
-    """Get all drives for the authenticated company or admin viewing a specific company"""
-    drives = db.query(Drive).filter(
-        Drive.company_id == company_id  # Show all drives so company can see status
-    ).offset(skip).limit(limit).all()
+    """Get all drives for the authenticated company or admin viewing a specific company, newest first"""
+    def load(session: Session):
+        query = session.query(Drive).options(selectinload(Drive.targets)).filter(
+            Drive.company_id == company_id  # Show all drives so company can see status
+        )
+        drives = keyset_paginate(query, Drive, cursor, limit, response)
+        return format_drive_responses(drives, session, include_counts=True)
+
+    return await db.run_sync(load)
 
-    # Add counts for each drive
-    result = []
-    for drive in drives:
-        drive_dict = format_drive_response(drive, db)
-        drive_dict["question_count"] = db.query(Question).filter(Question.drive_id == drive.id).count()
-        drive_dict["student_count"] = db.query(Student).filter(Student.drive_id == drive.id).count()
-        result.append(drive_dict)
+@router.get("/events")
+async def stream_drive_events(
+    current_user: dict = Depends(get_event_stream_user)
+):
+    """
+    Server-Sent Events stream of this company's drive status changes
+    (submitted, approved, started, ended, ...). Replaces polling exam-status.
+    """
+    if current_user["user_type"] != "company":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Company access required")
+    return drive_event_stream_response(current_user["user"].id)
+
+@router.get("/drives/exam-status")
+async def get_exam_statuses(
+    drive_ids: Optional[List[int]] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    company: dict = Depends(get_company_user)
+):
+    """
+    Exam status for several drives in two queries: pass drive_ids repeatedly
+    (?drive_ids=1&drive_ids=2) or omit it for all of the company's drives.
+    Ids that are not this company's drives are ignored.
+    """
+    query = select(Drive).where(Drive.company_id == company.id)
+    if drive_ids is not None:
+        if len(drive_ids) > MAX_BATCH_DRIVES:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_DRIVES} drive ids per request")
+        query = query.where(Drive.id.in_(drive_ids))
 
-    return result
+    drives = (await db.scalars(query.order_by(Drive.id))).all()
+    student_counts = await load_student_counts(db, [drive.id for drive in drives])
+    return [company_exam_status(drive, student_counts[drive.id]) for drive in drives]
 
 @router.post("/drives", response_model=DriveResponse)
 def create_drive(
@@ -178,13 +169,13 @@ def create_drive(
         db.add(drive_target)
 
     db.commit()
+    invalidate_custom_reference_data(drive_data.targets)
     db.refresh(drive)
+    drive_events.publish_drive(drive, "created")
 
     # Load the drive with targets for response
     drive_with_targets = db.query(Drive).filter(Drive.id == drive.id).first()
-    drive_dict = format_drive_response(drive_with_targets, db)
-    drive_dict["question_count"] = db.query(Question).filter(Question.drive_id == drive.id).count()
-    drive_dict["student_count"] = db.query(Student).filter(Student.drive_id == drive.id).count()
+    drive_dict = format_drive_response(drive_with_targets, db, include_counts=True)
     return drive_dict
 
 @router.get("/drives/{drive_id}", response_model=DriveResponse)
@@ -202,9 +193,7 @@ def get_drive(
     if not drive:
         raise HTTPException(status_code=404, detail="Drive not found")
 
-    drive_dict = format_drive_response(drive, db)
-    drive_dict["question_count"] = db.query(Question).filter(Question.drive_id == drive.id).count()
-    drive_dict["student_count"] = db.query(Student).filter(Student.drive_id == drive.id).count()
+    drive_dict = format_drive_response(drive, db, include_counts=True)
     return drive_dict
 
 @router.put("/drives/{drive_id}", response_model=DriveResponse)
@@ -273,11 +262,12 @@ def update_drive(
             db.add(drive_target)
 
     db.commit()
+    invalidate_custom_reference_data(drive_data.targets or [])
+    exam_scheduler.notify()
     db.refresh(drive)
+    drive_events.publish_drive(drive, "updated")
 
-    drive_dict = format_drive_response(drive, db)
-    drive_dict["question_count"] = db.query(Question).filter(Question.drive_id == drive.id).count()
-    drive_dict["student_count"] = db.query(Student).filter(Student.drive_id == drive.id).count()
+    drive_dict = format_drive_response(drive, db, include_counts=True)
     return drive_dict
 
 @router.delete("/drives/{drive_id}")
@@ -301,6 +291,7 @@ def delete_drive(
 
     db.delete(drive)
     db.commit()
+    drive_events.publish(drive_deleted_event(drive_id, company.id))
 
     return {"message": "Drive deleted successfully"}
 
@@ -323,21 +314,19 @@ def submit_drive_for_approval(
         raise HTTPException(status_code=400, detail="Only draft drives can be submitted")
 
     # Check if drive has questions and students
-    question_count = db.query(Question).filter(Question.drive_id == drive_id).count()
-    if question_count == 0:
+    counts = get_drive_counts([drive_id], db)[drive_id]
+    if counts["question_count"] == 0:
         raise HTTPException(status_code=400, detail="Drive must have at least one question to submit")
 
-    student_count = db.query(Student).filter(Student.drive_id == drive_id).count()
-    if student_count == 0:
+    if counts["student_count"] == 0:
         raise HTTPException(status_code=400, detail="Drive must have at least one student to submit")
 
     drive.status = "submitted"
     db.commit()
     db.refresh(drive)
+    drive_events.publish_drive(drive, "submitted")
 
-    drive_dict = format_drive_response(drive, db)
-    drive_dict["question_count"] = db.query(Question).filter(Question.drive_id == drive.id).count()
-    drive_dict["student_count"] = db.query(Student).filter(Student.drive_id == drive.id).count()
+    drive_dict = format_drive_response(drive, db, include_counts=True)
     return drive_dict
 
 @router.put("/drives/{drive_id}/status", response_model=DriveResponse)
@@ -361,11 +350,11 @@ def update_drive_status(
 
     drive.status = status_data.status
     db.commit()
+    exam_scheduler.notify()
     db.refresh(drive)
+    drive_events.publish_drive(drive, "status_changed")
 
-    drive_dict = format_drive_response(drive, db)
-    drive_dict["question_count"] = db.query(Question).filter(Question.drive_id == drive.id).count()
-    drive_dict["student_count"] = db.query(Student).filter(Student.drive_id == drive.id).count()
+    drive_dict = format_drive_response(drive, db, include_counts=True)
     return drive_dict
 
 @router.post("/drives/{drive_id}/duplicate", response_model=DriveResponse)
@@ -427,39 +416,51 @@ def duplicate_drive(
 
     db.commit()
     db.refresh(new_drive)
+    drive_events.publish_drive(new_drive, "created")
 
-    drive_dict = format_drive_response(new_drive, db)
-    drive_dict["question_count"] = db.query(Question).filter(Question.drive_id == new_drive.id).count()
-    drive_dict["student_count"] = db.query(Student).filter(Student.drive_id == new_drive.id).count()
+    drive_dict = format_drive_response(new_drive, db, include_counts=True)
     return drive_dict
 
 # Question management routes
 @router.get("/drives/{drive_id}/questions", response_model=List[QuestionResponse])
-def get_drive_questions(
+async def get_drive_questions(
     drive_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     company: dict = Depends(get_company_user)
 ):
     """Get all questions for a drive"""
-    drive = db.query(Drive).filter(
-        Drive.id == drive_id,
-        Drive.company_id == company.id
-    ).first()
+    drive_id_found = await db.scalar(
+        select(Drive.id).where(Drive.id == drive_id, Drive.company_id == company.id)
+    )
 
-    if not drive:
+    if drive_id_found is None:
         raise HTTPException(status_code=404, detail="Drive not found")
 
-    questions = db.query(Question).filter(Question.drive_id == drive_id).all()
-    return questions
+    questions = await db.scalars(select(Question).where(Question.drive_id == drive_id))
+    return questions.all()
+
+def _rejected_csv_response(detail: str, errors: List[str]) -> JSONResponse:
+    """400 for a CSV upload that inserted nothing, listing every row error alongside the detail"""
+    if errors:
+        detail += f" ({len(errors)} row errors, first: {errors[0]})"
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": detail, "error_count": len(errors), "errors": errors}
+    )
 
 @router.post("/drives/{drive_id}/questions/csv-upload")
+@router.post("/drives/{drive_id}/upload-questions")
 def upload_questions_csv(
     drive_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     company: dict = Depends(get_company_user)
 ):
-    """Upload questions from CSV file. Expected columns: question, option_a, option_b, option_c, option_d, correct_answer, points"""
+    """
+    Upload questions from CSV file.
+    Expected columns: question (or question_text), option_a, option_b, option_c, option_d,
+    correct_answer (option text or A/B/C/D), points (optional)
+    """
     drive = db.query(Drive).filter(
         Drive.id == drive_id,
         Drive.company_id == company.id
@@ -475,49 +476,34 @@ def upload_questions_csv(
         raise HTTPException(status_code=400, detail="File must be CSV format")
 
     try:
-        content = file.file.read().decode('utf-8')
-        csv_reader = csv.DictReader(io.StringIO(content))
-
-        required_columns = ['question', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_answer']
-        if not all(col in csv_reader.fieldnames for col in required_columns):
-            raise HTTPException(status_code=400, detail=f"CSV must contain columns: {', '.join(required_columns)}")
-
-        questions = []
-        for row_num, row in enumerate(csv_reader, start=2):  # Start from 2 because of header
-            try:
-                points = int(row.get('points', 1))
-
-                # Validate correct_answer is one of the options
-                options = [row['option_a'], row['option_b'], row['option_c'], row['option_d']]
-                if row['correct_answer'] not in options:
-                    raise ValueError(f"Row {row_num}: correct_answer must be one of the provided options")
-
-                question = Question(
-                    drive_id=drive_id,
-                    question_text=row['question'].strip(),
-                    option_a=row['option_a'].strip(),
-                    option_b=row['option_b'].strip(),
-                    option_c=row['option_c'].strip(),
-                    option_d=row['option_d'].strip(),
-                    correct_answer=row['correct_answer'].strip(),
-                    points=points
-                )
-                questions.append(question)
-
-            except (ValueError, KeyError) as e:
-                raise HTTPException(status_code=400, detail=f"Error in row {row_num}: {str(e)}")
-
-        if not questions:
-            raise HTTPException(status_code=400, detail="No valid questions found in CSV")
-
-        db.add_all(questions)
+        result = import_questions_csv(file.file, drive_id, db)
+        errors = result["errors"]
+
+        if result["inserted"] == 0:
+            db.rollback()
+            return _rejected_csv_response("No valid questions found in CSV", errors)
+
         db.commit()
 
-        return {"message": f"Successfully uploaded {len(questions)} questions from CSV"}
+        return {
+            "success": True,
+            "message": f"Successfully uploaded {result['inserted']} questions from CSV, {len(errors)} errors",
+            "added_count": result["inserted"],
+            "error_count": len(errors),
+            "errors": errors
+        }
 
+    except HTTPException:
+        db.rollback()
+        raise
+    except QuestionImportError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
     except UnicodeDecodeError:
+        db.rollback()
         raise HTTPException(status_code=400, detail="File encoding not supported. Please use UTF-8")
     except Exception as e:
+        db.rollback()
         raise HTTPException(status_code=400, detail=f"Error processing CSV: {str(e)}")
 
 @router.post("/drives/{drive_id}/students/csv-upload")
@@ -543,86 +529,78 @@ def upload_students_csv(
         raise HTTPException(status_code=400, detail="File must be CSV format")
 
     try:
-        content = file.file.read().decode('utf-8')
-        csv_reader = csv.DictReader(io.StringIO(content))
-
-        required_columns = ['roll_number', 'email', 'name']
-        if not all(col in csv_reader.fieldnames for col in required_columns):
-            raise HTTPException(status_code=400, detail=f"CSV must contain columns: {', '.join(required_columns)}")
-
-        students = []
-        for row_num, row in enumerate(csv_reader, start=2):  # Start from 2 because of header
-            try:
-                # Check if student already exists in this drive
-                existing_student = db.query(Student).filter(
-                    Student.drive_id == drive_id,
-                    Student.roll_number == row['roll_number'].strip()
-                ).first()
-
-                if existing_student:
-                    continue  # Skip duplicate students
-
-                student = Student(
-                    drive_id=drive_id,
-                    company_id=company.id,
-                    roll_number=row['roll_number'].strip(),
-                    email=row['email'].strip().lower(),
-                    name=row['name'].strip()
-                )
-                students.append(student)
-
-            except (ValueError, KeyError) as e:
-                raise HTTPException(status_code=400, detail=f"Error in row {row_num}: {str(e)}")
-
-        if not students:
-            raise HTTPException(status_code=400, detail="No new students found in CSV (duplicates skipped)")
-
-        db.add_all(students)
+        result = import_students_csv(file.file, drive_id, company.id, db)
+        errors = result["errors"]
+
+        if result["inserted"] == 0:
+            db.rollback()
+            return _rejected_csv_response("No new students found in CSV (duplicates skipped)", errors)
+
         db.commit()
+        student_directory.invalidate(drive_id)
 
-        return {"message": f"Successfully uploaded {len(students)} new students from CSV"}
+        return {
+            "message": f"Successfully uploaded {result['inserted']} new students from CSV, {len(errors)} errors",
+            "inserted_count": result["inserted"],
+            "skipped_count": result["skipped"],
+            "error_count": len(errors),
+            "errors": errors
+        }
 
+    except HTTPException:
+        db.rollback()
+        raise
+    except StudentImportError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
     except UnicodeDecodeError:
+        db.rollback()
         raise HTTPException(status_code=400, detail="File encoding not supported. Please use UTF-8")
     except Exception as e:
+        db.rollback()
         raise HTTPException(status_code=400, detail=f"Error processing CSV: {str(e)}")
 
 @router.get("/drives/{drive_id}/students", response_model=List[StudentResponse])
-def get_drive_students(
+async def get_drive_students(
     drive_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     company_id: int = Depends(get_effective_company_id)
 ):
     """Get all students for a drive (accessible by company owner or admin)"""
-    drive = db.query(Drive).filter(
-        Drive.id == drive_id,
-        Drive.company_id == company_id
-    ).first()
+    drive_id_found = await db.scalar(
+        select(Drive.id).where(Drive.id == drive_id, Drive.company_id == company_id)
+    )
 
-    if not drive:
+    if drive_id_found is None:
         raise HTTPException(status_code=404, detail="Drive not found")
 
-    students = db.query(Student).filter(Student.drive_id == drive_id).all()
-    return students
+    students = await db.scalars(select(Student).where(Student.drive_id == drive_id))
+    return students.all()
 
 # Reference data endpoints for targeting
 @router.get("/colleges", response_model=List[CollegeResponse])
 def get_approved_colleges(
+    request: Request,
     db: Session = Depends(get_db),
     company: dict = Depends(get_company_user)
 ):
-    """Get all approved colleges for targeting"""
-    colleges = db.query(College).filter(College.is_approved == True).all()
-    return colleges
+    """Get all approved colleges for targeting (cached; send If-None-Match for a 304)"""
+    return reference_cache.response(
+        request, COLLEGES, "approved",
+        lambda: db.query(College).filter(College.is_approved == True).all()
+    )
 
 @router.get("/student-groups", response_model=List[StudentGroupResponse])
 def get_approved_student_groups(
+    request: Request,
     db: Session = Depends(get_db),
     company: dict = Depends(get_company_user)
 ):
-    """Get all approved student groups for targeting"""
-    groups = db.query(StudentGroup).filter(StudentGroup.is_approved == True).all()
-    return groups
+    """Get all approved student groups for targeting (cached; send If-None-Match for a 304)"""
+    return reference_cache.response(
+        request, STUDENT_GROUPS, "approved",
+        lambda: db.query(StudentGroup).filter(StudentGroup.is_approved == True).all()
+    )
 
 # Email Template Management
 @router.get("/email-template", response_model=EmailTemplateResponse)
@@ -678,6 +656,7 @@ def update_email_template(
 
     db.commit()
     db.refresh(company_obj)
+    EmailTemplateProcessor.invalidate_company_templates(company_obj.id)
 
     return {
         "subject_template": company_obj.email_subject_template,
@@ -706,7 +685,7 @@ def preview_email_template(
         sample_data
     )
     rendered_body = EmailTemplateProcessor.render_template(
-        preview_data.body_template,
+        EmailTemplateProcessor.with_exam_id(preview_data.body_template),
         sample_data
     )
 
@@ -717,13 +696,52 @@ def preview_email_template(
     }
 
 # Email Sending
-@router.post("/drives/{drive_id}/email-students", response_model=EmailSendResponse)
+def format_email_job_response(job: EmailJob, db: Session):
+    """Format email job progress, including the students whose email failed"""
+    failed = db.query(Student.roll_number, Student.email, EmailDelivery.error).join(
+        EmailDelivery, EmailDelivery.student_id == Student.id
+    ).filter(
+        EmailDelivery.job_id == job.id,
+        EmailDelivery.status == "failed"
+    ).all()
+
+    messages = {
+        "queued": "Email sending queued",
+        "running": "Email sending in progress",
+        "completed": "Email sending completed",
+        "failed": "Email sending failed"
+    }
+
+    return {
+        "job_id": job.id,
+        "drive_id": job.drive_id,
+        "status": job.status,
+        "message": messages.get(job.status, job.status),
+        "total_students": job.total_count,
+        "sent_count": job.sent_count,
+        "failed_count": job.failed_count,
+        "remaining_count": max(0, job.total_count - job.sent_count - job.failed_count),
+        "failed_emails": [
+            {"student_roll": roll, "student_email": email, "error": error}
+            for roll, email, error in failed
+        ],
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at
+    }
+
+@router.post("/drives/{drive_id}/email-students", response_model=EmailJobResponse, status_code=status.HTTP_202_ACCEPTED)
 def email_students(
     drive_id: int,
     db: Session = Depends(get_db),
     company: dict = Depends(get_company_user)
 ):
-    """Send login credentials to students via email (only for approved drives)"""
+    """
+    Queue login credential emails for the drive's students (only for approved drives).
+    Returns a job to poll via GET /drives/{drive_id}/email-jobs/{job_id}.
+    Students who were already emailed successfully are skipped.
+    """
     # Validate email configuration
     if not settings.smtp_username or not settings.smtp_password:
         raise HTTPException(
@@ -743,86 +761,59 @@ def email_students(
     if not drive.is_approved:
         raise HTTPException(status_code=400, detail="Drive must be approved before emailing students")
 
-    # Get students
-    students = db.query(Student).filter(Student.drive_id == drive_id).all()
-    if not students:
-        raise HTTPException(status_code=400, detail="No students found for this drive")
+    active_job = db.query(EmailJob).filter(
+        EmailJob.drive_id == drive_id,
+        EmailJob.status.in_(ACTIVE_JOB_STATUSES)
+    ).first()
+    if active_job:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Email job {active_job.id} is already in progress for this drive"
+        )
 
-    # Get company template
-    company_obj = db.query(Company).filter(Company.id == company.id).first()
-    if not company_obj:
-        raise HTTPException(status_code=404, detail="Company not found")
+    pending_count = pending_students_query(db, drive_id).count()
+    if pending_count == 0:
+        if db.query(Student).filter(Student.drive_id == drive_id).count() == 0:
+            raise HTTPException(status_code=400, detail="No students found for this drive")
+        raise HTTPException(status_code=400, detail="All students have already been emailed")
 
+    job = EmailJob(
+        drive_id=drive_id,
+        company_id=company.id,
+        status="queued",
+        total_count=pending_count
+    )
+    db.add(job)
     try:
-        # Create SMTP session
-        server = smtplib.SMTP(settings.smtp_server, settings.smtp_port)
-        server.starttls()
-        server.login(settings.smtp_username, settings.smtp_password)
-
-        sent_count = 0
-        failed_emails = []
-
-        for student in students:
-            try:
-                # Prepare email variables
-                email_variables = EmailTemplateProcessor.prepare_email_variables(
-                    student, drive, company_obj
-                )
-
-                # Render email content
-                subject = EmailTemplateProcessor.render_template(
-                    company_obj.email_subject_template,
-                    email_variables
-                )
-                body = EmailTemplateProcessor.render_template(
-                    company_obj.email_body_template,
-                    email_variables
-                )
-
-                # Create email message
-                message = MIMEMultipart()
-                message["From"] = f"{settings.smtp_from_name} <{settings.smtp_username}>"
-                message["To"] = student.email
-                message["Subject"] = subject
-
-                # Attach body
-                message.attach(MIMEText(body, "plain"))
-
-                # Send email
-                server.send_message(message)
-                sent_count += 1
-
-            except Exception as e:
-                failed_emails.append({
-                    "student_roll": student.roll_number,
-                    "student_email": student.email,
-                    "error": str(e)
-                })
-
-        # Close SMTP session
-        server.quit()
+        db.commit()
+    except IntegrityError:
+        # Another request queued a job for this drive after the check above
+        db.rollback()
+        raise HTTPException(status_code=409, detail="An email job is already in progress for this drive")
+    db.refresh(job)
 
-        return {
-            "success": True,
-            "message": f"Email sending completed",
-            "sent_count": sent_count,
-            "failed_count": len(failed_emails),
-            "total_students": len(students),
-            "failed_emails": failed_emails
-        }
+    enqueue_email_job(job.id)
 
-    except smtplib.SMTPAuthenticationError:
-        raise HTTPException(
-            status_code=400,
-            detail="Email authentication failed. Please check SMTP credentials."
-        )
-    except smtplib.SMTPConnectError:
-        raise HTTPException(
-            status_code=500,
-            detail="Could not connect to SMTP server. Please check your internet connection."
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Email server error: {str(e)}")
+    return format_email_job_response(job, db)
+
+@router.get("/drives/{drive_id}/email-jobs/{job_id}", response_model=EmailJobResponse)
+def get_email_job(
+    drive_id: int,
+    job_id: int,
+    db: Session = Depends(get_db),
+    company: dict = Depends(get_company_user)
+):
+    """Get progress of an email job: sent, failed and remaining counts"""
+    job = db.query(EmailJob).filter(
+        EmailJob.id == job_id,
+        EmailJob.drive_id == drive_id,
+        EmailJob.company_id == company.id
+    ).first()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Email job not found")
+
+    return format_email_job_response(job, db)
 
 @router.get("/drives/{drive_id}/email-status", response_model=EmailStatusResponse)
 def get_email_status(
@@ -855,7 +846,7 @@ def get_email_status(
             company_obj.email_subject_template, sample_data
         )[:100] + "..."
         preview_body = EmailTemplateProcessor.render_template(
-            company_obj.email_body_template, sample_data
+            EmailTemplateProcessor.with_exam_id(company_obj.email_body_template), sample_data
         )[:200] + "..."
 
         template_preview = {
@@ -888,93 +879,8 @@ def get_email_status(
     }
 
 # Bulk Upload Endpoints
-@router.post("/drives/{drive_id}/upload-questions")
-async def upload_questions_csv(
-    drive_id: int,
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    company: dict = Depends(get_company_user)
-):
-    """Upload questions from CSV file"""
-    # Verify drive ownership
-    drive = db.query(Drive).filter(
-        Drive.id == drive_id,
-        Drive.company_id == company.id
-    ).first()
-
-    if not drive:
-        raise HTTPException(status_code=404, detail="Drive not found")
-
-    if drive.is_approved:
-        raise HTTPException(status_code=400, detail="Cannot upload questions to approved drive")
-
-    if not file.filename.endswith('.csv'):
-        raise HTTPException(status_code=400, detail="File must be a CSV")
-
-    try:
-        # Read CSV content
-        content = await file.read()
-        csv_data = content.decode('utf-8')
-        csv_reader = csv.DictReader(io.StringIO(csv_data))
-
-        added_count = 0
-        error_count = 0
-        errors = []
-
-        for row_num, row in enumerate(csv_reader, start=2):  # Start from row 2 (after header)
-            try:
-                # Validate required fields
-                required_fields = ['question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_answer']
-                missing_fields = [field for field in required_fields if not row.get(field, '').strip()]
-
-                if missing_fields:
-                    errors.append(f"Row {row_num}: Missing fields: {', '.join(missing_fields)}")
-                    error_count += 1
-                    continue
-
-                # Validate correct answer
-                correct_answer = row['correct_answer'].strip().upper()
-                if correct_answer not in ['A', 'B', 'C', 'D']:
-                    errors.append(f"Row {row_num}: Correct answer must be A, B, C, or D")
-                    error_count += 1
-                    continue
-
-                # Create question
-                question = Question(
-                    drive_id=drive_id,
-                    question_text=row['question_text'].strip(),
-                    option_a=row['option_a'].strip(),
-                    option_b=row['option_b'].strip(),
-                    option_c=row['option_c'].strip(),
-                    option_d=row['option_d'].strip(),
-                    correct_answer=correct_answer,
-                    difficulty=row.get('difficulty', 'medium').strip().lower(),
-                    points=int(row.get('points', 1))
-                )
-
-                db.add(question)
-                added_count += 1
-
-            except Exception as e:
-                errors.append(f"Row {row_num}: {str(e)}")
-                error_count += 1
-
-        db.commit()
-
-        return {
-            "success": True,
-            "message": f"Upload completed. Added {added_count} questions, {error_count} errors.",
-            "added_count": added_count,
-            "error_count": error_count,
-            "errors": errors[:10]  # Limit to first 10 errors
-        }
-
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=400, detail=f"Error processing CSV: {str(e)}")
-
 @router.post("/drives/{drive_id}/upload-students")
-async def upload_students_csv(
+def upload_students_bulk(
     drive_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
@@ -994,86 +900,24 @@ async def upload_students_csv(
         raise HTTPException(status_code=400, detail="File must be a CSV")
 
     try:
-        # Read CSV content
-        content = await file.read()
-        csv_data = content.decode('utf-8')
-        csv_reader = csv.DictReader(io.StringIO(csv_data))
-
-        added_count = 0
-        error_count = 0
-        errors = []
-
-        for row_num, row in enumerate(csv_reader, start=2):  # Start from row 2 (after header)
-            try:
-                # Validate required fields
-                required_fields = ['name', 'email', 'roll_number']
-                missing_fields = [field for field in required_fields if not row.get(field, '').strip()]
-
-                if missing_fields:
-                    errors.append(f"Row {row_num}: Missing fields: {', '.join(missing_fields)}")
-                    error_count += 1
-                    continue
-
-                # Check if student already exists for this drive
-                existing_student = db.query(Student).filter(
-                    Student.drive_id == drive_id,
-                    Student.email == row['email'].strip()
-                ).first()
-
-                if existing_student:
-                    errors.append(f"Row {row_num}: Student with email {row['email']} already exists")
-                    error_count += 1
-                    continue
-
-                # Get or create college
-                college_name = row.get('college', '').strip()
-                college = None
-                if college_name:
-                    college = db.query(College).filter(College.name == college_name).first()
-                    if not college:
-                        # Create new college (will need admin approval)
-                        college = College(name=college_name, is_approved=False)
-                        db.add(college)
-                        db.flush()  # To get the college ID
-
-                # Get or create student group
-                group_name = row.get('student_group', '').strip()
-                student_group = None
-                if group_name:
-                    student_group = db.query(StudentGroup).filter(StudentGroup.name == group_name).first()
-                    if not student_group:
-                        # Create new student group (will need admin approval)
-                        student_group = StudentGroup(name=group_name, is_approved=False)
-                        db.add(student_group)
-                        db.flush()  # To get the group ID
-
-                # Create student
-                student = Student(
-                    drive_id=drive_id,
-                    name=row['name'].strip(),
-                    email=row['email'].strip(),
-                    roll_number=row['roll_number'].strip(),
-                    college_id=college.id if college else None,
-                    student_group_id=student_group.id if student_group else None
-                )
-
-                db.add(student)
-                added_count += 1
-
-            except Exception as e:
-                errors.append(f"Row {row_num}: {str(e)}")
-                error_count += 1
-
+        result = import_students_csv(file.file, drive_id, company.id, db)
         db.commit()
+        student_directory.invalidate(drive_id)
+
+        errors = result["errors"]
 
         return {
             "success": True,
-            "message": f"Upload completed. Added {added_count} students, {error_count} errors.",
-            "added_count": added_count,
-            "error_count": error_count,
-            "errors": errors[:10]  # Limit to first 10 errors
+            "message": f"Upload completed. Added {result['inserted']} students, {result['skipped']} skipped, {len(errors)} errors.",
+            "added_count": result["inserted"],
+            "skipped_count": result["skipped"],
+            "error_count": len(errors),
+            "errors": errors
         }
 
+    except StudentImportError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Error processing CSV: {str(e)}")
@@ -1106,11 +950,12 @@ def start_exam(
     drive.status = "ongoing"
     
     db.commit()
+    exam_scheduler.notify()
     db.refresh(drive)
+    drive_events.publish_drive(drive, "started")
+    paper_snapshots.freeze(db, drive)
 
-    drive_dict = format_drive_response(drive, db)
-    drive_dict["question_count"] = db.query(Question).filter(Question.drive_id == drive.id).count()
-    drive_dict["student_count"] = db.query(Student).filter(Student.drive_id == drive.id).count()
+    drive_dict = format_drive_response(drive, db, include_counts=True)
     
     return {
         "success": True,
@@ -1120,16 +965,15 @@ def start_exam(
 
 
 @router.post("/drives/{drive_id}/end")
-def end_exam(
+async def end_exam(
     drive_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     company: dict = Depends(get_company_user)
 ):
     """Manually end the exam - sets actual_end time and changes status to completed"""
-    drive = db.query(Drive).filter(
-        Drive.id == drive_id,
-        Drive.company_id == company.id
-    ).first()
+    drive = await db.scalar(
+        select(Drive).where(Drive.id == drive_id, Drive.company_id == company.id)
+    )
 
     if not drive:
         raise HTTPException(status_code=404, detail="Drive not found")
@@ -1143,13 +987,16 @@ def end_exam(
     # Set the actual end time and update status
     drive.actual_end = datetime.utcnow()
     drive.status = "completed"
-    
-    db.commit()
-    db.refresh(drive)
 
-    drive_dict = format_drive_response(drive, db)
-    drive_dict["question_count"] = db.query(Question).filter(Question.drive_id == drive.id).count()
-    drive_dict["student_count"] = db.query(Student).filter(Student.drive_id == drive.id).count()
+    # Answers saved before the end, by any worker, must be in the database once the exam ends
+    attempt_ids = await db.scalars(select(ExamAttempt.id).where(ExamAttempt.drive_id == drive_id))
+    await answer_buffer.persist(db, attempt_ids)
+    await db.commit()
+    exam_scheduler.notify()
+    await db.refresh(drive)
+    drive_events.publish_drive(drive, "ended")
+
+    drive_dict = await db.run_sync(lambda session: format_drive_response(drive, session, include_counts=True))
     
     return {
         "success": True,
@@ -1158,67 +1005,73 @@ def end_exam(
     }
 
 
-@router.get("/drives/{drive_id}/exam-status")
-def get_exam_status(
+@router.post("/drives/{drive_id}/grade", response_model=GradingSummaryResponse)
+async def grade_exam(
     drive_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     company: dict = Depends(get_company_user)
 ):
-    """Get the current exam status including auto-end check and scheduled auto-start"""
-    drive = db.query(Drive).filter(
-        Drive.id == drive_id,
-        Drive.company_id == company.id
-    ).first()
+    """Grade all attempts of an ended exam (re-grading replaces earlier results)"""
+    drive = await db.scalar(
+        select(Drive).where(Drive.id == drive_id, Drive.company_id == company.id)
+    )
 
     if not drive:
         raise HTTPException(status_code=404, detail="Drive not found")
 
-    # Check if students exist (indicates emails have been sent or ready to send)
-    student_count = db.query(Student).filter(Student.drive_id == drive_id).count()
-    has_students = student_count > 0
-
-    # Check if exam should be auto-ended
-    should_auto_end = False
-    time_remaining_minutes = None
-    
-    if drive.actual_start and not drive.actual_end:
-        elapsed_time = datetime.utcnow() - drive.actual_start
-        elapsed_minutes = elapsed_time.total_seconds() / 60
-        
-        if elapsed_minutes >= drive.duration_minutes:
-            # Auto-end the exam
-            drive.actual_end = datetime.utcnow()
-            drive.status = "completed"
-            db.commit()
-            should_auto_end = True
-        else:
-            time_remaining_minutes = drive.duration_minutes - elapsed_minutes
-
-    # Determine exam state
     if not drive.actual_start:
-        exam_state = "not_started"
-    elif drive.actual_end:
-        exam_state = "ended"
-    else:
-        exam_state = "ongoing"
+        raise HTTPException(status_code=400, detail="Exam has not been started")
 
-    # Convert time remaining to seconds for consistency
-    time_remaining_seconds = time_remaining_minutes * 60 if time_remaining_minutes else None
+    if not drive.actual_end and exam_end_deadline(drive) > datetime.utcnow():
+        raise HTTPException(status_code=400, detail="Exam has not ended yet")
 
-    return {
-        "drive_id": drive_id,
-        "exam_state": exam_state,
-        "actual_start": drive.actual_start,
-        "actual_end": drive.actual_end,
-        "scheduled_start": drive.scheduled_start,
-        "duration_minutes": drive.duration_minutes,
-        "time_remaining": time_remaining_seconds,
-        "time_remaining_minutes": time_remaining_minutes,
-        "should_auto_end": should_auto_end,
-        "can_start": drive.is_approved and not drive.actual_start and has_students,
-        "can_end": drive.actual_start and not drive.actual_end,
-        "status": drive.status,
-        "is_scheduled": drive.scheduled_start is not None,
-        "has_students": has_students,
-        "student_count": student_count
-    }
+    # Answers any worker still holds in its write-behind buffer count too
+    attempt_ids = await db.scalars(select(ExamAttempt.id).where(ExamAttempt.drive_id == drive_id))
+    await answer_buffer.persist(db, attempt_ids)
+    return await grade_drive(db, drive_id)
+
+@router.get("/drives/{drive_id}/results", response_model=List[ExamResultResponse])
+async def get_exam_results(
+    drive_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    company_id: int = Depends(get_effective_company_id)
+):
+    """Graded results of a drive, best first (accessible by company owner or admin)"""
+    drive_id_found = await db.scalar(
+        select(Drive.id).where(Drive.id == drive_id, Drive.company_id == company_id)
+    )
+
+    if drive_id_found is None:
+        raise HTTPException(status_code=404, detail="Drive not found")
+
+    rows = await db.execute(
+        select(
+            ExamResult.student_id, Student.roll_number, Student.name, Student.email,
+            ExamResult.score, ExamResult.max_score, ExamResult.correct_count,
+            ExamResult.answered_count, ExamResult.rank, ExamResult.percentile,
+            (ExamAttempt.status == "submitted").label("submitted"), ExamResult.graded_at
+        )
+        .join(Student, ExamResult.student_id == Student.id)
+        .join(ExamAttempt, ExamResult.attempt_id == ExamAttempt.id)
+        .where(ExamResult.drive_id == drive_id)
+        .order_by(ExamResult.rank, Student.roll_number)
+    )
+    return [dict(row._mapping) for row in rows]
+
+@router.get("/drives/{drive_id}/exam-status")
+async def get_exam_status(
+    drive_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    company: dict = Depends(get_company_user)
+):
+    """Get the current exam status (read-only; see company_exam_status)"""
+    drive = await db.scalar(
+        select(Drive).where(Drive.id == drive_id, Drive.company_id == company.id)
+    )
+
+    if not drive:
+        raise HTTPException(status_code=404, detail="Drive not found")
+
+    # Check if students exist (indicates emails have been sent or ready to send)
+    student_counts = await load_student_counts(db, [drive_id])
+    return company_exam_status(drive, student_counts[drive_id])
@@ -0,0 +1,249 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from app.database.connection import get_async_db
+from app.database.config import settings
+from app.models import ExamAttempt, StudentAnswer
+from app.schemas.exam_session import (
+    StudentLogin, StudentLoginResponse, StudentExamInfo, ExamPaperResponse,
+    SaveAnswersRequest, SavedAnswersResponse, SubmitExamRequest, SubmitExamResponse
+)
+from app.auth import get_current_student
+from app.auth.security import create_access_token
+from app.utils.drive_events import exam_end_deadline
+from app.utils.student_directory import student_directory, DriveRoster
+from app.utils.paper_snapshots import paper_snapshots
+from app.utils.answer_buffer import answer_buffer
+from app.utils.exam_session import get_attempt, get_or_create_attempt, load_answers, answers_to_dict
+
+router = APIRouter()
+
+def _session_lifetime(roster: DriveRoster) -> timedelta:
+    """
+    Token lifetime: until the exam's end plus a grace period. Before the exam
+    starts the end is estimated from scheduled_start (or now) plus the duration;
+    a student whose token expires before a late manual start simply logs in again.
+    """
+    now = datetime.utcnow()
+    end = exam_end_deadline(roster)
+    if end is None:
+        start = max(now, roster.scheduled_start or now)
+        end = start + timedelta(minutes=roster.duration_minutes or 0)
+    return end - now + timedelta(minutes=settings.student_session_grace_minutes)
+
+def _exam_info(roster: DriveRoster, attempt) -> dict:
+    return {
+        "drive_id": roster.drive_id,
+        "title": roster.title,
+        "duration_minutes": roster.duration_minutes,
+        "scheduled_start": roster.scheduled_start,
+        "actual_start": roster.actual_start,
+        "exam_state": roster.exam_state(),
+        "time_remaining": roster.time_remaining(),
+        "attempt_status": attempt.status if attempt else None,
+        "submitted_at": attempt.submitted_at if attempt else None
+    }
+
+async def get_student_roster(
+    session: dict = Depends(get_current_student),
+    db: AsyncSession = Depends(get_async_db)
+) -> DriveRoster:
+    """The roster of the session's drive, checking the student is still enrolled"""
+    roster = await student_directory.get(db, session["drive_id"])
+    if roster is None or not roster.has_student(session["student_id"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Session is no longer valid"
+        )
+    return roster
+
+def _require_answering(roster: DriveRoster):
+    if not roster.accepts_answers():
+        raise HTTPException(status_code=400, detail="Exam is not in progress")
+
+async def _validated_answers(roster: DriveRoster, items) -> dict:
+    """{question_id: selected_option} from request items, checked against the frozen paper"""
+    answers = answers_to_dict(items)
+    snapshot = await paper_snapshots.get(roster.drive_id)
+    if snapshot is None or not snapshot.question_ids.issuperset(answers):
+        raise HTTPException(status_code=400, detail="Answers reference questions outside this exam")
+    return answers
+
+@router.post("/login", response_model=StudentLoginResponse)
+async def student_login(
+    login: StudentLogin,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Log a student into a drive with roll number (or email) and the drive
+    password from the invitation email. Credentials are checked against the
+    cached drive roster, so a login normally costs two small queries (the
+    drive's current state and the student's attempt).
+    """
+    roster, student = await student_directory.authenticate(db, login.drive_id, login.identifier, login.password)
+
+    if student is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid exam ID, roll number or password"
+        )
+
+    if not roster.is_open():
+        raise HTTPException(status_code=403, detail="This exam is not open for login")
+
+    student_id, roll_number, name = student
+    access_token = create_access_token(
+        data={"sub": str(student_id), "user_type": "student", "drive_id": roster.drive_id},
+        expires_delta=_session_lifetime(roster)
+    )
+    attempt = await get_attempt(db, roster.drive_id, student_id)
+
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "student_id": student_id,
+        "roll_number": roll_number,
+        "name": name,
+        "exam": _exam_info(roster, attempt)
+    }
+
+@router.get("/exam", response_model=StudentExamInfo)
+async def get_exam(
+    session: dict = Depends(get_current_student),
+    roster: DriveRoster = Depends(get_student_roster),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Exam timing and the student's attempt status (poll this while waiting for the start)"""
+    attempt = await get_attempt(db, roster.drive_id, session["student_id"])
+    return _exam_info(roster, attempt)
+
+@router.get("/paper", response_model=ExamPaperResponse)
+async def get_paper(
+    request: Request,
+    session: dict = Depends(get_current_student),
+    roster: DriveRoster = Depends(get_student_roster),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Question paper (without correct answers); the first fetch starts the
+    student's attempt. Served from the drive's frozen snapshot with a strong
+    ETag, so re-fetches with If-None-Match are answered 304. Time remaining
+    comes from GET /exam, keeping the paper itself immutable.
+    """
+    _require_answering(roster)
+
+    attempt = await get_or_create_attempt(db, roster.drive_id, session["student_id"])
+    if attempt.status == "submitted":
+        raise HTTPException(status_code=400, detail="Exam already submitted")
+
+    snapshot = await paper_snapshots.get(roster.drive_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Exam not found")
+    return snapshot.response(request)
+
+@router.get("/answers", response_model=SavedAnswersResponse)
+async def get_answers(
+    session: dict = Depends(get_current_student),
+    roster: DriveRoster = Depends(get_student_roster),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Answers saved so far, for resuming after a reload or on another device"""
+    attempt = await get_attempt(db, roster.drive_id, session["student_id"])
+    if not attempt:
+        raise HTTPException(status_code=404, detail="Exam not started yet")
+
+    answers = await load_answers(db, attempt.id)
+    # Saves not yet flushed by the write-behind buffer are newer than the database
+    answers.update(answer_buffer.pending_for(attempt.id))
+    return {
+        "answers": [
+            {"question_id": question_id, "selected_option": option}
+            for question_id, option in answers.items()
+        ],
+        "attempt_status": attempt.status
+    }
+
+@router.put("/answers", response_model=SavedAnswersResponse)
+async def put_answers(
+    payload: SaveAnswersRequest,
+    session: dict = Depends(get_current_student),
+    roster: DriveRoster = Depends(get_student_roster),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Save answers; send only what changed since the last save. Saves are
+    acknowledged once spilled to the local log and buffered, and are written
+    to the database in batches (see AnswerBuffer).
+    """
+    _require_answering(roster)
+
+    attempt = await get_attempt(db, roster.drive_id, session["student_id"])
+    if not attempt:
+        raise HTTPException(status_code=404, detail="Exam not started yet")
+    if attempt.status == "submitted":
+        raise HTTPException(status_code=400, detail="Exam already submitted")
+
+    answers = await _validated_answers(roster, payload.answers)
+    answer_buffer.add(attempt.id, answers)
+
+    return {
+        "answers": [
+            {"question_id": question_id, "selected_option": option}
+            for question_id, option in answers.items()
+        ],
+        "attempt_status": attempt.status
+    }
+
+@router.post("/submit", response_model=SubmitExamResponse)
+async def submit_exam(
+    payload: SubmitExamRequest,
+    session: dict = Depends(get_current_student),
+    roster: DriveRoster = Depends(get_student_roster),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Submit the exam, optionally with final unsaved answers. Submitting after the
+    exam has ended is allowed (within the session grace period) but final
+    answers are then rejected.
+    """
+    attempt = await get_attempt(db, roster.drive_id, session["student_id"])
+    if not attempt:
+        raise HTTPException(status_code=404, detail="Exam not started yet")
+    if attempt.status == "submitted":
+        raise HTTPException(status_code=400, detail="Exam already submitted")
+
+    if payload.answers:
+        _require_answering(roster)
+        answer_buffer.add(attempt.id, await _validated_answers(roster, payload.answers))
+
+    # Everything the student saved, through whichever worker, is written in
+    # the submitting transaction
+    await answer_buffer.persist(db, [attempt.id])
+
+    # Conditional update so concurrent submits (e.g. two tabs) submit once
+    submitted_at = datetime.utcnow()
+    result = await db.execute(
+        update(ExamAttempt).where(
+            ExamAttempt.id == attempt.id,
+            ExamAttempt.status == "in_progress"
+        ).values(status="submitted", submitted_at=submitted_at).returning(ExamAttempt.id)
+    )
+    if result.scalar() is None:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Exam already submitted")
+
+    answered_count = await db.scalar(
+        select(func.count(StudentAnswer.id)).where(
+            StudentAnswer.attempt_id == attempt.id,
+            StudentAnswer.selected_option.isnot(None)
+        )
+    )
+    await db.commit()
+
+    return {
+        "success": True,
+        "message": "Exam submitted successfully",
+        "submitted_at": submitted_at,
+        "answered_count": answered_count
+    }
@@ -3,3 +3,5 @@ from .drive import *
 from .question import *
 from .student import *
 from .company import *
+from .exam_session import *
+from .result import *
@@ -21,6 +21,10 @@ class Token(BaseModel):
     access_token: str
     token_type: str
 
+class StreamToken(BaseModel):
+    stream_token: str
+    expires_in: int  # Seconds; the token is checked once, when the stream opens
+
 class UserResponse(BaseModel):
     id: int
     username: Optional[str] = None
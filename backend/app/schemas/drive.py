@@ -53,6 +53,8 @@ class DriveResponse(BaseModel):
     status: str  # draft, submitted, approved, rejected, upcoming, live, ongoing, completed
     is_approved: bool
     admin_notes: Optional[str] = None
+    question_count: Optional[int] = None
+    student_count: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
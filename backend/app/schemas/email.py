@@ -38,13 +38,20 @@ class EmailTemplatePreviewResponse(BaseModel):
     rendered_body: str
     sample_data_used: Dict[str, str]
 
-class EmailSendResponse(BaseModel):
-    success: bool
+class EmailJobResponse(BaseModel):
+    job_id: int
+    drive_id: int
+    status: str  # queued, running, completed, failed
     message: str
+    total_students: int
     sent_count: int
     failed_count: int
-    total_students: int
+    remaining_count: int
     failed_emails: list = []
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
 class EmailStatusResponse(BaseModel):
     drive_id: int
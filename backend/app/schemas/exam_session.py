@@ -0,0 +1,65 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
+from datetime import datetime
+
+class StudentLogin(BaseModel):
+    drive_id: int  # The "Exam ID" from the invitation email
+    identifier: str  # Roll number or email
+    password: str
+
+class StudentExamInfo(BaseModel):
+    drive_id: int
+    title: str
+    duration_minutes: Optional[int] = None
+    scheduled_start: Optional[datetime] = None
+    actual_start: Optional[datetime] = None
+    exam_state: str  # not_started, ongoing, ended
+    time_remaining: Optional[float] = None  # Seconds
+    attempt_status: Optional[str] = None  # None until the paper is first fetched
+    submitted_at: Optional[datetime] = None
+
+class StudentLoginResponse(BaseModel):
+    access_token: str
+    token_type: str
+    student_id: int
+    roll_number: str
+    name: Optional[str] = None
+    exam: StudentExamInfo
+
+class PaperQuestion(BaseModel):
+    id: int
+    question_text: str
+    option_a: str
+    option_b: str
+    option_c: str
+    option_d: str
+    points: int
+
+    class Config:
+        from_attributes = True
+
+class ExamPaperResponse(BaseModel):
+    drive_id: int
+    title: str
+    duration_minutes: Optional[int] = None
+    questions: List[PaperQuestion]
+
+class AnswerItem(BaseModel):
+    question_id: int
+    selected_option: Optional[Literal['A', 'B', 'C', 'D']] = None  # None clears the answer
+
+class SaveAnswersRequest(BaseModel):
+    answers: List[AnswerItem] = Field(..., max_length=1000)
+
+class SavedAnswersResponse(BaseModel):
+    answers: List[AnswerItem]
+    attempt_status: str
+
+class SubmitExamRequest(BaseModel):
+    answers: List[AnswerItem] = Field(default_factory=list, max_length=1000)  # Final unsaved answers, if any
+
+class SubmitExamResponse(BaseModel):
+    success: bool
+    message: str
+    submitted_at: datetime
+    answered_count: int
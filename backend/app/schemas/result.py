@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+class QuestionStat(BaseModel):
+    question_id: int
+    correct_rate: float  # Share of graded attempts answering correctly, 0-1
+    answered_rate: float
+
+class GradingSummaryResponse(BaseModel):
+    drive_id: int
+    graded_count: int
+    max_score: int
+    average_score: Optional[float] = None
+    highest_score: Optional[int] = None
+    graded_at: datetime
+    question_stats: List[QuestionStat]
+
+class ExamResultResponse(BaseModel):
+    student_id: int
+    roll_number: str
+    name: Optional[str] = None
+    email: str
+    score: int
+    max_score: int
+    correct_count: int
+    answered_count: int
+    rank: int
+    percentile: float
+    submitted: bool
+    graded_at: datetime
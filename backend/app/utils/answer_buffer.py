@@ -0,0 +1,316 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from app.database.config import settings
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.connection import AsyncSessionLocal
+from app.utils.exam_session import save_answers
+
+try:
+    import fcntl
+except ImportError:  # Windows: spill files of other live workers are not protected from replay
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# {attempt_id: {question_id: (selected_option, saved_at)}}
+PendingAnswers = Dict[int, Dict[int, Tuple[Optional[str], datetime]]]
+
+
+class SpillFile:
+    """
+    Append-only log of buffered answers, one JSON line per save, so answers
+    acknowledged to students survive a crash or a slow/unavailable database
+    until they are flushed. Each process writes its own file (held under an
+    exclusive lock where the OS supports it); at flush time the active file is
+    sealed into a segment, which is deleted once its answers are in the database.
+    """
+
+    def __init__(self, directory: str, fsync: bool = False):
+        self.directory = Path(directory)
+        self.fsync = fsync
+        # Unique across hosts and containers sharing the directory, where pids repeat (often 1)
+        self.prefix = f"answers-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._file = None
+        self._sequence = 0
+
+    def _open(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.directory / f"{self.prefix}.jsonl", "ab")
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def append(self, attempt_id: int, answers: Dict[int, Optional[str]], saved_at: datetime):
+        if self._file is None:
+            self._open()
+        line = json.dumps({"attempt_id": attempt_id, "saved_at": saved_at.isoformat(), "answers": answers})
+        self._file.write(line.encode("utf-8") + b"\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def seal(self) -> Optional[Path]:
+        """Close the active file and rename it to a segment; returns the segment path"""
+        if self._file is None:
+            return None
+        self._file.close()
+        self._file = None
+        self._sequence += 1
+        segment = self.directory / f"{self.prefix}.{self._sequence}.segment"
+        (self.directory / f"{self.prefix}.jsonl").rename(segment)
+        return segment
+
+    def all_files(self) -> List[Path]:
+        """Active files and unflushed segments of every process sharing the directory"""
+        if not self.directory.exists():
+            return []
+        return [
+            path for path in sorted(self.directory.iterdir())
+            if path.suffix in (".jsonl", ".segment") and path.name.startswith("answers-")
+        ]
+
+    def orphaned_files(self) -> List[Path]:
+        """Spill files left by processes that are no longer running (and by this one, before it wrote anything)"""
+        orphans = []
+        for path in self.all_files():
+            if fcntl is not None and path.suffix == ".jsonl":
+                # A live worker holds the lock on its active file
+                with open(path, "ab") as handle:
+                    try:
+                        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        continue
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            orphans.append(path)
+        return orphans
+
+    @staticmethod
+    def read(path: Path, attempt_ids: Optional[Set[int]] = None) -> PendingAnswers:
+        """Answers in a spill file, optionally only those of the given attempts"""
+        pending: PendingAnswers = {}
+        with open(path, "rb") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn final line from a crash mid-write, or a save still being written
+                    continue
+                if attempt_ids is not None and entry["attempt_id"] not in attempt_ids:
+                    continue
+                saved_at = datetime.fromisoformat(entry["saved_at"])
+                answers = pending.setdefault(entry["attempt_id"], {})
+                for question_id, option in entry["answers"].items():
+                    answers[int(question_id)] = (option, saved_at)
+        return pending
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            (self.directory / f"{self.prefix}.jsonl").unlink(missing_ok=True)
+
+
+class AnswerBuffer:
+    """
+    Write-behind buffer for student answer saves.
+
+    A save is appended to the spill file and merged into memory (the latest
+    answer per question wins), then acknowledged; a background task writes
+    everything pending as one multi-row upsert every flush_interval_ms, or
+    sooner once max_rows answers are pending. flush() forces a synchronous
+    flush of this process's buffer and is called on shutdown.
+
+    Each worker buffers only the saves it received, so submit, exam auto-end
+    and grading use persist(), which writes an attempt's answers from the
+    spill files of every worker sharing the spill directory. Each row carries
+    its save time and the upsert only overwrites older rows, so replaying
+    spill files, persisting answers twice or flushing out of order never
+    loses a newer answer.
+    """
+
+    def __init__(self, flush_interval_ms: int, max_rows: int, spill: SpillFile):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_rows = max_rows
+        self.spill = spill
+        self._pending: PendingAnswers = {}
+        self._rows = 0
+        self._failed_segments: List[Path] = []
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.flushed_rows = 0
+        self.flush_failures = 0
+
+    async def start(self):
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        await self._replay_orphans()
+        self._task = asyncio.create_task(self._run(), name="answer-buffer")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Final answer flush failed; answers remain in the spill file: {str(e)}")
+            return
+        self.spill.close()
+
+    def add(self, attempt_id: int, answers: Dict[int, Optional[str]]):
+        """Record answers for an attempt; durable (in the spill file) when this returns"""
+        if not answers:
+            return
+        saved_at = datetime.utcnow()
+        self.spill.append(attempt_id, answers, saved_at)
+        pending = self._pending.setdefault(attempt_id, {})
+        for question_id, option in answers.items():
+            if question_id not in pending:
+                self._rows += 1
+            pending[question_id] = (option, saved_at)
+        if self._rows >= self.max_rows and self._wake is not None:
+            self._wake.set()
+
+    def pending_for(self, attempt_id: int) -> Dict[int, Optional[str]]:
+        """Answers of an attempt not yet flushed, for overlaying on what the database has"""
+        return {question_id: option for question_id, (option, _) in self._pending.get(attempt_id, {}).items()}
+
+    def pending_rows(self) -> int:
+        return self._rows
+
+    @staticmethod
+    def _to_rows(pending: PendingAnswers) -> List[dict]:
+        return [
+            {"attempt_id": attempt_id, "question_id": question_id, "selected_option": option, "updated_at": saved_at}
+            for attempt_id, answers in pending.items()
+            for question_id, (option, saved_at) in answers.items()
+        ]
+
+    async def _write(self, rows: List[dict]):
+        async with AsyncSessionLocal() as db:
+            for start in range(0, len(rows), self.max_rows):
+                await save_answers(db, rows[start:start + self.max_rows])
+            await db.commit()
+
+    def _restore(self, pending: PendingAnswers):
+        """Put answers back after a failed flush, keeping any newer save made meanwhile"""
+        for attempt_id, answers in pending.items():
+            current = self._pending.setdefault(attempt_id, {})
+            for question_id, entry in answers.items():
+                if question_id not in current:
+                    current[question_id] = entry
+                    self._rows += 1
+
+    async def flush(self) -> int:
+        """Write all pending answers now; returns rows written"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            pending, self._pending, self._rows = self._pending, {}, 0
+            segment = self.spill.seal()
+            rows = self._to_rows(pending)
+            try:
+                await self._write(rows)
+            except Exception:
+                self.flush_failures += 1
+                self._restore(pending)
+                if segment is not None:
+                    self._failed_segments.append(segment)
+                raise
+
+            # Answers of earlier failed flushes were restored and have now been written too
+            for path in self._failed_segments + ([segment] if segment else []):
+                path.unlink(missing_ok=True)
+            self._failed_segments = []
+            self.flushed_rows += len(rows)
+            return len(rows)
+
+    def _read_spilled(self, attempt_ids: Optional[Set[int]]) -> PendingAnswers:
+        pending: PendingAnswers = {}
+        read = set()
+        while True:
+            # A file sealed while this runs reappears as a new segment; one
+            # flushed and deleted meanwhile is already committed
+            paths = [path for path in self.spill.all_files() if path not in read]
+            if not paths:
+                return pending
+            for path in paths:
+                read.add(path)
+                try:
+                    found = SpillFile.read(path, attempt_ids)
+                except FileNotFoundError:
+                    continue
+                for attempt_id, answers in found.items():
+                    current = pending.setdefault(attempt_id, {})
+                    for question_id, (option, saved_at) in answers.items():
+                        if question_id not in current or current[question_id][1] <= saved_at:
+                            current[question_id] = (option, saved_at)
+
+    async def persist(self, db: AsyncSession, attempt_ids: Iterable[int]) -> int:
+        """
+        Write every acknowledged answer of the attempts, whichever worker
+        buffered it, in the caller's transaction (not committed here).
+        Returns rows written.
+        """
+        attempt_ids = set(attempt_ids)
+        if not attempt_ids:
+            return 0
+        pending = await asyncio.to_thread(self._read_spilled, attempt_ids)
+        rows = self._to_rows(pending)
+        for start in range(0, len(rows), self.max_rows):
+            await save_answers(db, rows[start:start + self.max_rows])
+        return len(rows)
+
+    async def _replay_orphans(self):
+        for path in self.spill.orphaned_files():
+            try:
+                rows = self._to_rows(SpillFile.read(path))
+                if rows:
+                    await self._write(rows)
+                path.unlink()
+                logger.info(f"📥 Replayed {len(rows)} buffered answers from {path.name}")
+            except Exception as e:
+                logger.error(f"Could not replay answer spill file {path.name}: {str(e)}")
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Answers stay buffered and spilled; retried on the next interval
+                logger.error(f"Answer flush failed: {str(e)}")
+
+    def stats(self) -> dict:
+        return {
+            "pending_rows": self._rows,
+            "flushed_rows": self.flushed_rows,
+            "flush_failures": self.flush_failures,
+            "unflushed_segments": len(self._failed_segments)
+        }
+
+
+answer_buffer = AnswerBuffer(
+    flush_interval_ms=settings.answer_flush_interval_ms,
+    max_rows=settings.answer_flush_max_rows,
+    spill=SpillFile(settings.answer_spill_dir, fsync=settings.answer_spill_fsync)
+)
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per subscriber before it is told to resync instead
+SUBSCRIBER_QUEUE_SIZE = 100
+# Comment line sent on idle streams so proxies keep the connection open
+HEARTBEAT_SECONDS = 15
+# Client reconnect delay advertised to EventSource
+RETRY_MILLISECONDS = 5000
+
+RESYNC_EVENT = {"type": "resync"}
+
+
+def exam_end_deadline(drive) -> Optional[datetime]:
+    """When a started exam is due to end, or None if it has not started"""
+    if not drive.actual_start:
+        return None
+    return drive.actual_start + timedelta(minutes=drive.duration_minutes or 0)
+
+
+def drive_event(drive, reason: str) -> dict:
+    """
+    Status payload for one drive, using the same field names as the
+    exam-status endpoints so clients can merge it into what they already hold.
+    """
+    now = datetime.utcnow()
+    end_deadline = exam_end_deadline(drive)
+    time_remaining = None
+
+    if not drive.actual_start:
+        exam_state = "not_started"
+    elif drive.actual_end or end_deadline <= now:
+        exam_state = "ended"
+    else:
+        exam_state = "ongoing"
+        time_remaining = (end_deadline - now).total_seconds()
+
+    return {
+        "type": "drive",
+        "reason": reason,
+        "drive_id": drive.id,
+        "company_id": drive.company_id,
+        "title": drive.title,
+        "status": drive.status,
+        "is_approved": drive.is_approved,
+        "exam_state": exam_state,
+        "scheduled_start": drive.scheduled_start,
+        "actual_start": drive.actual_start,
+        "actual_end": drive.actual_end,
+        "duration_minutes": drive.duration_minutes,
+        "time_remaining": time_remaining,
+        "time_remaining_minutes": time_remaining / 60 if time_remaining else None,
+        "can_end": exam_state == "ongoing"
+    }
+
+
+def drive_deleted_event(drive_id: int, company_id: int) -> dict:
+    return {"type": "drive_deleted", "drive_id": drive_id, "company_id": company_id}
+
+
+class DriveEventBroadcaster:
+    """
+    In-process fan-out of drive status changes to Server-Sent Event streams.
+
+    Each stream owns a bounded asyncio.Queue and subscribes to one company's
+    drives, or to every drive (company_id=None, the admin firehose). publish()
+    may be called from any thread (sync routes run in the threadpool); delivery
+    happens on the event loop. A subscriber that falls SUBSCRIBER_QUEUE_SIZE
+    events behind is sent a single resync event and should reload its data.
+
+    Events only reach streams served by the same process, so with several
+    workers a client may miss changes made elsewhere until it reconnects
+    (every reconnect starts with a ready event, which clients treat as resync).
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._by_company: Dict[int, Set[asyncio.Queue]] = {}
+        self._firehose: Set[asyncio.Queue] = set()
+        self._listeners: List[Callable[[dict], None]] = []
+
+    def add_listener(self, listener: Callable[[dict], None]):
+        """Call listener(event) for every published event, in the publishing thread (e.g. cache invalidation)"""
+        self._listeners.append(listener)
+
+    def subscribe(self, company_id: Optional[int]) -> asyncio.Queue:
+        """Register a stream; must be called on the event loop"""
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        if company_id is None:
+            self._firehose.add(queue)
+        else:
+            self._by_company.setdefault(company_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue, company_id: Optional[int]):
+        if company_id is None:
+            self._firehose.discard(queue)
+        else:
+            subscribers = self._by_company.get(company_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._by_company[company_id]
+
+    def subscriber_count(self) -> int:
+        return len(self._firehose) + sum(len(queues) for queues in self._by_company.values())
+
+    def publish(self, event: dict):
+        """Queue an event for every interested stream; thread-safe and non-blocking"""
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Drive event listener failed: {str(e)}")
+
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        payload = jsonable_encoder(event)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._fan_out(payload)
+        else:
+            loop.call_soon_threadsafe(self._fan_out, payload)
+
+    def publish_drive(self, drive, reason: str):
+        self.publish(drive_event(drive, reason))
+
+    def _fan_out(self, event: dict):
+        queues = list(self._firehose) + list(self._by_company.get(event.get("company_id"), ()))
+        for queue in queues:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too far behind: replace the backlog with a single resync marker
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_EVENT)
+
+
+def format_sse(event_type: str, data: dict) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _event_stream(company_id: Optional[int]):
+    queue = drive_events.subscribe(company_id)
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        yield format_sse("ready", {"company_id": company_id})
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event["type"], event)
+    finally:
+        drive_events.unsubscribe(queue, company_id)
+
+
+def drive_event_stream_response(company_id: Optional[int]) -> StreamingResponse:
+    """SSE response streaming one company's drive events, or all of them when company_id is None"""
+    return StreamingResponse(
+        _event_stream(company_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering (nginx)
+        }
+    )
+
+
+drive_events = DriveEventBroadcaster()
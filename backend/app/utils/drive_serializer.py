@@ -0,0 +1,133 @@
+from typing import Dict, List
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models import Drive, College, StudentGroup, Company, Question, Student
+
+
+def _name_map(db: Session, model, name_column, ids) -> Dict[int, str]:
+    """Fetch an id -> name map for the given ids in a single query"""
+    ids = {i for i in ids if i is not None}
+    if not ids:
+        return {}
+    rows = db.query(model.id, name_column).filter(model.id.in_(ids)).all()
+    return {row[0]: row[1] for row in rows}
+
+
+def get_drive_counts(drive_ids, db: Session) -> Dict[int, dict]:
+    """
+    Get question and student counts for many drives in a single query.
+
+    Returns {drive_id: {"question_count": n, "student_count": m}}.
+    """
+    drive_ids = set(drive_ids)
+    if not drive_ids:
+        return {}
+
+    question_count = select(func.count(Question.id)).where(
+        Question.drive_id == Drive.id
+    ).correlate(Drive).scalar_subquery()
+    student_count = select(func.count(Student.id)).where(
+        Student.drive_id == Drive.id
+    ).correlate(Drive).scalar_subquery()
+
+    rows = db.query(Drive.id, question_count, student_count).filter(Drive.id.in_(drive_ids)).all()
+    return {
+        row[0]: {"question_count": row[1], "student_count": row[2]}
+        for row in rows
+    }
+
+
+def _admin_target_name(custom_name, ref_id, names: Dict[int, str], unknown: str):
+    """Admin views show the custom name first and label dangling references"""
+    if custom_name or not ref_id:
+        return custom_name
+    return names.get(ref_id, unknown)
+
+
+def _company_target_name(custom_name, ref_id, names: Dict[int, str]):
+    """Company views show the referenced name, falling back to the custom one only when there is no reference"""
+    if ref_id:
+        return names.get(ref_id)
+    return custom_name
+
+
+def format_drive_responses(drives: List[Drive], db: Session, include_counts: bool = False, admin_view: bool = False) -> List[dict]:
+    """
+    Format a page of drives with resolved target and company names.
+
+    All college, student group and company names are resolved with one query
+    per table regardless of how many drives or targets are on the page. Load
+    the drives with selectinload(Drive.targets) to keep target loading constant too.
+    With include_counts, question and student counts are added from get_drive_counts.
+
+    admin_view keeps the admin panel's naming: custom target names win and
+    missing rows read "Unknown College" / "Unknown Group" / "Unknown Company".
+    Company views prefer the referenced names and leave missing ones as None.
+    """
+    college_ids = set()
+    group_ids = set()
+    for drive in drives:
+        for target in drive.targets:
+            college_ids.add(target.college_id)
+            group_ids.add(target.student_group_id)
+
+    college_names = _name_map(db, College, College.name, college_ids)
+    group_names = _name_map(db, StudentGroup, StudentGroup.name, group_ids)
+    company_names = _name_map(db, Company, Company.company_name, {d.company_id for d in drives})
+    counts = get_drive_counts([d.id for d in drives], db) if include_counts else {}
+    unknown_company = "Unknown Company" if admin_view else None
+
+    result = []
+    for drive in drives:
+        targets = []
+        for target in drive.targets:
+            if admin_view:
+                college_name = _admin_target_name(
+                    target.custom_college_name, target.college_id, college_names, "Unknown College"
+                )
+                student_group_name = _admin_target_name(
+                    target.custom_student_group_name, target.student_group_id, group_names, "Unknown Group"
+                )
+            else:
+                college_name = _company_target_name(target.custom_college_name, target.college_id, college_names)
+                student_group_name = _company_target_name(
+                    target.custom_student_group_name, target.student_group_id, group_names
+                )
+
+            targets.append({
+                "id": target.id,
+                "college_id": target.college_id,
+                "custom_college_name": target.custom_college_name,
+                "student_group_id": target.student_group_id,
+                "custom_student_group_name": target.custom_student_group_name,
+                "batch_year": target.batch_year,
+                "college_name": college_name,
+                "student_group_name": student_group_name
+            })
+
+        drive_dict = {
+            "id": drive.id,
+            "company_id": drive.company_id,
+            "company_name": company_names.get(drive.company_id, unknown_company),
+            "title": drive.title,
+            "description": drive.description,
+            "question_type": drive.question_type,
+            "targets": targets,
+            "duration_minutes": drive.duration_minutes,
+            "scheduled_start": drive.scheduled_start,
+            "status": drive.status,
+            "is_approved": drive.is_approved,
+            "admin_notes": drive.admin_notes,
+            "created_at": drive.created_at,
+            "updated_at": drive.updated_at
+        }
+        if include_counts:
+            drive_dict.update(counts.get(drive.id, {"question_count": 0, "student_count": 0}))
+        result.append(drive_dict)
+
+    return result
+
+
+def format_drive_response(drive: Drive, db: Session, include_counts: bool = False, admin_view: bool = False) -> dict:
+    """Format a single drive response with resolved target and company names"""
+    return format_drive_responses([drive], db, include_counts, admin_view)[0]
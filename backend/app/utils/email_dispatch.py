@@ -0,0 +1,243 @@
+import logging
+import os
+import smtplib
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import Session
+from app.database.config import settings
+from app.database.connection import SessionLocal
+from app.models import Drive, Company, Student, EmailJob, EmailDelivery
+from app.utils.email_processor import EmailTemplateProcessor
+from app.utils.smtp_pool import create_sender_pool
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_JOB_STATUSES = ("queued", "running")
+
+# Identifies this process as a lease holder in email_jobs.lease_owner
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.email_dispatch_workers,
+    thread_name_prefix="email-dispatch"
+)
+_sweeper_stop = threading.Event()
+
+
+class LeaseLost(Exception):
+    """Another worker took the job over after this worker's lease expired"""
+
+
+def pending_students_query(db: Session, drive_id: int):
+    """Students of a drive that have not been sent their credentials email yet"""
+    already_sent = db.query(EmailDelivery.student_id).filter(
+        EmailDelivery.drive_id == drive_id,
+        EmailDelivery.status == "sent"
+    )
+    return db.query(Student).filter(
+        Student.drive_id == drive_id,
+        ~Student.id.in_(already_sent)
+    )
+
+
+def build_credentials_message(student: Student, drive_variables: dict, templates) -> MIMEMultipart:
+    """
+    Render one student's message from precomputed drive variables and the
+    company's compiled (subject, body) templates.
+    """
+    email_variables = EmailTemplateProcessor.prepare_student_variables(student, drive_variables)
+    subject_template, body_template = templates
+
+    subject = subject_template.render(email_variables)
+    body = body_template.render(email_variables)
+
+    message = MIMEMultipart()
+    message["From"] = f"{settings.smtp_from_name} <{settings.smtp_username}>"
+    message["To"] = student.email
+    message["Subject"] = subject
+    message.attach(MIMEText(body, "plain"))
+    return message
+
+
+def _record_delivery(db: Session, deliveries: dict, job: EmailJob, student: Student, error: str = None):
+    """Create or update the student's delivery row for this drive"""
+    delivery = deliveries.get(student.id)
+    if delivery is None:
+        delivery = EmailDelivery(drive_id=job.drive_id, student_id=student.id)
+        db.add(delivery)
+        deliveries[student.id] = delivery
+
+    delivery.job_id = job.id
+    delivery.status = "failed" if error else "sent"
+    delivery.error = error
+
+    if error:
+        job.failed_count += 1
+    else:
+        job.sent_count += 1
+
+
+def _claimable():
+    """Queued jobs, and running jobs whose worker stopped refreshing its lease"""
+    stale = datetime.utcnow() - timedelta(seconds=settings.email_job_lease_seconds)
+    return or_(
+        EmailJob.status == "queued",
+        and_(
+            EmailJob.status == "running",
+            or_(EmailJob.heartbeat_at.is_(None), EmailJob.heartbeat_at < stale)
+        )
+    )
+
+
+def _claim_job(db: Session, job_id: int) -> Optional[str]:
+    """Take the job's lease and return its token; None when another worker holds it or the job is finished"""
+    now = datetime.utcnow()
+    lease = uuid.uuid4().hex
+    claimed = db.execute(
+        update(EmailJob)
+        .where(EmailJob.id == job_id, _claimable())
+        .values(status="running", started_at=now, heartbeat_at=now, lease_owner=WORKER_ID, lease_token=lease)
+    ).rowcount
+    db.commit()
+    return lease if claimed == 1 else None
+
+
+def _commit_progress(db: Session, job: EmailJob, lease: str, **values):
+    """
+    Write the job's counters (and any other values), renew the lease and
+    commit, but only while this worker still holds the lease; otherwise roll
+    back and raise LeaseLost.
+    """
+    renewed = db.execute(
+        update(EmailJob)
+        .where(EmailJob.id == job.id, EmailJob.lease_owner == WORKER_ID, EmailJob.lease_token == lease)
+        .values(heartbeat_at=datetime.utcnow(), sent_count=job.sent_count, failed_count=job.failed_count, **values)
+    ).rowcount
+    if renewed != 1:
+        db.rollback()
+        raise LeaseLost(f"Email job {job.id} was taken over by another worker")
+    db.commit()
+
+
+def run_email_job(job_id: int):
+    """Send credentials emails for a queued job, persisting per-student outcomes as it goes"""
+    # Progress commits must not expire the loaded students, drive and company
+    db = SessionLocal(expire_on_commit=False)
+    job = None
+    try:
+        lease = _claim_job(db, job_id)
+        if lease is None:
+            return
+        job = db.query(EmailJob).filter(EmailJob.id == job_id).first()
+        # Job columns are only written by _commit_progress, which checks the lease
+        db.expunge(job)
+
+        drive = db.query(Drive).filter(Drive.id == job.drive_id).first()
+        company = db.query(Company).filter(Company.id == job.company_id).first()
+        students = pending_students_query(db, job.drive_id).order_by(Student.id).all()
+
+        # Earlier failed attempts are updated in place rather than duplicated
+        deliveries = {
+            delivery.student_id: delivery
+            for delivery in db.query(EmailDelivery).filter(EmailDelivery.drive_id == job.drive_id)
+        }
+
+        # Drive-level variables and the compiled templates are shared by every message
+        drive_variables = EmailTemplateProcessor.prepare_drive_variables(drive, company)
+        templates = EmailTemplateProcessor.get_company_templates(company)
+
+        students_by_id = {student.id: student for student in students}
+        messages = (
+            (student.id, build_credentials_message(student, drive_variables, templates))
+            for student in students
+        )
+
+        pool = create_sender_pool()
+        try:
+            pool.open()
+        except smtplib.SMTPAuthenticationError:
+            raise RuntimeError("Email authentication failed. Please check SMTP credentials.")
+        except (smtplib.SMTPConnectError, OSError):
+            raise RuntimeError("Could not connect to SMTP server. Please check your internet connection.")
+
+        with pool:
+            for student_id, error in pool.send(messages):
+                _record_delivery(db, deliveries, job, students_by_id[student_id], error=error)
+
+                # Each outcome is committed as soon as it is known, so a later
+                # failure cannot lose the record of an email that went out,
+                # and the commit renews the job's lease
+                _commit_progress(db, job, lease)
+
+        job.status = "completed"
+
+    except LeaseLost as e:
+        # The new holder finishes the job; stop sending and leave its status alone
+        logger.warning(f"{str(e)}; stopping")
+        job = None
+    except Exception as e:
+        logger.error(f"Email job {job_id} failed: {str(e)}")
+        db.rollback()
+        if job is not None:
+            job.status = "failed"
+            job.error = str(e)
+    finally:
+        if job is not None:
+            try:
+                _commit_progress(db, job, lease, status=job.status, error=job.error, finished_at=datetime.utcnow())
+            except LeaseLost as e:
+                logger.warning(f"{str(e)}; not recording its outcome")
+        db.close()
+
+
+def enqueue_email_job(job_id: int):
+    """Hand a committed job to the background dispatch workers"""
+    _executor.submit(run_email_job, job_id)
+
+
+def resume_pending_email_jobs():
+    """
+    Re-queue jobs no live worker is sending: ones still queued and running ones
+    whose lease expired. Every worker runs this, so a job can be handed to
+    several of them; only the one whose claim succeeds sends it, and already
+    emailed students are skipped.
+    """
+    db = SessionLocal()
+    try:
+        job_ids = [job_id for (job_id,) in db.query(EmailJob.id).filter(_claimable())]
+    finally:
+        db.close()
+
+    for job_id in job_ids:
+        enqueue_email_job(job_id)
+    if job_ids:
+        logger.info(f"📧 Resumed {len(job_ids)} pending email job(s)")
+
+
+def _sweep_abandoned_jobs():
+    # A worker that dies mid-job leaves a lease that only expires later, so
+    # checking once on startup would miss it
+    while not _sweeper_stop.wait(settings.email_job_lease_seconds):
+        try:
+            resume_pending_email_jobs()
+        except Exception as e:
+            logger.error(f"Email job sweep failed: {str(e)}")
+
+
+def start_email_dispatcher():
+    """Resume pending jobs now and keep picking up ones whose worker went away"""
+    resume_pending_email_jobs()
+    threading.Thread(target=_sweep_abandoned_jobs, name="email-job-sweeper", daemon=True).start()
+
+
+def shutdown_email_dispatcher():
+    """Stop accepting jobs; running jobs are taken over once their lease expires"""
+    _sweeper_stop.set()
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -1,12 +1,15 @@
 import re
+import threading
 from datetime import datetime
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
 
 # Template variables that companies can use
 TEMPLATE_VARIABLES = {
     'student_name': 'Student full name',
     'roll_number': 'Student roll number',
     'drive_title': 'Recruitment drive title',
+    'exam_id': 'Exam ID the student enters at login',
     'company_name': 'Company name',
     'password': 'Auto-generated login password',
     'login_url': 'Student login URL',
@@ -14,18 +17,72 @@ TEMPLATE_VARIABLES = {
     'duration': 'Exam duration in minutes'
 }
 
+TEMPLATE_VARIABLE_PATTERN = re.compile(r'\{\{(\w+)\}\}')
+
+# Students log in with their exam ID, so a body template without it gets this line appended
+EXAM_ID_LINE = "\n\nExam ID: {{exam_id}}"
+
+class CompiledTemplate:
+    """A template pre-split into alternating literal and variable segments"""
+
+    def __init__(self, template: str):
+        # re.split with one group yields [literal, var, literal, var, ..., literal]
+        parts = TEMPLATE_VARIABLE_PATTERN.split(template)
+        self.literals: List[str] = parts[0::2]
+        self.variables: List[str] = parts[1::2]
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        """Join literals with variable values; unknown variables render as empty strings"""
+        pieces = [self.literals[0]]
+        for name, literal in zip(self.variables, self.literals[1:]):
+            pieces.append(str(variables.get(name, "")))
+            pieces.append(literal)
+        return "".join(pieces)
+
+# company_id -> (template_updated_at, compiled subject, compiled body)
+_company_template_cache: Dict[int, Tuple[Any, CompiledTemplate, CompiledTemplate]] = {}
+_company_template_lock = threading.Lock()
+
 class EmailTemplateProcessor:
     """Process email templates with variable substitution"""
 
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def compile_template(template: str) -> CompiledTemplate:
+        """Compile a template once; repeated calls with the same text are cached"""
+        return CompiledTemplate(template)
+
     @staticmethod
     def render_template(template: str, variables: Dict[str, Any]) -> str:
         """Replace template variables with actual values"""
-        def replace_var(match):
-            var_name = match.group(1)
-            value = variables.get(var_name, "")  # Replace unknown variables with empty string
-            return str(value)
+        return EmailTemplateProcessor.compile_template(template).render(variables)
+
+    @staticmethod
+    def with_exam_id(body_template: str) -> str:
+        """Body template that always shows the exam ID, which students need to log in"""
+        if '{{exam_id}}' in body_template:
+            return body_template
+        return body_template.rstrip() + EXAM_ID_LINE
+
+    @staticmethod
+    def get_company_templates(company) -> Tuple[CompiledTemplate, CompiledTemplate]:
+        """Compiled (subject, body) templates for a company, cached until its template is updated"""
+        with _company_template_lock:
+            cached = _company_template_cache.get(company.id)
+        if cached and cached[0] == company.template_updated_at:
+            return cached[1], cached[2]
+
+        subject = CompiledTemplate(company.email_subject_template)
+        body = CompiledTemplate(EmailTemplateProcessor.with_exam_id(company.email_body_template))
+        with _company_template_lock:
+            _company_template_cache[company.id] = (company.template_updated_at, subject, body)
+        return subject, body
 
-        return re.sub(r'\{\{(\w+)\}\}', replace_var, template)
+    @staticmethod
+    def invalidate_company_templates(company_id: int):
+        """Drop a company's compiled templates after its template is edited"""
+        with _company_template_lock:
+            _company_template_cache.pop(company_id, None)
 
     @staticmethod
     def get_sample_data() -> Dict[str, str]:
@@ -34,6 +91,7 @@ class EmailTemplateProcessor:
             'student_name': 'John Doe',
             'roll_number': 'CS001',
             'drive_title': 'Software Engineer Position',
+            'exam_id': '42',
             'company_name': 'TechCorp Solutions',
             'password': 'SoftwareEngineer2024',
             'start_time': 'December 15, 2024 at 10:00 AM',
@@ -43,7 +101,7 @@ class EmailTemplateProcessor:
     @staticmethod
     def validate_template(template: str) -> Dict[str, Any]:
         """Validate template syntax and variables"""
-        variables_used = re.findall(r'\{\{(\w+)\}\}', template)
+        variables_used = TEMPLATE_VARIABLE_PATTERN.findall(template)
         valid_variables = set(TEMPLATE_VARIABLES.keys())
         invalid_variables = set(variables_used) - valid_variables
 
@@ -71,15 +129,30 @@ class EmailTemplateProcessor:
         return dt.strftime('%B %d, %Y at %I:%M %p')
 
     @staticmethod
-    def prepare_email_variables(student, drive, company) -> Dict[str, str]:
-        """Prepare variables for a specific student and drive"""
+    def prepare_drive_variables(drive, company) -> Dict[str, str]:
+        """Prepare the variables shared by every student of a drive; compute once per send"""
         return {
-            'student_name': student.name or student.roll_number,
-            'roll_number': student.roll_number,
             'drive_title': drive.title,
+            'exam_id': str(drive.id),
             'company_name': company.company_name,
             'password': EmailTemplateProcessor.generate_password(drive.title),
             'login_url': 'http://localhost:5173/student-login',
             'start_time': EmailTemplateProcessor.format_datetime(drive.scheduled_start),
             'duration': str(drive.duration_minutes)
         }
+
+    @staticmethod
+    def prepare_student_variables(student, drive_variables: Dict[str, str]) -> Dict[str, str]:
+        """Add a student's own variables to precomputed drive variables"""
+        return {
+            **drive_variables,
+            'student_name': student.name or student.roll_number,
+            'roll_number': student.roll_number
+        }
+
+    @staticmethod
+    def prepare_email_variables(student, drive, company) -> Dict[str, str]:
+        """Prepare variables for a specific student and drive"""
+        return EmailTemplateProcessor.prepare_student_variables(
+            student, EmailTemplateProcessor.prepare_drive_variables(drive, company)
+        )
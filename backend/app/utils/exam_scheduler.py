@@ -0,0 +1,195 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, update, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.config import settings
+from app.database.connection import AsyncSessionLocal
+from app.models import Drive, ExamAttempt
+from app.utils.drive_events import drive_events
+from app.utils.paper_snapshots import paper_snapshots
+from app.utils.answer_buffer import answer_buffer
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_try_advisory_xact_lock
+EXAM_SCHEDULER_LOCK_KEY = 7_461_201
+# Drives in these states are never auto-started
+NON_STARTABLE_STATUSES = ("draft", "submitted", "rejected", "suspended", "completed")
+# Retry delay when another worker holds the lock
+LOCK_RETRY_SECONDS = 1.0
+
+START = "start"
+END = "end"
+
+
+class ExamScheduler:
+    """
+    Flip drives to ongoing at scheduled_start and to completed once
+    duration_minutes have elapsed, without relying on clients polling.
+
+    Upcoming deadlines are kept in a heap rebuilt from the database on startup,
+    whenever a route calls notify(), and every resync_seconds (to pick up changes
+    made by other workers). Transitions are conditional UPDATEs, so applying one
+    twice is harmless; on PostgreSQL they also run under a transaction-level
+    advisory lock so only one worker does the work at a time.
+    """
+
+    def __init__(self, resync_seconds: float):
+        self.resync_seconds = resync_seconds
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._dirty = True
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._dirty = True
+        self._task = asyncio.create_task(self._run(), name="exam-scheduler")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self):
+        """Reload deadlines soon; safe to call from sync routes running in the threadpool"""
+        self._dirty = True
+        if self._loop is not None and self._wake is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _load_deadlines(self, db: AsyncSession):
+        starts = await db.execute(
+            select(Drive.id, Drive.scheduled_start).where(
+                Drive.is_approved == True,
+                Drive.actual_start.is_(None),
+                Drive.scheduled_start.isnot(None),
+                Drive.status.notin_(NON_STARTABLE_STATUSES)
+            )
+        )
+        ends = await db.execute(
+            select(Drive.id, Drive.actual_start, Drive.duration_minutes).where(
+                Drive.actual_start.isnot(None),
+                Drive.actual_end.is_(None)
+            )
+        )
+        heap = [(scheduled_start, drive_id, START) for drive_id, scheduled_start in starts]
+        heap += [
+            (actual_start + timedelta(minutes=duration_minutes or 0), drive_id, END)
+            for drive_id, actual_start, duration_minutes in ends
+        ]
+        heapq.heapify(heap)
+        self._heap = heap
+
+    async def _try_lock(self, db: AsyncSession) -> bool:
+        if db.get_bind().dialect.name != "postgresql":
+            return True
+        return bool(await db.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": EXAM_SCHEDULER_LOCK_KEY}))
+
+    async def _apply(self, db: AsyncSession, due: List[Tuple[datetime, int, str]]) -> Dict[int, str]:
+        """Apply due transitions in one transaction. Returns {drive_id: "auto_started" | "auto_ended"} for drives changed"""
+        now = datetime.utcnow()
+        changed = {}
+
+        start_ids = [drive_id for _, drive_id, kind in due if kind == START]
+        if start_ids:
+            result = await db.execute(
+                update(Drive).where(
+                    Drive.id.in_(start_ids),
+                    Drive.is_approved == True,
+                    Drive.actual_start.is_(None),
+                    Drive.scheduled_start <= now,
+                    Drive.status.notin_(NON_STARTABLE_STATUSES)
+                ).values(actual_start=now, status="ongoing").returning(Drive.id)
+            )
+            changed.update((drive_id, "auto_started") for drive_id in result.scalars())
+
+        for deadline, drive_id, kind in due:
+            if kind != END:
+                continue
+            # End at the deadline itself; drives already ended manually are skipped
+            result = await db.execute(
+                update(Drive).where(
+                    Drive.id == drive_id,
+                    Drive.actual_start.isnot(None),
+                    Drive.actual_end.is_(None)
+                ).values(actual_end=deadline, status="completed").returning(Drive.id)
+            )
+            changed.update((drive_id, "auto_ended") for drive_id in result.scalars())
+
+        await db.commit()
+        return changed
+
+    async def _tick(self) -> float:
+        """Reload and/or apply due transitions; returns seconds until the next wake-up"""
+        async with AsyncSessionLocal() as db:
+            if self._dirty:
+                self._dirty = False
+                await self._load_deadlines(db)
+                await db.commit()
+
+            now = datetime.utcnow()
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap))
+
+            if due:
+                if not await self._try_lock(db):
+                    await db.rollback()
+                    # Another worker is applying transitions; reload to see its result
+                    self._dirty = True
+                    return LOCK_RETRY_SECONDS
+                changed = await self._apply(db, due)
+                if changed:
+                    logger.info(f"⏱️ Exam scheduler updated {len(changed)} drive(s)")
+                    drives = await db.scalars(select(Drive).where(Drive.id.in_(changed)))
+                    for drive in drives:
+                        drive_events.publish_drive(drive, changed[drive.id])
+                    # Freeze papers of auto-started exams before students fetch them
+                    for drive_id, reason in changed.items():
+                        if reason == "auto_started":
+                            await paper_snapshots.get(drive_id)
+                    # Answers saved up to the deadline, by any worker, must be in the database once an exam ends
+                    ended = [drive_id for drive_id, reason in changed.items() if reason == "auto_ended"]
+                    if ended:
+                        attempt_ids = await db.scalars(select(ExamAttempt.id).where(ExamAttempt.drive_id.in_(ended)))
+                        await answer_buffer.persist(db, attempt_ids)
+                        await db.commit()
+                # Started exams now have end deadlines
+                self._dirty = True
+                return 0
+
+        if not self._heap:
+            return self.resync_seconds
+        wait = (self._heap[0][0] - datetime.utcnow()).total_seconds()
+        return max(0.0, min(wait, self.resync_seconds))
+
+    async def _run(self):
+        while True:
+            try:
+                wait = await self._tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Exam scheduler tick failed: {str(e)}")
+                self._dirty = True
+                wait = self.resync_seconds
+
+            if wait > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    # Periodic resync picks up changes made by other workers
+                    self._dirty = True
+                self._wake.clear()
+
+
+exam_scheduler = ExamScheduler(settings.exam_scheduler_resync_seconds)
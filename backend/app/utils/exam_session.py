@@ -0,0 +1,91 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import select, insert, delete
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import ExamAttempt, StudentAnswer
+
+# Dialects whose INSERT supports ON CONFLICT
+_UPSERT_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+def _dialect_insert(db: AsyncSession):
+    return _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+
+
+async def get_attempt(db: AsyncSession, drive_id: int, student_id: int) -> Optional[ExamAttempt]:
+    return await db.scalar(
+        select(ExamAttempt).where(ExamAttempt.drive_id == drive_id, ExamAttempt.student_id == student_id)
+    )
+
+
+async def get_or_create_attempt(db: AsyncSession, drive_id: int, student_id: int) -> ExamAttempt:
+    """
+    The student's attempt for a drive, created on first call. Safe when a
+    student opens the paper in several tabs at once: the unique
+    (drive_id, student_id) constraint keeps a single attempt.
+    """
+    attempt = await get_attempt(db, drive_id, student_id)
+    if attempt is not None:
+        return attempt
+
+    values = {"drive_id": drive_id, "student_id": student_id, "status": "in_progress", "started_at": datetime.utcnow()}
+    dialect_insert = _dialect_insert(db)
+    if dialect_insert is not None:
+        await db.execute(dialect_insert(ExamAttempt).values(**values).on_conflict_do_nothing(
+            index_elements=[ExamAttempt.drive_id, ExamAttempt.student_id]
+        ))
+    else:
+        await db.execute(insert(ExamAttempt).values(**values))
+    await db.commit()
+    return await get_attempt(db, drive_id, student_id)
+
+
+async def save_answers(db: AsyncSession, rows: List[dict]):
+    """
+    Upsert answer rows ({attempt_id, question_id, selected_option, updated_at})
+    in one statement. An existing row is only overwritten by a newer one, so
+    rows may be written late or twice (e.g. replayed) safely. Does not commit.
+    """
+    if not rows:
+        return
+
+    dialect_insert = _dialect_insert(db)
+    if dialect_insert is not None:
+        stmt = dialect_insert(StudentAnswer)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StudentAnswer.attempt_id, StudentAnswer.question_id],
+            set_={"selected_option": stmt.excluded.selected_option, "updated_at": stmt.excluded.updated_at},
+            where=StudentAnswer.updated_at <= stmt.excluded.updated_at
+        )
+        await db.execute(stmt, rows)
+        return
+
+    # Generic fallback: replace the rows being saved, attempt by attempt
+    by_attempt: Dict[int, List[dict]] = {}
+    for row in rows:
+        by_attempt.setdefault(row["attempt_id"], []).append(row)
+    for attempt_id, attempt_rows in by_attempt.items():
+        await db.execute(delete(StudentAnswer).where(
+            StudentAnswer.attempt_id == attempt_id,
+            StudentAnswer.question_id.in_([row["question_id"] for row in attempt_rows])
+        ))
+    await db.execute(insert(StudentAnswer), rows)
+
+
+async def load_answers(db: AsyncSession, attempt_id: int) -> Dict[int, Optional[str]]:
+    rows = await db.execute(
+        select(StudentAnswer.question_id, StudentAnswer.selected_option)
+        .where(StudentAnswer.attempt_id == attempt_id)
+        .order_by(StudentAnswer.question_id)
+    )
+    return {question_id: option for question_id, option in rows}
+
+
+def answers_to_dict(answers) -> Dict[int, Optional[str]]:
+    """AnswerItem list to {question_id: selected_option}; later items for the same question win"""
+    return {answer.question_id: answer.selected_option for answer in answers}
@@ -0,0 +1,123 @@
+from datetime import datetime, timezone
+from typing import Dict, Iterable
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Student
+
+# Most drive ids accepted by one batch exam-status request
+MAX_BATCH_DRIVES = 500
+
+
+async def load_student_counts(db: AsyncSession, drive_ids: Iterable[int]) -> Dict[int, int]:
+    """Student count per drive in one grouped query, without loading Student rows"""
+    drive_ids = list(drive_ids)
+    if not drive_ids:
+        return {}
+    rows = await db.execute(
+        select(Student.drive_id, func.count(Student.id))
+        .where(Student.drive_id.in_(drive_ids))
+        .group_by(Student.drive_id)
+    )
+    counts = dict.fromkeys(drive_ids, 0)
+    counts.update({drive_id: count for drive_id, count in rows})
+    return counts
+
+
+def company_exam_status(drive, student_count: int) -> dict:
+    """
+    Exam status as shown to the company. Read-only: the exam scheduler persists
+    the scheduled start and the auto-end; should_auto_end is True only in the
+    brief window where the duration has elapsed but the scheduler has not yet
+    saved it.
+    """
+    has_students = student_count > 0
+
+    # Check if exam is past its end deadline
+    should_auto_end = False
+    time_remaining_minutes = None
+
+    if drive.actual_start and not drive.actual_end:
+        elapsed_time = datetime.utcnow() - drive.actual_start
+        elapsed_minutes = elapsed_time.total_seconds() / 60
+
+        if elapsed_minutes >= drive.duration_minutes:
+            should_auto_end = True
+        else:
+            time_remaining_minutes = drive.duration_minutes - elapsed_minutes
+
+    # Determine exam state
+    if not drive.actual_start:
+        exam_state = "not_started"
+    elif drive.actual_end or should_auto_end:
+        exam_state = "ended"
+    else:
+        exam_state = "ongoing"
+
+    # Convert time remaining to seconds for consistency
+    time_remaining_seconds = time_remaining_minutes * 60 if time_remaining_minutes else None
+
+    return {
+        "drive_id": drive.id,
+        "exam_state": exam_state,
+        "actual_start": drive.actual_start,
+        "actual_end": drive.actual_end,
+        "scheduled_start": drive.scheduled_start,
+        "duration_minutes": drive.duration_minutes,
+        "time_remaining": time_remaining_seconds,
+        "time_remaining_minutes": time_remaining_minutes,
+        "should_auto_end": should_auto_end,
+        "can_start": drive.is_approved and not drive.actual_start and has_students,
+        "can_end": drive.actual_start and not drive.actual_end and not should_auto_end,
+        "status": "completed" if should_auto_end else drive.status,
+        "is_scheduled": drive.scheduled_start is not None,
+        "has_students": has_students,
+        "student_count": student_count
+    }
+
+
+def admin_exam_status(drive, student_count: int) -> dict:
+    """Exam status as shown to admins (ended exams are reported as "completed")"""
+    has_students = student_count > 0
+    now = datetime.now(timezone.utc)
+
+    # Determine exam state
+    exam_state = "not_started"
+    time_remaining = None
+    can_start = False
+    scheduled_has_passed = False
+
+    if drive.actual_start:
+        if drive.actual_end:
+            exam_state = "completed"
+        else:
+            exam_state = "ongoing"
+            # Calculate time remaining
+            elapsed_minutes = (now - drive.actual_start.replace(tzinfo=timezone.utc)).total_seconds() / 60
+            time_remaining = max(0, (drive.duration_minutes or 0) - elapsed_minutes) * 60  # in seconds
+
+            # Duration exceeded; the scheduler is about to record the end
+            if time_remaining <= 0:
+                exam_state = "completed"
+                time_remaining = 0
+    else:
+        # Can start if approved and has students
+        can_start = drive.is_approved and has_students
+        scheduled_has_passed = (
+            drive.scheduled_start is not None
+            and drive.scheduled_start.replace(tzinfo=timezone.utc) <= now
+        )
+
+    return {
+        "drive_id": drive.id,
+        "exam_state": exam_state,
+        "can_start": can_start and has_students,
+        "scheduled_start": drive.scheduled_start,
+        "scheduled_has_passed": scheduled_has_passed,
+        "actual_start": drive.actual_start,
+        "actual_end": drive.actual_end,
+        "time_remaining": time_remaining,
+        "time_remaining_minutes": time_remaining / 60 if time_remaining else None,
+        "duration_minutes": drive.duration_minutes,
+        "has_students": has_students,
+        "student_count": student_count
+    }
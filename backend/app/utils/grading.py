@@ -0,0 +1,209 @@
+from datetime import datetime
+from typing import Iterable, Sequence, Tuple
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import BigInteger, case, cast, select, insert, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Question, ExamAttempt, StudentAnswer, ExamResult
+
+OPTION_CODES = {"A": 0, "B": 1, "C": 2, "D": 3}
+UNANSWERED = -1
+# Packed answer layout (see packed_answers_query); question ids must stay below 2**29
+OPTION_BITS = 3
+ATTEMPT_SHIFT = 32
+INVALID_CODE = 7
+# Rows per INSERT when writing results back
+RESULT_BATCH_SIZE = 5000
+
+
+class AnswerKey:
+    """A drive's answer key as arrays aligned by column: question ids (sorted), correct option code and points"""
+
+    __slots__ = ("question_ids", "correct", "points")
+
+    def __init__(self, question_ids: np.ndarray, correct: np.ndarray, points: np.ndarray):
+        order = np.argsort(question_ids, kind="stable")
+        self.question_ids = question_ids[order]
+        self.correct = correct[order]
+        self.points = points[order]
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Tuple]) -> "AnswerKey":
+        """
+        Build from (id, option_a, option_b, option_c, option_d, correct_answer, points)
+        rows. correct_answer is stored as option text (a letter is accepted too);
+        a question whose answer matches no option cannot be scored by anyone.
+        """
+        correct = []
+        for _, *options, answer, _ in rows:
+            if answer in options:
+                correct.append(options.index(answer))
+            else:
+                correct.append(OPTION_CODES.get((answer or "").strip().upper(), UNANSWERED))
+        return cls(
+            np.array([row[0] for row in rows], dtype=np.int64),
+            np.array(correct, dtype=np.int8),
+            np.array([row[-1] or 0 for row in rows], dtype=np.int64)
+        )
+
+    @property
+    def max_score(self) -> int:
+        return int(self.points.sum())
+
+
+def packed_answers_query(drive_id: int):
+    """
+    A drive's non-blank answers as one BIGINT per answer,
+    attempt_id << ATTEMPT_SHIFT | question_id << OPTION_BITS | option code,
+    so the driver returns a single integer column and NumPy ingests it
+    without touching Python row objects.
+    """
+    option_code = case(OPTION_CODES, value=StudentAnswer.selected_option, else_=INVALID_CODE)
+    packed = (
+        cast(StudentAnswer.attempt_id, BigInteger) * (1 << ATTEMPT_SHIFT)
+        + cast(StudentAnswer.question_id, BigInteger) * (1 << OPTION_BITS)
+        + option_code
+    )
+    return (
+        select(packed)
+        .join(ExamAttempt, StudentAnswer.attempt_id == ExamAttempt.id)
+        .where(ExamAttempt.drive_id == drive_id, StudentAnswer.selected_option.isnot(None))
+    )
+
+
+def pack_answers(answer_rows: Iterable[Tuple]) -> np.ndarray:
+    """Pack (attempt_id, question_id, selected_option) rows the way packed_answers_query does"""
+    return np.fromiter(
+        (
+            (attempt_id << ATTEMPT_SHIFT) | (question_id << OPTION_BITS) | OPTION_CODES.get(option, INVALID_CODE)
+            for attempt_id, question_id, option in answer_rows
+        ),
+        dtype=np.int64
+    )
+
+
+def submission_matrix(key: AnswerKey, attempt_ids: np.ndarray, packed_answers: np.ndarray) -> np.ndarray:
+    """
+    (attempts x questions) matrix of option codes, UNANSWERED where blank.
+    attempt_ids must be sorted; answers for unknown attempts or questions are ignored.
+    """
+    matrix = np.full((len(attempt_ids), len(key.question_ids)), UNANSWERED, dtype=np.int8)
+    if not len(packed_answers) or not len(attempt_ids) or not len(key.question_ids):
+        return matrix
+
+    answer_attempts = packed_answers >> ATTEMPT_SHIFT
+    answer_questions = (packed_answers & ((1 << ATTEMPT_SHIFT) - 1)) >> OPTION_BITS
+    codes = (packed_answers & ((1 << OPTION_BITS) - 1)).astype(np.int8)
+    codes[codes == INVALID_CODE] = UNANSWERED
+
+    row_index = np.minimum(np.searchsorted(attempt_ids, answer_attempts), len(attempt_ids) - 1)
+    column_index = np.minimum(np.searchsorted(key.question_ids, answer_questions), len(key.question_ids) - 1)
+    valid = (attempt_ids[row_index] == answer_attempts) & (key.question_ids[column_index] == answer_questions)
+    matrix[row_index[valid], column_index[valid]] = codes[valid]
+    return matrix
+
+
+class GradingResult:
+    """Per-attempt scores and ranks plus per-question rates, all as arrays"""
+
+    __slots__ = (
+        "scores", "correct_counts", "answered_counts", "ranks", "percentiles",
+        "question_correct_rate", "question_answer_rate"
+    )
+
+    def __init__(self, key: AnswerKey, matrix: np.ndarray):
+        attempts = matrix.shape[0]
+        correct = (matrix == key.correct) & (key.correct != UNANSWERED)
+        answered = matrix != UNANSWERED
+
+        self.scores = correct.astype(np.int64) @ key.points
+        self.correct_counts = correct.sum(axis=1)
+        self.answered_counts = answered.sum(axis=1)
+
+        # Competition ranking ("1224"): 1 + number of strictly higher scores
+        sorted_scores = np.sort(self.scores)
+        self.ranks = attempts - np.searchsorted(sorted_scores, self.scores, side="right") + 1
+        self.percentiles = (
+            np.searchsorted(sorted_scores, self.scores, side="left") * 100.0 / attempts
+            if attempts else np.zeros(0)
+        )
+
+        self.question_correct_rate = correct.mean(axis=0) if attempts else np.zeros(len(key.question_ids))
+        self.question_answer_rate = answered.mean(axis=0) if attempts else np.zeros(len(key.question_ids))
+
+
+def grade_submissions(key: AnswerKey, attempt_ids: np.ndarray, packed_answers: np.ndarray) -> GradingResult:
+    return GradingResult(key, submission_matrix(key, attempt_ids, packed_answers))
+
+
+async def grade_drive(db: AsyncSession, drive_id: int) -> dict:
+    """
+    Grade every attempt of a drive and replace its exam_results in bulk.
+
+    No ORM objects are loaded: the answer key and attempts come back as plain
+    rows and the answers as one packed integer each. Scoring runs as array operations in the
+    threadpool, so the event loop is not held for large drives.
+    """
+    questions = (await db.execute(
+        select(
+            Question.id, Question.option_a, Question.option_b, Question.option_c,
+            Question.option_d, Question.correct_answer, Question.points
+        ).where(Question.drive_id == drive_id)
+    )).all()
+    attempts = (await db.execute(
+        select(ExamAttempt.id, ExamAttempt.student_id)
+        .where(ExamAttempt.drive_id == drive_id)
+        .order_by(ExamAttempt.id)
+    )).all()
+    answers = np.fromiter((await db.execute(packed_answers_query(drive_id))).scalars(), dtype=np.int64)
+
+    key = AnswerKey.from_rows(questions)
+    attempt_ids = np.array([attempt_id for attempt_id, _ in attempts], dtype=np.int64)
+    result = await run_in_threadpool(grade_submissions, key, attempt_ids, answers)
+
+    graded_at = datetime.utcnow()
+    max_score = key.max_score
+    rows = [
+        {
+            "drive_id": drive_id,
+            "attempt_id": attempt_id,
+            "student_id": student_id,
+            "score": score,
+            "max_score": max_score,
+            "correct_count": correct_count,
+            "answered_count": answered_count,
+            "rank": rank,
+            "percentile": percentile,
+            "graded_at": graded_at
+        }
+        for (attempt_id, student_id), score, correct_count, answered_count, rank, percentile in zip(
+            attempts,
+            result.scores.tolist(),
+            result.correct_counts.tolist(),
+            result.answered_counts.tolist(),
+            result.ranks.tolist(),
+            result.percentiles.tolist()
+        )
+    ]
+
+    await db.execute(delete(ExamResult).where(ExamResult.drive_id == drive_id))
+    for start in range(0, len(rows), RESULT_BATCH_SIZE):
+        await db.execute(insert(ExamResult), rows[start:start + RESULT_BATCH_SIZE])
+    await db.commit()
+
+    return {
+        "drive_id": drive_id,
+        "graded_count": len(rows),
+        "max_score": max_score,
+        "average_score": float(result.scores.mean()) if len(rows) else None,
+        "highest_score": int(result.scores.max()) if len(rows) else None,
+        "graded_at": graded_at,
+        "question_stats": [
+            {"question_id": question_id, "correct_rate": correct_rate, "answered_rate": answered_rate}
+            for question_id, correct_rate, answered_rate in zip(
+                key.question_ids.tolist(),
+                result.question_correct_rate.tolist(),
+                result.question_answer_rate.tolist()
+            )
+        ]
+    }
@@ -0,0 +1,54 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+
+# Authenticated responses: browsers may keep them but must revalidate (a cheap 304) every time
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def strong_etag(body: bytes, prefix: str = "") -> str:
+    """Strong ETag from a content hash, identical across workers for identical bodies"""
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    return f'"{prefix}-{digest}"' if prefix else f'"{digest}"'
+
+
+def gzip_etag(etag: str) -> str:
+    """ETag of the gzip-encoded representation of the body tagged etag"""
+    return f'{etag[:-1]}-gz"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check; uses weak comparison as the spec requires (proxies may weaken tags)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def cached_bytes_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    gzip_body: Optional[bytes] = None,
+    cache_control: str = REVALIDATE_CACHE_CONTROL
+) -> Response:
+    """
+    Serve pre-serialized JSON: 304 when the client already has this ETag,
+    otherwise the bytes (gzipped when available and accepted). The gzipped
+    bytes are a different representation, so they get their own ETag.
+    """
+    use_gzip = gzip_body is not None and "gzip" in request.headers.get("accept-encoding", "")
+    if use_gzip:
+        etag = gzip_etag(etag)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding, Authorization" if gzip_body is not None else "Authorization"
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=gzip_body, media_type="application/json", headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
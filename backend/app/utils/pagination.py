@@ -0,0 +1,57 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 500
+
+
+def page_limit(default: int = 100):
+    """`limit` query parameter for keyset paginated routes; out-of-range values are a 422"""
+    return Query(default, ge=1, le=MAX_PAGE_SIZE)
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) position as an opaque cursor string"""
+    raw = json.dumps([created_at.isoformat(), row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Decode a cursor produced by encode_cursor back into (created_at, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def keyset_paginate(query, model, cursor: Optional[str], limit: int, response: Response):
+    """
+    Fetch one page of `query` ordered newest first on (created_at, id).
+
+    Rows after `cursor` are selected with a row-value comparison so the database
+    can seek on the (created_at, id) index instead of scanning past an offset.
+    When more rows remain, the cursor for the next page is returned in the
+    X-Next-Cursor response header. created_at must be non-null; routes bound
+    `limit` with page_limit().
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+
+    return rows
@@ -0,0 +1,165 @@
+import asyncio
+import gzip
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.database.config import settings
+from app.database.connection import AsyncSessionLocal
+from app.models import Drive, Question
+from app.utils.drive_events import drive_events
+from app.utils.http_cache import cached_bytes_response, strong_etag
+
+# Columns students may see; correct_answer is deliberately absent
+PAPER_COLUMNS = (
+    Question.id, Question.question_text, Question.option_a, Question.option_b,
+    Question.option_c, Question.option_d, Question.points
+)
+
+
+class PaperSnapshot:
+    """
+    A drive's question paper serialized once: JSON bytes, their gzip and a
+    strong ETag. version is the drive's updated_at when the paper was built.
+    """
+
+    __slots__ = ("drive_id", "version", "checked_at", "question_ids", "etag", "body", "gzip_body")
+
+    def __init__(self, drive_id: int, version: Optional[datetime], title: str, duration_minutes: Optional[int], questions):
+        payload = {
+            "drive_id": drive_id,
+            "title": title,
+            "duration_minutes": duration_minutes,
+            "questions": [dict(row._mapping) for row in questions]
+        }
+        self.drive_id = drive_id
+        self.version = version
+        self.checked_at = time.monotonic()
+        # Lets answer saves be validated without a query
+        self.question_ids = frozenset(question["id"] for question in payload["questions"])
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = strong_etag(self.body, prefix=str(drive_id))
+        # mtime=0 keeps the compressed bytes identical across workers and rebuilds
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+
+    def response(self, request: Request) -> Response:
+        """The paper as a raw response: 304 on a matching ETag, gzipped bytes when accepted"""
+        return cached_bytes_response(request, self.body, self.etag, gzip_body=self.gzip_body)
+
+
+class PaperSnapshotCache:
+    """
+    Frozen question papers kept in process, so the exam-start surge of paper
+    downloads costs a dictionary lookup and a bytes write per request.
+
+    Questions cannot be changed once a drive is approved, so a paper is frozen
+    on approval and on exam start (or on first fetch, e.g. after a restart or
+    in another worker) and then served as-is. It is dropped when the drive is
+    edited, unapproved or deleted. At most max_drives papers are kept, least
+    recently used first out.
+
+    Those drops only reach this process, so a paper older than
+    revalidate_seconds is checked against the drive's updated_at (a primary
+    key lookup) and rebuilt if another worker changed the drive since.
+    """
+
+    def __init__(self, max_drives: int, revalidate_seconds: float):
+        self.max_drives = max_drives
+        self.revalidate_seconds = revalidate_seconds
+        self._snapshots: "OrderedDict[int, PaperSnapshot]" = OrderedDict()
+        self._loading: Dict[int, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def _store(self, snapshot: PaperSnapshot) -> PaperSnapshot:
+        with self._lock:
+            self._snapshots[snapshot.drive_id] = snapshot
+            self._snapshots.move_to_end(snapshot.drive_id)
+            while len(self._snapshots) > self.max_drives:
+                self._snapshots.popitem(last=False)
+        return snapshot
+
+    def _cached(self, drive_id: int) -> Optional[PaperSnapshot]:
+        with self._lock:
+            snapshot = self._snapshots.get(drive_id)
+            if snapshot is not None:
+                self._snapshots.move_to_end(drive_id)
+            return snapshot
+
+    def freeze(self, db: Session, drive) -> PaperSnapshot:
+        """Build the paper of an approved drive from a sync session unless already frozen"""
+        snapshot = self._cached(drive.id)
+        if snapshot is not None and snapshot.version == drive.updated_at:
+            return snapshot
+        questions = db.execute(select(*PAPER_COLUMNS).where(Question.drive_id == drive.id).order_by(Question.id))
+        return self._store(PaperSnapshot(drive.id, drive.updated_at, drive.title, drive.duration_minutes, questions))
+
+    async def _load(self, drive_id: int, cached: Optional[PaperSnapshot]) -> Optional[PaperSnapshot]:
+        async with AsyncSessionLocal() as db:
+            drive = (await db.execute(
+                select(Drive.title, Drive.duration_minutes, Drive.updated_at).where(Drive.id == drive_id)
+            )).first()
+            if drive is None:
+                self.invalidate(drive_id)
+                return None
+            if cached is not None and cached.version == drive.updated_at:
+                cached.checked_at = time.monotonic()
+                return cached
+            questions = await db.execute(
+                select(*PAPER_COLUMNS).where(Question.drive_id == drive_id).order_by(Question.id)
+            )
+            return self._store(
+                PaperSnapshot(drive_id, drive.updated_at, drive.title, drive.duration_minutes, questions)
+            )
+
+    async def get(self, drive_id: int) -> Optional[PaperSnapshot]:
+        """Frozen paper for a drive, built or revalidated at most once concurrently; None if the drive does not exist"""
+        snapshot = self._cached(drive_id)
+        if snapshot is not None and time.monotonic() - snapshot.checked_at < self.revalidate_seconds:
+            return snapshot
+
+        pending = self._loading.get(drive_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[drive_id] = future
+        try:
+            snapshot = await self._load(drive_id, snapshot)
+            future.set_result(snapshot)
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters receive the exception; mark it retrieved for the loop's sake
+            future.exception()
+            raise
+        finally:
+            self._loading.pop(drive_id, None)
+        return snapshot
+
+    def invalidate(self, drive_id: int):
+        """Drop a drive's paper; safe to call from any thread"""
+        with self._lock:
+            self._snapshots.pop(drive_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._snapshots.clear()
+
+
+paper_snapshots = PaperSnapshotCache(
+    max_drives=settings.paper_snapshot_max_drives,
+    revalidate_seconds=settings.paper_snapshot_revalidate_seconds
+)
+
+
+def _invalidate_on_change(event: dict):
+    # Title/duration edits change the paper; unapproved drives may get new questions
+    if event["type"] == "drive_deleted" or event.get("reason") == "updated" or not event.get("is_approved"):
+        paper_snapshots.invalidate(event["drive_id"])
+
+
+drive_events.add_listener(_invalidate_on_change)
@@ -0,0 +1,125 @@
+import csv
+import io
+from typing import BinaryIO, Dict, List, Optional
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models import Question
+
+OPTION_COLUMNS = ['option_a', 'option_b', 'option_c', 'option_d']
+OPTION_LETTERS = {'A': 'option_a', 'B': 'option_b', 'C': 'option_c', 'D': 'option_d'}
+# Both upload dialects are accepted: "question" (original csv-upload) and "question_text"
+QUESTION_TEXT_COLUMNS = ['question_text', 'question']
+QUESTION_IMPORT_BATCH_SIZE = 1000
+
+
+class QuestionImportError(ValueError):
+    """Raised when the uploaded CSV cannot be imported as a whole"""
+
+
+def _question_text_column(fieldnames) -> Optional[str]:
+    for column in QUESTION_TEXT_COLUMNS:
+        if column in fieldnames:
+            return column
+    return None
+
+
+def parse_question_row(row: Dict[str, str], question_column: str, drive_id: int) -> Dict:
+    """
+    Validate one CSV row and return the values to insert.
+
+    correct_answer may be the text of one of the options or the letter A-D; it is
+    always stored as the option text. Raises ValueError describing every problem
+    found in the row.
+    """
+    values = {
+        'question_text': (row.get(question_column) or '').strip(),
+        **{column: (row.get(column) or '').strip() for column in OPTION_COLUMNS}
+    }
+    correct_answer = (row.get('correct_answer') or '').strip()
+
+    problems = []
+    missing_fields = [field for field, value in values.items() if not value]
+    if not correct_answer:
+        missing_fields.append('correct_answer')
+    if missing_fields:
+        problems.append(f"Missing fields: {', '.join(missing_fields)}")
+
+    options = [values[column] for column in OPTION_COLUMNS]
+    if correct_answer and correct_answer not in options:
+        letter_column = OPTION_LETTERS.get(correct_answer.upper())
+        if letter_column:
+            correct_answer = values[letter_column]
+        else:
+            problems.append("correct_answer must be one of the provided options or A, B, C, D")
+
+    points_value = (row.get('points') or '').strip()
+    points = 1
+    if points_value:
+        try:
+            points = int(points_value)
+        except ValueError:
+            problems.append(f"points must be a whole number, got '{points_value}'")
+
+    if problems:
+        raise ValueError("; ".join(problems))
+
+    return {
+        'drive_id': drive_id,
+        **values,
+        'correct_answer': correct_answer,
+        'points': points
+    }
+
+
+def import_questions_csv(
+    file: BinaryIO,
+    drive_id: int,
+    db: Session,
+    batch_size: int = QUESTION_IMPORT_BATCH_SIZE
+) -> Dict:
+    """
+    Stream questions from a CSV upload into a drive.
+
+    Rows are validated as they are read and valid ones are bulk inserted in
+    batches of batch_size. Invalid rows do not stop the import; every row error
+    is collected and returned. The caller commits the session.
+
+    Returns {"inserted": n, "errors": ["Row 3: ...", ...]}.
+    """
+    text = io.TextIOWrapper(file, encoding='utf-8', newline='')
+    try:
+        csv_reader = csv.DictReader(text)
+        fieldnames = csv_reader.fieldnames or []
+
+        question_column = _question_text_column(fieldnames)
+        missing_columns = [col for col in OPTION_COLUMNS + ['correct_answer'] if col not in fieldnames]
+        if question_column is None or missing_columns:
+            raise QuestionImportError(
+                "CSV must contain columns: question (or question_text), "
+                "option_a, option_b, option_c, option_d, correct_answer"
+            )
+
+        batch: List[Dict] = []
+        errors: List[str] = []
+        inserted = 0
+
+        for row_num, row in enumerate(csv_reader, start=2):  # Start from row 2 (after header)
+            try:
+                batch.append(parse_question_row(row, question_column, drive_id))
+            except ValueError as e:
+                errors.append(f"Row {row_num}: {str(e)}")
+                continue
+
+            if len(batch) >= batch_size:
+                db.execute(insert(Question), batch)
+                inserted += len(batch)
+                batch = []
+
+        if batch:
+            db.execute(insert(Question), batch)
+            inserted += len(batch)
+
+        return {"inserted": inserted, "errors": errors}
+    finally:
+        # Leave the underlying upload open for FastAPI to clean up
+        text.detach()
@@ -0,0 +1,82 @@
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from app.database.config import settings
+from app.schemas.company import CollegeResponse, StudentGroupResponse
+from app.utils.http_cache import cached_bytes_response, strong_etag
+
+COLLEGES = "colleges"
+STUDENT_GROUPS = "student_groups"
+
+_ADAPTERS = {
+    COLLEGES: TypeAdapter(List[CollegeResponse]),
+    STUDENT_GROUPS: TypeAdapter(List[StudentGroupResponse]),
+}
+
+
+class ReferenceDataCache:
+    """
+    Serialized college and student-group lists (JSON bytes plus ETag) kept in
+    process; the drive form loads them on every visit and they rarely change.
+
+    Each kind (colleges, student groups) has a version that the admin write
+    endpoints bump via invalidate(). A list loaded while the version changed
+    is served but not stored, so a slow load cannot cache pre-change data.
+    Entries also expire after ttl_seconds, which bounds staleness when another
+    worker made the change. ETags are content hashes, so they agree across
+    workers and browsers get 304s whichever worker answers.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._versions: Dict[str, int] = {COLLEGES: 0, STUDENT_GROUPS: 0}
+        # (kind, variant) -> (version, loaded_at, body, etag)
+        self._entries: Dict[Tuple[str, str], Tuple[int, float, bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, variant: str, load: Callable[[], list]) -> Tuple[bytes, str]:
+        """(body, etag) for a list, calling load() for its ORM rows on a miss"""
+        with self._lock:
+            version = self._versions[kind]
+            entry = self._entries.get((kind, variant))
+            if entry is not None and entry[0] == version and time.monotonic() - entry[1] < self.ttl_seconds:
+                return entry[2], entry[3]
+
+        adapter = _ADAPTERS[kind]
+        body = adapter.dump_json(adapter.validate_python(load(), from_attributes=True))
+        etag = strong_etag(body, prefix=kind)
+
+        with self._lock:
+            if self._versions[kind] == version:
+                self._entries[(kind, variant)] = (version, time.monotonic(), body, etag)
+        return body, etag
+
+    def response(self, request: Request, kind: str, variant: str, load: Callable[[], list]) -> Response:
+        body, etag = self.get(kind, variant, load)
+        return cached_bytes_response(request, body, etag)
+
+    def invalidate(self, kind: str):
+        """Bump a kind's version after a write; safe to call from any thread"""
+        with self._lock:
+            self._versions[kind] += 1
+            for key in [key for key in self._entries if key[0] == kind]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            for kind in self._versions:
+                self._versions[kind] += 1
+            self._entries.clear()
+
+
+reference_cache = ReferenceDataCache(ttl_seconds=settings.reference_cache_ttl_seconds)
+
+
+def invalidate_custom_reference_data(targets):
+    """Drive targets with custom names may have created (unapproved) colleges or groups, which admins list"""
+    if any(target.custom_college_name for target in targets):
+        reference_cache.invalidate(COLLEGES)
+    if any(target.custom_student_group_name for target in targets):
+        reference_cache.invalidate(STUDENT_GROUPS)
@@ -0,0 +1,197 @@
+import bisect
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+from app.database.query_audit import query_auditor
+from app.database.query_metrics import QueryStats, current_query_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Requests that matched no route share one label, so scanners cannot blow up the series count
+UNMATCHED_ROUTE = "<unmatched>"
+METRIC_PREFIX = "cxp_http_request"
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense; not thread-safe on its own"""
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        """(le, count) pairs, ending with +Inf"""
+        running = 0
+        for bound, count in zip(self.bounds, self.counts):
+            running += count
+            yield repr(float(bound)), running
+        yield "+Inf", self.count
+
+
+def percentiles_ms(sorted_seconds: Sequence[float], fractions: Sequence[float] = (0.50, 0.95, 0.99)) -> Dict[str, Optional[float]]:
+    """{"p50": ..., "p95": ..., "p99": ...} of sorted durations in seconds, in milliseconds; None when there are none"""
+    return {
+        f"p{round(fraction * 100)}": (
+            round(sorted_seconds[min(len(sorted_seconds) - 1, int(len(sorted_seconds) * fraction))] * 1000, 3)
+            if sorted_seconds else None
+        )
+        for fraction in fractions
+    }
+
+
+class RouteMetrics:
+    __slots__ = ("latency", "db_time", "statements", "responses")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_time = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.responses: Dict[int, int] = {}
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value))
+
+
+class RequestMetrics:
+    """Per-route request latency, DB time and SQL statement count, kept in process"""
+
+    def __init__(self):
+        self._routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, route: str, status_code: int, seconds: float, stats: QueryStats):
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = RouteMetrics()
+            metrics.latency.observe(seconds)
+            metrics.db_time.observe(stats.db_seconds)
+            metrics.statements.observe(stats.statements)
+            metrics.responses[status_code] = metrics.responses.get(status_code, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+    def prometheus(self) -> str:
+        """All series in the Prometheus text exposition format (version 0.0.4)"""
+        histograms = (
+            ("duration_seconds", "latency", "Time from receiving a request to its last response byte"),
+            ("db_seconds", "db_time", "Time spent executing SQL statements per request"),
+            ("db_statements", "statements", "SQL statements executed per request"),
+        )
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = []
+            for suffix, attribute, help_text in histograms:
+                name = f"{METRIC_PREFIX}_{suffix}"
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (method, route), metrics in routes:
+                    histogram = getattr(metrics, attribute)
+                    labels = f'method="{_label(method)}",route="{_label(route)}"'
+                    for le, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+                    lines.append(f"{name}_sum{{{labels}}} {_number(histogram.total)}")
+                    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+            name = "cxp_http_responses_total"
+            lines.append(f"# HELP {name} Responses by route and status code")
+            lines.append(f"# TYPE {name} counter")
+            for (method, route), metrics in routes:
+                for status_code, count in sorted(metrics.responses.items()):
+                    lines.append(
+                        f'{name}{{method="{_label(method)}",route="{_label(route)}",status="{status_code}"}} {count}'
+                    )
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics()
+
+
+@lru_cache(maxsize=None)
+def _route_match(path_regex: str) -> "re.Pattern[str]":
+    # Unanchored at the start, so it finds where the route's own path begins in the request path
+    return re.compile(path_regex.removeprefix("^"))
+
+
+def route_label(scope) -> str:
+    """
+    The matched route as a template (/api/company/drives/{drive_id}), not the raw URL.
+
+    Built from route.path_format. Some FastAPI versions report it without the
+    include_router prefix, so the request path ahead of the part the route
+    matched is prepended (empty when path_format already has the prefix).
+    """
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    path = scope["path"]
+    match = _route_match(route.path_regex.pattern).search(path)
+    return (path[:match.start()] if match else "") + route.path_format
+
+
+def server_timing(seconds: float, stats: QueryStats) -> bytes:
+    return (
+        f'app;dur={seconds * 1000:.2f}, '
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} statements"'
+    ).encode("latin-1")
+
+
+class RequestMetricsMiddleware:
+    """
+    Times each HTTP request and counts the SQL statements it issues.
+
+    A plain ASGI middleware rather than BaseHTTPMiddleware, so streamed
+    responses (the SSE event streams) pass through untouched. The
+    Server-Timing header carries the time and statements up to the point the
+    response starts; the histograms record the whole request, so for event
+    streams they measure the connection lifetime.
+    """
+
+    def __init__(self, app, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = query_auditor.new_stats()
+        token = current_query_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(time.perf_counter() - started, stats)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            route = route_label(scope)
+            self.metrics.record(scope["method"], route, status_code, time.perf_counter() - started, stats)
+            query_auditor.request_finished(scope["method"], route, stats)
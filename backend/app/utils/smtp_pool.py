@@ -0,0 +1,195 @@
+import logging
+import queue
+import smtplib
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+from app.database.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Errors after which the connection is assumed dead and is re-opened before retrying
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+_STOP = object()
+_WORKER_DONE = object()
+
+
+def open_smtp_connection() -> smtplib.SMTP:
+    """Open an authenticated SMTP connection using the configured settings"""
+    server = smtplib.SMTP(settings.smtp_server, settings.smtp_port, timeout=settings.smtp_timeout_seconds)
+    if settings.smtp_use_tls:
+        server.starttls()
+    if settings.smtp_username:
+        server.login(settings.smtp_username, settings.smtp_password)
+    return server
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SMTPSenderPool:
+    """
+    Send messages over N concurrent SMTP connections.
+
+    Use as a context manager: all connections are opened on entry (or by an
+    earlier open() call) so that authentication or connection problems surface
+    before any message is sent.
+    send() yields (key, error) per message as workers finish them; error is
+    None on success. A connection that drops mid-batch is re-opened and the
+    message retried up to max_retries times.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        rate_limiter: Optional[TokenBucket] = None,
+        connect: Callable[[], smtplib.SMTP] = open_smtp_connection,
+        max_retries: int = 2
+    ):
+        self.size = max(1, size)
+        self.rate_limiter = rate_limiter
+        self.connect = connect
+        self.max_retries = max_retries
+        self._connections = []
+
+    def open(self):
+        """Open all connections, closing any already opened if one fails"""
+        try:
+            for _ in range(self.size):
+                self._connections.append(self.connect())
+        except Exception:
+            self._close_all()
+            raise
+
+    def __enter__(self):
+        if not self._connections:
+            self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._close_all()
+
+    def _close_all(self):
+        for connection in self._connections:
+            if connection is None:
+                continue
+            try:
+                connection.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+        self._connections = []
+
+    def _send_one(self, index: int, message) -> Optional[str]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                if self._connections[index] is None:
+                    self._connections[index] = self.connect()
+                self._connections[index].send_message(message)
+                return None
+            except RECONNECT_ERRORS as e:
+                logger.warning(f"SMTP connection {index} lost ({str(e)}), reconnecting")
+                self._connections[index] = None
+                if attempt == self.max_retries:
+                    return str(e)
+            except Exception as e:
+                return str(e)
+
+    def _worker(self, index: int, inbox: queue.Queue, outbox: queue.Queue):
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                outbox.put(_WORKER_DONE)
+                return
+            key, message = item
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            outbox.put((key, self._send_one(index, message)))
+
+    def send(self, items: Iterable[Tuple[object, object]]) -> Iterator[Tuple[object, Optional[str]]]:
+        """Send (key, message) pairs, yielding (key, error) as each one completes"""
+        inbox = queue.Queue(maxsize=self.size * 4)
+        outbox = queue.Queue()
+        workers = [
+            threading.Thread(target=self._worker, args=(i, inbox, outbox), name=f"smtp-sender-{i}", daemon=True)
+            for i in range(len(self._connections))
+        ]
+        for worker in workers:
+            worker.start()
+
+        def drain():
+            while True:
+                try:
+                    result = outbox.get_nowait()
+                except queue.Empty:
+                    return
+                if result is not _WORKER_DONE:
+                    yield result
+
+        finished = 0
+        try:
+            # Items are produced on the calling thread (so it can use its own DB session)
+            # and handed to workers through a bounded queue to keep memory flat.
+            for item in items:
+                while True:
+                    yield from drain()
+                    try:
+                        inbox.put(item, timeout=0.05)
+                        break
+                    except queue.Full:
+                        continue
+
+            for _ in workers:
+                inbox.put(_STOP)
+
+            while finished < len(workers):
+                result = outbox.get()
+                if result is _WORKER_DONE:
+                    finished += 1
+                else:
+                    yield result
+        finally:
+            if finished < len(workers):
+                # The caller stopped early: drop unsent items so every worker sees a stop marker
+                while True:
+                    try:
+                        inbox.get_nowait()
+                    except queue.Empty:
+                        break
+                for _ in workers:
+                    inbox.put(_STOP)
+
+
+def _process_rate_limiter() -> Optional[TokenBucket]:
+    """This process's share of the SMTP rate limit; each worker process sends at rate / processes"""
+    rate = settings.smtp_rate_limit_per_second / max(1, settings.smtp_rate_limit_processes)
+    return TokenBucket(rate) if rate > 0 else None
+
+
+# Shared by every pool in the process, so concurrent email jobs stay within one limit together
+rate_limiter = _process_rate_limiter()
+
+
+def create_sender_pool() -> SMTPSenderPool:
+    """Sender pool sized from settings, throttled by the process-wide rate limiter"""
+    return SMTPSenderPool(settings.smtp_pool_size, rate_limiter=rate_limiter)
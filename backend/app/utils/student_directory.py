@@ -0,0 +1,221 @@
+import asyncio
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.config import settings
+from app.database.connection import AsyncSessionLocal
+from app.models import Drive, Student
+from app.utils.drive_events import drive_events, exam_end_deadline
+from app.utils.email_processor import EmailTemplateProcessor
+
+# Drives whose students may not log in regardless of exam timing
+CLOSED_DRIVE_STATUSES = ("draft", "submitted", "rejected", "suspended")
+
+# (student_id, roll_number, name)
+RosterStudent = Tuple[int, str, Optional[str]]
+
+# Re-read on every lookup: starts, ends and suspensions may happen in another worker process
+DRIVE_STATE_COLUMNS = (
+    Drive.id, Drive.title, Drive.status, Drive.is_approved, Drive.scheduled_start,
+    Drive.actual_start, Drive.actual_end, Drive.duration_minutes
+)
+# A failed login reloads a roster at most this often, for students added in another worker
+MISS_RELOAD_SECONDS = 10
+
+
+class DriveRoster:
+    """
+    Everything needed to authenticate a drive's students without scanning
+    them: the expected password and dictionaries from roll number and email
+    to student, plus the drive's status and timing as of the last lookup.
+    """
+
+    __slots__ = (
+        "drive_id", "title", "status", "is_approved", "scheduled_start", "actual_start",
+        "actual_end", "duration_minutes", "password", "by_roll", "by_email", "student_ids", "loaded_at"
+    )
+
+    def __init__(self, drive, students):
+        self.title = None
+        self.apply_drive_state(drive)
+        self.by_roll: Dict[str, RosterStudent] = {}
+        self.by_email: Dict[str, RosterStudent] = {}
+        self.student_ids = set()
+        for student_id, roll_number, email, name in students:
+            entry = (student_id, roll_number, name)
+            self.by_roll[roll_number] = entry
+            self.by_email[email.lower()] = entry
+            self.student_ids.add(student_id)
+        self.loaded_at = time.monotonic()
+
+    def apply_drive_state(self, drive):
+        """Take the status and timing (and, if the title changed, the password) from a drive row"""
+        self.drive_id = drive.id
+        if drive.title != self.title:
+            # The password emailed to every student of the drive
+            self.password = EmailTemplateProcessor.generate_password(drive.title).encode("utf-8")
+        self.title = drive.title
+        self.status = drive.status
+        self.is_approved = drive.is_approved
+        self.scheduled_start = drive.scheduled_start
+        self.actual_start = drive.actual_start
+        self.actual_end = drive.actual_end
+        self.duration_minutes = drive.duration_minutes
+
+    def authenticate(self, identifier: str, password: str) -> Optional[RosterStudent]:
+        """Look up a student by roll number or email and check the drive password"""
+        identifier = identifier.strip()
+        student = self.by_roll.get(identifier) or self.by_email.get(identifier.lower())
+        password_ok = hmac.compare_digest(password.encode("utf-8"), self.password)
+        return student if student and password_ok else None
+
+    def has_student(self, student_id: int) -> bool:
+        return student_id in self.student_ids
+
+    def exam_state(self, now: Optional[datetime] = None) -> str:
+        now = now or datetime.utcnow()
+        if not self.actual_start:
+            return "not_started"
+        if self.actual_end or exam_end_deadline(self) <= now:
+            return "ended"
+        return "ongoing"
+
+    def time_remaining(self, now: Optional[datetime] = None) -> Optional[float]:
+        """Seconds until the exam ends, or None unless it is ongoing"""
+        now = now or datetime.utcnow()
+        if self.exam_state(now) != "ongoing":
+            return None
+        return (exam_end_deadline(self) - now).total_seconds()
+
+    def is_open(self) -> bool:
+        """Whether students may log in (approved, not closed by status, not ended)"""
+        return (
+            bool(self.is_approved)
+            and self.status not in CLOSED_DRIVE_STATUSES
+            and self.exam_state() != "ended"
+        )
+
+    def accepts_answers(self) -> bool:
+        """Whether the paper may be fetched and answers saved right now"""
+        return self.is_open() and self.exam_state() == "ongoing"
+
+
+class StudentDirectory:
+    """
+    Per-drive rosters cached in process for student login.
+
+    When a drive goes live thousands of students log in within a minute; each
+    login is a dictionary lookup instead of a PBKDF2 hash and a students scan.
+    A roster is loaded once (concurrent logins for the same drive wait on the
+    same load), kept for ttl_seconds, and dropped as soon as the drive changes
+    (via drive events) or its students are re-uploaded. At most max_drives
+    rosters are kept, least recently used first out.
+
+    Only the students are cached across requests. Drive events and upload
+    invalidations reach this process only, so every lookup re-reads the
+    drive's status and timing by primary key: an exam started, ended or
+    suspended in another worker takes effect immediately. A failed login
+    reloads the students (at most every MISS_RELOAD_SECONDS), for students
+    added through another worker.
+    """
+
+    def __init__(self, ttl_seconds: float, max_drives: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_drives = max_drives
+        self._rosters: "OrderedDict[int, DriveRoster]" = OrderedDict()
+        self._loading: Dict[int, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    async def _load(self, drive_id: int) -> Optional[DriveRoster]:
+        async with AsyncSessionLocal() as db:
+            drive = await db.scalar(select(Drive).where(Drive.id == drive_id))
+            if drive is None:
+                return None
+            students = await db.execute(
+                select(Student.id, Student.roll_number, Student.email, Student.name)
+                .where(Student.drive_id == drive_id)
+            )
+            return DriveRoster(drive, students.all())
+
+    async def get(self, db: AsyncSession, drive_id: int) -> Optional[DriveRoster]:
+        """
+        Roster for a drive with its current status and timing, loading the
+        students at most once concurrently; None if the drive does not exist
+        """
+        with self._lock:
+            roster = self._rosters.get(drive_id)
+            if roster is not None and time.monotonic() - roster.loaded_at < self.ttl_seconds:
+                self._rosters.move_to_end(drive_id)
+            else:
+                roster = None
+
+        if roster is not None:
+            drive = (await db.execute(select(*DRIVE_STATE_COLUMNS).where(Drive.id == drive_id))).first()
+            if drive is None:
+                self.invalidate(drive_id)
+                return None
+            roster.apply_drive_state(drive)
+            return roster
+        return await self._get_loaded(drive_id)
+
+    async def authenticate(self, db: AsyncSession, drive_id: int, identifier: str, password: str):
+        """(roster, student) for a login; student is None for unknown students or a wrong password"""
+        roster = await self.get(db, drive_id)
+        if roster is None:
+            return None, None
+        student = roster.authenticate(identifier, password)
+        if student is None and time.monotonic() - roster.loaded_at >= MISS_RELOAD_SECONDS:
+            self.invalidate(drive_id)
+            roster = await self.get(db, drive_id)
+            student = roster.authenticate(identifier, password) if roster else None
+        return roster, student
+
+    async def _get_loaded(self, drive_id: int) -> Optional[DriveRoster]:
+
+        pending = self._loading.get(drive_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[drive_id] = future
+        try:
+            roster = await self._load(drive_id)
+            future.set_result(roster)
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters receive the exception; mark it retrieved for the loop's sake
+            future.exception()
+            raise
+        finally:
+            self._loading.pop(drive_id, None)
+
+        if roster is not None:
+            with self._lock:
+                self._rosters[drive_id] = roster
+                self._rosters.move_to_end(drive_id)
+                while len(self._rosters) > self.max_drives:
+                    self._rosters.popitem(last=False)
+        return roster
+
+    def invalidate(self, drive_id: int):
+        """Drop a drive's roster; safe to call from any thread"""
+        with self._lock:
+            self._rosters.pop(drive_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._rosters.clear()
+
+
+student_directory = StudentDirectory(
+    ttl_seconds=settings.student_directory_ttl_seconds,
+    max_drives=settings.student_directory_max_drives
+)
+
+# Any drive change (title -> password, start, end, suspension) invalidates its roster
+drive_events.add_listener(lambda event: student_directory.invalidate(event["drive_id"]))
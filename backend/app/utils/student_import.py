@@ -0,0 +1,115 @@
+import csv
+import io
+from typing import BinaryIO, Dict, List
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.models import Student
+
+REQUIRED_STUDENT_COLUMNS = ['roll_number', 'email', 'name']
+STUDENT_IMPORT_BATCH_SIZE = 1000
+
+# Dialects whose INSERT supports ON CONFLICT (drive_id, roll_number) DO NOTHING
+_UPSERT_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+class StudentImportError(ValueError):
+    """Raised when the uploaded CSV cannot be imported as a whole"""
+
+
+def _insert_batch(db: Session, rows: List[Dict]) -> int:
+    """Insert a batch of student rows, skipping ones already in the drive. Returns rows inserted"""
+    dialect_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+
+    if dialect_insert is not None:
+        stmt = dialect_insert(Student).on_conflict_do_nothing(
+            index_elements=[Student.drive_id, Student.roll_number]
+        ).returning(Student.id)
+        return len(db.execute(stmt, rows).all())
+
+    # Generic fallback: one lookup per batch for roll numbers already present
+    drive_id = rows[0]["drive_id"]
+    existing = {
+        roll for (roll,) in db.query(Student.roll_number).filter(
+            Student.drive_id == drive_id,
+            Student.roll_number.in_([row["roll_number"] for row in rows])
+        )
+    }
+    new_rows = [row for row in rows if row["roll_number"] not in existing]
+    if new_rows:
+        db.execute(insert(Student), new_rows)
+    return len(new_rows)
+
+
+def import_students_csv(
+    file: BinaryIO,
+    drive_id: int,
+    company_id: int,
+    db: Session,
+    batch_size: int = STUDENT_IMPORT_BATCH_SIZE
+) -> Dict[str, int]:
+    """
+    Stream students from a CSV upload into a drive.
+
+    The file is decoded and parsed row by row, so only one batch of rows is held
+    in memory at a time. Rows missing a roll number, email or name are not
+    imported and are reported as row errors. Roll numbers repeated within the
+    file are skipped using a set, and rows already in the drive are skipped by
+    the database through the unique (drive_id, roll_number) constraint. The
+    caller commits the session.
+
+    Returns {"inserted": n, "skipped": m, "errors": ["Row 3: ...", ...]}.
+    """
+    text = io.TextIOWrapper(file, encoding='utf-8', newline='')
+    try:
+        csv_reader = csv.DictReader(text)
+
+        if not csv_reader.fieldnames or not all(col in csv_reader.fieldnames for col in REQUIRED_STUDENT_COLUMNS):
+            raise StudentImportError(f"CSV must contain columns: {', '.join(REQUIRED_STUDENT_COLUMNS)}")
+
+        seen_roll_numbers = set()
+        batch = []
+        errors: List[str] = []
+        inserted = 0
+        skipped = 0
+
+        for row_num, row in enumerate(csv_reader, start=2):  # Start from row 2 (after header)
+            values = {column: (row.get(column) or '').strip() for column in REQUIRED_STUDENT_COLUMNS}
+            missing = [column for column in REQUIRED_STUDENT_COLUMNS if not values[column]]
+            if missing:
+                errors.append(f"Row {row_num}: Missing fields: {', '.join(missing)}")
+                continue
+
+            roll_number = values['roll_number']
+            if roll_number in seen_roll_numbers:
+                skipped += 1
+                continue
+            seen_roll_numbers.add(roll_number)
+
+            batch.append({
+                "drive_id": drive_id,
+                "company_id": company_id,
+                "roll_number": roll_number,
+                "email": values['email'].lower(),
+                "name": values['name']
+            })
+
+            if len(batch) >= batch_size:
+                added = _insert_batch(db, batch)
+                inserted += added
+                skipped += len(batch) - added
+                batch = []
+
+        if batch:
+            added = _insert_batch(db, batch)
+            inserted += added
+            skipped += len(batch) - added
+
+        return {"inserted": inserted, "skipped": skipped, "errors": errors}
+    finally:
+        # Leave the underlying upload open for FastAPI to clean up
+        text.detach()
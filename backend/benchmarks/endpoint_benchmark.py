@@ -0,0 +1,403 @@
+"""
+p50/p99 latency and throughput of the main API endpoints against a large tenant.
+
+Run from the backend directory:
+    python -m benchmarks.endpoint_benchmark --url sqlite:///benchmark.db --scale 0.01 --output baseline.json
+    python -m benchmarks.endpoint_benchmark --url sqlite:///benchmark.db --baseline baseline.json --fail-on-regression
+
+An empty database is filled by benchmarks.datagen at --scale first; a filled
+one is reused as is. The app runs as a real uvicorn process, with emails going
+to benchmarks.stub_smtp (rate limit off, so the app rather than the provider
+cap is measured). Read scenarios use the large tenant's drives; write
+scenarios get fresh drives under company 2 so they do not change what the
+read scenarios see. Each scenario sends --requests requests from
+--concurrency keep-alive connections after --warmup unmeasured ones.
+
+--output writes the results as JSON; --baseline compares against such a file
+and flags a scenario whose p50 or p99 grew (or throughput fell) by more than
+--tolerance. Compare runs on the same machine, database and scale only.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from benchmarks import datagen
+from benchmarks.stub_smtp import StubSMTPServer
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+WRITE_COMPANY_ID = 2
+SERVER_START_TIMEOUT_SECONDS = 60
+EMAIL_DRAIN_TIMEOUT_SECONDS = 300
+# Compared against a baseline; throughput is compared inversely
+COMPARED_METRICS = ("p50_ms", "p99_ms", "throughput_rps")
+
+
+class Client:
+    """One keep-alive HTTP connection; a benchmark worker thread owns one"""
+
+    def __init__(self, port: int):
+        self.connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+
+    def request(self, method: str, path: str, headers: dict = None, body: bytes = None):
+        try:
+            self.connection.request(method, path, body=body, headers=headers or {})
+            response = self.connection.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            # The server closed the idle keep-alive connection; reconnect once
+            self.connection.close()
+            self.connection.request(method, path, body=body, headers=headers or {})
+            response = self.connection.getresponse()
+        return response.status, response.read()
+
+    def json(self, method: str, path: str, payload=None, headers: dict = None):
+        body = json.dumps(payload).encode() if payload is not None else None
+        status, data = self.request(method, path, {**(headers or {}), "Content-Type": "application/json"}, body)
+        if status >= 400:
+            raise SystemExit(f"{method} {path} returned {status}: {data[:300]!r}")
+        return json.loads(data)
+
+    def close(self):
+        self.connection.close()
+
+
+def multipart_csv(filename: str, content: str):
+    """(headers, body) for a single-file upload named 'file'"""
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: text/csv\r\n\r\n{content}\r\n--{boundary}--\r\n"
+    ).encode()
+    return {"Content-Type": f"multipart/form-data; boundary={boundary}"}, body
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), round(fraction * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+class Scenario:
+    """
+    One endpoint under load. request(index) returns (method, path, headers,
+    body); each index is used once. finish(client) may add metrics measured
+    after the timed requests (the email scenario waits for its jobs there).
+    """
+
+    def __init__(self, name: str, request, finish=None):
+        self.name = name
+        self.request = request
+        self.finish = finish
+
+
+def questions_csv(templates: datagen.Templates, rng: random.Random, rows: int, index: int) -> str:
+    lines = ["question,option_a,option_b,option_c,option_d,correct_answer,points"]
+    for number in range(rows):
+        row = templates.question_row(rng, 0, number)
+        fields = [f"{row['question_text']} [{index}]", row["option_a"], row["option_b"], row["option_c"],
+                  row["option_d"], row["correct_answer"], str(row["points"])]
+        lines.append(",".join('"' + field.replace('"', '""') + '"' for field in fields))
+    return "\n".join(lines) + "\n"
+
+
+def students_csv(templates: datagen.Templates, rng: random.Random, rows: int, index: int) -> str:
+    lines = ["roll_number,name,email"]
+    for number in range(rows):
+        row = templates.student_row(rng, index, WRITE_COMPANY_ID, number, f"U{index:05d}-")
+        lines.append(f"{row['roll_number']},{row['name']},{row['email']}")
+    return "\n".join(lines) + "\n"
+
+
+def build_scenarios(args, fixtures: dict, write_drives: dict, tokens: dict, smtp: StubSMTPServer) -> list:
+    templates = datagen.Templates()
+    admin = {"Authorization": f"Bearer {tokens['admin']}"}
+    tenant = {"Authorization": f"Bearer {tokens['tenant']}"}
+    writer = {"Authorization": f"Bearer {tokens['writer']}"}
+    read_drives = fixtures["drive_ids"]
+
+    def upload(drive_ids, make_csv, kind):
+        def request(index):
+            content = make_csv(templates, random.Random(index), args.csv_rows, index)
+            headers, body = multipart_csv(f"{kind}.csv", content)
+            return "POST", f"/api/company/drives/{drive_ids[index % len(drive_ids)]}/{kind}/csv-upload", {**writer, **headers}, body
+        return request
+
+    email_started = []
+
+    def email_request(index):
+        if not email_started:
+            email_started.append((time.perf_counter(), smtp.message_count))
+        return "POST", f"/api/company/drives/{write_drives['email'][index]}/email-students", writer, None
+
+    def email_finish(client: Client, responses):
+        started, sent_before = email_started[0]
+        job_ids = [(body["drive_id"], body["job_id"]) for body in responses if body]
+        deadline = time.monotonic() + EMAIL_DRAIN_TIMEOUT_SECONDS
+        for drive_id, job_id in job_ids:
+            while time.monotonic() < deadline:
+                job = client.json("GET", f"/api/company/drives/{drive_id}/email-jobs/{job_id}", headers=writer)
+                if job["status"] not in ("queued", "running"):
+                    break
+                time.sleep(0.2)
+        elapsed = time.perf_counter() - started
+        sent = smtp.message_count - sent_before
+        return {"emails_sent": sent, "emails_per_second": round(sent / elapsed, 1)}
+
+    return [
+        Scenario("get_company_drives", lambda index: ("GET", f"/api/company/drives?limit={args.page_size}", tenant, None)),
+        Scenario("get_all_drives", lambda index: ("GET", f"/api/admin/drives?status_filter=all&limit={args.page_size}", admin, None)),
+        Scenario("get_drive_detail", lambda index: ("GET", f"/api/admin/drives/{read_drives[index % len(read_drives)]}/detail", admin, None)),
+        Scenario("get_exam_status", lambda index: ("GET", f"/api/company/drives/{read_drives[index % len(read_drives)]}/exam-status", tenant, None)),
+        Scenario("upload_questions_csv", upload(write_drives["draft"], questions_csv, "questions")),
+        Scenario("upload_students_csv", upload(write_drives["draft"], students_csv, "students")),
+        Scenario("email_students", email_request, email_finish),
+    ]
+
+
+def run_scenario(scenario: Scenario, port: int, requests: int, concurrency: int, warmup: int) -> dict:
+    next_index = iter(range(warmup + requests))
+    index_lock = threading.Lock()
+    latencies, errors, responses = [], [], []
+
+    def worker(measured: bool, count=None):
+        client = Client(port)
+        done = 0
+        try:
+            while count is None or done < count:
+                with index_lock:
+                    index = next(next_index, None)
+                if index is None:
+                    return
+                method, path, headers, body = scenario.request(index)
+                started = time.perf_counter()
+                status, data = client.request(method, path, headers, body)
+                elapsed = time.perf_counter() - started
+                done += 1
+                if not measured:
+                    continue
+                latencies.append(elapsed)
+                if status >= 400:
+                    errors.append(f"{status}: {data[:200]!r}")
+                    responses.append(None)
+                elif scenario.finish:
+                    responses.append(json.loads(data))
+        finally:
+            client.close()
+
+    worker(measured=False, count=warmup)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        for future in [executor.submit(worker, True) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 1)
+    }
+    if errors:
+        result["first_error"] = errors[0]
+    if scenario.finish:
+        client = Client(port)
+        try:
+            result.update(scenario.finish(client, responses))
+        finally:
+            client.close()
+    return result
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print current vs baseline per scenario; returns the regressions"""
+    regressions = []
+    print(f"\nCompared with baseline from {baseline['metadata'].get('created_at', '?')} (tolerance {tolerance:.0%})")
+    for name, current in results["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            print(f"  {name:<22} no baseline")
+            continue
+        changes = []
+        for metric in COMPARED_METRICS:
+            before, after = previous.get(metric), current.get(metric)
+            if not before or not after:
+                continue
+            # Latency regresses upwards, throughput downwards
+            ratio = after / before if metric != "throughput_rps" else before / after
+            flag = " REGRESSION" if ratio > 1 + tolerance else ""
+            changes.append(f"{metric} {before:g} -> {after:g}{flag}")
+            if flag:
+                regressions.append(f"{name} {metric}: {before:g} -> {after:g}")
+        print(f"  {name:<22} " + ", ".join(changes))
+    return regressions
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args, port: int, smtp_port: int = None) -> subprocess.Popen:
+    """uvicorn on args.url with args.workers workers; emails go to the stub server on smtp_port"""
+    env = {**os.environ, "DATABASE_URL": args.url}
+    if smtp_port is not None:
+        env.update({
+            "SMTP_SERVER": "127.0.0.1",
+            "SMTP_PORT": str(smtp_port),
+            "SMTP_USE_TLS": "false",
+            "SMTP_USERNAME": "benchmark",
+            "SMTP_PASSWORD": "benchmark",
+            "SMTP_RATE_LIMIT_PER_SECOND": "0",
+        })
+    log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"Server exited with code {server.returncode}; pass --server-log to see why")
+        try:
+            client = Client(port)
+            status, _ = client.request("GET", "/health")
+            client.close()
+            if status == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.25)
+    server.terminate()
+    raise SystemExit("Server did not become healthy in time")
+
+
+def prepare_database(args) -> dict:
+    """Generate data into an empty database, then add the write scenarios' drives"""
+    engine = datagen.engine_for(args.url)
+    templates = datagen.Templates()
+    rng = random.Random(args.seed)
+    with engine.connect() as connection:
+        if datagen.is_empty(connection):
+            print(f"Generating data at scale {args.scale} ...")
+            datagen.create_schema(connection)
+            datagen.generate(connection, args.scale, seed=args.seed, templates=templates)
+        fixtures = datagen.find_fixtures(connection)
+        write_drives = {
+            "draft": datagen.add_drives(connection, templates, rng, WRITE_COMPANY_ID, 8, approved=False,
+                                        questions_per_drive=0, students_per_drive=0),
+            "email": datagen.add_drives(connection, templates, rng, WRITE_COMPANY_ID, args.warmup + args.requests,
+                                        approved=True, questions_per_drive=0, students_per_drive=args.email_students)
+        }
+        fixtures["dialect"] = connection.dialect.name
+    engine.dispose()
+    return fixtures, write_drives
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite:///benchmark.db", help="Benchmark database (filled if empty)")
+    parser.add_argument("--scale", type=float, default=0.01, help="datagen scale for an empty database")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--page-size", type=int, default=100, help="limit for the drive list endpoints")
+    parser.add_argument("--csv-rows", type=int, default=100, help="Rows per uploaded CSV")
+    parser.add_argument("--email-students", type=int, default=50, help="Students per drive in email_students")
+    parser.add_argument("--scenarios", nargs="+", help="Run only these scenarios")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on a regression")
+    parser.add_argument("--server-log", help="Write the app's output here")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    fixtures, write_drives = prepare_database(args)
+    counts = fixtures["counts"]
+    print(
+        f"{counts['companies']} companies, {counts['drives']} drives, {counts['questions']} questions, "
+        f"{counts['students']} students ({fixtures['dialect']}); large tenant is company {fixtures['company_id']}"
+    )
+
+    port = free_port()
+    with StubSMTPServer() as smtp:
+        server = start_server(args, port, smtp.port)
+        try:
+            client = Client(port)
+            password = datagen.BENCHMARK_PASSWORD
+            tokens = {
+                "admin": client.json("POST", "/api/auth/admin/login", {"username": "admin", "password": "admin123"}),
+                "tenant": client.json("POST", "/api/auth/company/login", {"username": fixtures["company_username"], "password": password}),
+                "writer": client.json("POST", "/api/auth/company/login", {"username": f"company{WRITE_COMPANY_ID}", "password": password}),
+            }
+            tokens = {role: token["access_token"] for role, token in tokens.items()}
+            client.close()
+
+            scenarios = build_scenarios(args, fixtures, write_drives, tokens, smtp)
+            unknown = set(args.scenarios or ()) - {scenario.name for scenario in scenarios}
+            if unknown:
+                parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+            results = {"scenarios": {}}
+            print(f"{args.requests} requests per scenario, concurrency {args.concurrency}, {args.workers} worker(s)\n")
+            for scenario in scenarios:
+                if args.scenarios and scenario.name not in args.scenarios:
+                    continue
+                result = run_scenario(scenario, port, args.requests, args.concurrency, args.warmup)
+                results["scenarios"][scenario.name] = result
+                extra = f", {result['emails_per_second']} emails/s" if "emails_per_second" in result else ""
+                errors = f", {result['errors']} errors (first {result['first_error']})" if result["errors"] else ""
+                print(
+                    f"  {scenario.name:<22} p50 {result['p50_ms']:8.1f} ms  p99 {result['p99_ms']:8.1f} ms  "
+                    f"{result['throughput_rps']:7.1f} req/s{extra}{errors}"
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+    results["metadata"] = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "dialect": fixtures["dialect"],
+        "dataset": counts,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "workers": args.workers,
+        "page_size": args.page_size,
+        "csv_rows": args.csv_rows,
+        "email_students": args.email_students,
+        "python": platform.python_version(),
+        "machine": platform.platform()
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions and args.fail_on_regression:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
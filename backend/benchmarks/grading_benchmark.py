@@ -0,0 +1,134 @@
+"""
+Time to grade a drive with the vectorized engine versus looping over ORM objects.
+
+Run from the backend directory:
+    python -m benchmarks.grading_benchmark --students 10000 --questions 100
+
+A synthetic drive is written to an in-memory SQLite database using the app's
+tables (each student answers --answered of the questions, with --accuracy of
+those correct). Both paths load from the database and compute scores, ranks
+and per-question correctness rates; writing results back is the same for both
+and is not timed.
+"""
+import argparse
+import random
+import time
+import numpy as np
+from sqlalchemy import create_engine, select, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from app.database.connection import Base
+from app.models import Question, ExamAttempt, StudentAnswer
+from app.utils.grading import AnswerKey, grade_submissions, packed_answers_query
+
+LETTERS = "ABCD"
+DRIVE_ID = 1
+
+
+def seed(session: Session, students: int, questions: int, answered: float, accuracy: float, seed_value: int):
+    rng = random.Random(seed_value)
+    question_rows = []
+    for question_id in range(1, questions + 1):
+        options = [f"q{question_id}-{letter}" for letter in LETTERS]
+        question_rows.append({
+            "id": question_id, "drive_id": DRIVE_ID, "question_text": f"Question {question_id}",
+            "option_a": options[0], "option_b": options[1], "option_c": options[2], "option_d": options[3],
+            "correct_answer": rng.choice(options), "points": rng.randint(1, 4)
+        })
+    session.execute(insert(Question), question_rows)
+    session.execute(insert(ExamAttempt), [
+        {"id": attempt_id, "drive_id": DRIVE_ID, "student_id": attempt_id, "status": "submitted"}
+        for attempt_id in range(1, students + 1)
+    ])
+
+    correct_letters = {
+        row["id"]: LETTERS[[row["option_a"], row["option_b"], row["option_c"], row["option_d"]].index(row["correct_answer"])]
+        for row in question_rows
+    }
+    answers = []
+    for attempt_id in range(1, students + 1):
+        for question_id in range(1, questions + 1):
+            if rng.random() >= answered:
+                continue
+            letter = correct_letters[question_id] if rng.random() < accuracy else rng.choice(LETTERS)
+            answers.append({"attempt_id": attempt_id, "question_id": question_id, "selected_option": letter})
+            if len(answers) == 50000:
+                session.execute(insert(StudentAnswer), answers)
+                answers = []
+    if answers:
+        session.execute(insert(StudentAnswer), answers)
+    session.commit()
+
+
+def grade_vectorized(session: Session):
+    questions = session.execute(select(
+        Question.id, Question.option_a, Question.option_b, Question.option_c,
+        Question.option_d, Question.correct_answer, Question.points
+    ).where(Question.drive_id == DRIVE_ID)).all()
+    attempt_ids = np.fromiter(
+        session.execute(select(ExamAttempt.id).where(ExamAttempt.drive_id == DRIVE_ID).order_by(ExamAttempt.id)).scalars(),
+        dtype=np.int64
+    )
+    packed = np.fromiter(session.execute(packed_answers_query(DRIVE_ID)).scalars(), dtype=np.int64)
+    return attempt_ids, grade_submissions(AnswerKey.from_rows(questions), attempt_ids, packed)
+
+
+def grade_orm(session: Session):
+    """Per-object grading over ORM instances, as a baseline"""
+    key = {}
+    for question in session.query(Question).filter(Question.drive_id == DRIVE_ID):
+        options = [question.option_a, question.option_b, question.option_c, question.option_d]
+        key[question.id] = (LETTERS[options.index(question.correct_answer)], question.points)
+    attempts = session.query(ExamAttempt).filter(ExamAttempt.drive_id == DRIVE_ID).all()
+    scores = {attempt.id: 0 for attempt in attempts}
+    correct_by_question = dict.fromkeys(key, 0)
+    answers = session.query(StudentAnswer).join(ExamAttempt).filter(ExamAttempt.drive_id == DRIVE_ID)
+    for answer in answers:
+        correct, points = key[answer.question_id]
+        if answer.selected_option == correct:
+            scores[answer.attempt_id] += points
+            correct_by_question[answer.question_id] += 1
+    first_rank = {}
+    for position, score in enumerate(sorted(scores.values(), reverse=True), start=1):
+        first_rank.setdefault(score, position)
+    ranks = {attempt_id: first_rank[score] for attempt_id, score in scores.items()}
+    rates = {question_id: count / len(scores) for question_id, count in correct_by_question.items()}
+    return scores, ranks, rates
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--answered", type=float, default=0.9, help="Share of questions each student answers")
+    parser.add_argument("--accuracy", type=float, default=0.6, help="Share of answered questions answered correctly")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[Question.__table__, ExamAttempt.__table__, StudentAnswer.__table__])
+    with Session(engine) as session:
+        seed(session, args.students, args.questions, args.answered, args.accuracy, args.seed)
+        answer_count = session.query(StudentAnswer).count()
+    print(f"{args.students} students x {args.questions} questions, {answer_count} answers (SQLite, in memory)")
+
+    with Session(engine) as session:
+        (attempt_ids, vectorized), vectorized_time = timed(grade_vectorized, session)
+    with Session(engine) as session:
+        (scores, ranks, _), orm_time = timed(grade_orm, session)
+
+    assert vectorized.scores.tolist() == [scores[int(a)] for a in attempt_ids], "engines disagree on scores"
+    assert vectorized.ranks.tolist() == [ranks[int(a)] for a in attempt_ids], "engines disagree on ranks"
+
+    print(f"  vectorized (load + grade): {vectorized_time * 1000:8.1f} ms")
+    print(f"  ORM loop   (load + grade): {orm_time * 1000:8.1f} ms  ({orm_time / vectorized_time:.1f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Query plans and timings of the hot-path lookups before and after the
+0002 migration (for the hot-path and listing indexes).
+
+Run from the backend directory:
+    python -m benchmarks.index_plan_benchmark --drives 2000
+
+The schema is built by the migrations themselves: upgrade to the baseline
+(0001), seed a synthetic dataset, measure, upgrade to head, measure again.
+Both passes run ANALYZE first, so the planner has statistics either way.
+
+By default this runs on an in-memory SQLite database. Pass --url to run on
+PostgreSQL instead; it must point at an empty scratch database, since the
+tables are dropped again (downgrade to base) when the run finishes.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from alembic import command
+from sqlalchemy import create_engine, inspect, insert, select, text
+from sqlalchemy.pool import StaticPool
+from app.database.migrations import BASELINE_REVISION, alembic_config
+from app.models import Company, Drive, Question, DriveTarget, College, StudentGroup, Student
+from app.utils.paper_snapshots import PAPER_COLUMNS
+
+# Most drives are finished; the ones awaiting review are a small slice
+STATUS_WEIGHTS = {
+    "completed": 60, "approved": 18, "draft": 10, "ongoing": 4,
+    "submitted": 4, "rejected": 3, "suspended": 1
+}
+INSERT_BATCH_SIZE = 20000
+
+
+def insert_batched(connection, model, rows):
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        connection.execute(insert(model), rows[start:start + INSERT_BATCH_SIZE])
+
+
+def seed(connection, args, rng: random.Random):
+    now = datetime.utcnow()
+    insert_batched(connection, Company, [
+        {"id": company_id, "company_name": f"Company {company_id}", "username": f"company{company_id}",
+         "email": f"company{company_id}@example.com", "hashed_password": "x", "status": "approved"}
+        for company_id in range(1, args.companies + 1)
+    ])
+    insert_batched(connection, College, [
+        {"id": college_id, "name": f"College {college_id}", "is_approved": True} for college_id in range(1, args.colleges + 1)
+    ])
+    insert_batched(connection, StudentGroup, [
+        {"id": group_id, "name": f"Group {group_id}", "is_approved": True} for group_id in range(1, args.groups + 1)
+    ])
+    statuses = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()), k=args.drives)
+    insert_batched(connection, Drive, [
+        {"id": drive_id, "company_id": rng.randint(1, args.companies), "title": f"Drive {drive_id}",
+         "question_type": "mcqs", "duration_minutes": 60, "status": status,
+         "is_approved": status in ("completed", "approved", "ongoing"), "created_at": now - timedelta(minutes=drive_id)}
+        for drive_id, status in enumerate(statuses, start=1)
+    ])
+
+    questions, targets, students = [], [], []
+    for drive_id in range(1, args.drives + 1):
+        for number in range(args.questions):
+            questions.append({
+                "drive_id": drive_id, "question_text": f"Question {number}", "option_a": "a", "option_b": "b",
+                "option_c": "c", "option_d": "d", "correct_answer": "a", "points": 1
+            })
+        for _ in range(args.targets):
+            targets.append({
+                "drive_id": drive_id, "college_id": rng.randint(1, args.colleges),
+                "student_group_id": rng.randint(1, args.groups)
+            })
+        for number in range(args.students):
+            students.append({
+                "drive_id": drive_id, "company_id": 1, "roll_number": f"R{number:06d}",
+                "email": f"s{number}.d{drive_id}@example.com"
+            })
+    # Interleave drives on disk the way real inserts over time do
+    rng.shuffle(questions)
+    rng.shuffle(targets)
+    rng.shuffle(students)
+    insert_batched(connection, Question, questions)
+    insert_batched(connection, DriveTarget, targets)
+    insert_batched(connection, Student, students)
+    connection.commit()
+
+
+def hot_queries(args):
+    """(label, statement factory) pairs; each factory takes an rng so runs hit different rows"""
+    return [
+        ("paper questions by drive", lambda rng: select(*PAPER_COLUMNS)
+            .where(Question.drive_id == rng.randint(1, args.drives)).order_by(Question.id)),
+        ("targets by drive", lambda rng: select(DriveTarget)
+            .where(DriveTarget.drive_id == rng.randint(1, args.drives))),
+        ("students by drive", lambda rng: select(Student.id, Student.roll_number, Student.email)
+            .where(Student.drive_id == rng.randint(1, args.drives))),
+        ("admin review listing", lambda rng: select(Drive.id)
+            .where(Drive.is_approved == False, Drive.status == rng.choice(["submitted", "rejected", "suspended"]))
+            .order_by(Drive.created_at.desc(), Drive.id.desc()).limit(20)),
+        ("college by name", lambda rng: select(College.id)
+            .where(College.name == f"College {rng.randint(1, args.colleges)}")),
+        ("student group by name", lambda rng: select(StudentGroup.id)
+            .where(StudentGroup.name == f"Group {rng.randint(1, args.groups)}")),
+    ]
+
+
+def query_plan(connection, statement) -> str:
+    sql = str(statement.compile(connection, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "sqlite":
+        return "; ".join(row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    return "; ".join(row[0].strip() for row in connection.execute(text(f"EXPLAIN {sql}")))
+
+
+def measure(connection, args, seed_value: int) -> dict:
+    connection.execute(text("ANALYZE"))
+    connection.commit()
+    results = {}
+    for label, make_statement in hot_queries(args):
+        rng = random.Random(seed_value)
+        plan = query_plan(connection, make_statement(rng))
+        timings = []
+        for _ in range(args.repeat):
+            statement = make_statement(rng)
+            started = time.perf_counter()
+            connection.execute(statement).all()
+            timings.append(time.perf_counter() - started)
+        results[label] = (statistics.median(timings), plan)
+    connection.rollback()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite://", help="Empty scratch database (default: in-memory SQLite)")
+    parser.add_argument("--drives", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=50, help="Questions per drive")
+    parser.add_argument("--targets", type=int, default=4, help="Targets per drive")
+    parser.add_argument("--students", type=int, default=100, help="Students per drive")
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--colleges", type=int, default=5000)
+    parser.add_argument("--groups", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=50, help="Runs per query; the median is reported")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.url.startswith("sqlite"):
+        engine = create_engine(args.url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(args.url.replace("postgresql://", "postgresql+psycopg://", 1))
+
+    with engine.connect() as connection:
+        if inspect(connection).get_table_names():
+            parser.error("--url must point at an empty database")
+        config = alembic_config(connection)
+        try:
+            command.upgrade(config, BASELINE_REVISION)
+            seed(connection, args, random.Random(args.seed))
+            print(
+                f"{args.drives} drives: {args.drives * args.questions} questions, {args.drives * args.targets} targets, "
+                f"{args.drives * args.students} students; {args.colleges} colleges, {args.groups} groups "
+                f"({connection.dialect.name})"
+            )
+
+            before = measure(connection, args, args.seed)
+            command.upgrade(config, "head")
+            after = measure(connection, args, args.seed)
+        finally:
+            if engine.dialect.name != "sqlite":
+                connection.rollback()
+                command.downgrade(config, "base")
+
+    for label, (before_time, before_plan) in before.items():
+        after_time, after_plan = after[label]
+        print(f"\n{label}")
+        print(f"  before: {before_time * 1000:8.3f} ms  {before_plan}")
+        print(f"  after:  {after_time * 1000:8.3f} ms  {after_plan}  ({before_time / after_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
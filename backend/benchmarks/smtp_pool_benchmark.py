@@ -0,0 +1,58 @@
+"""
+Messages/second of SMTPSenderPool against a local stand-in SMTP server.
+
+Run from the backend directory:
+    python -m benchmarks.smtp_pool_benchmark --messages 400 --delay 0.02 --pool-sizes 1 2 4 8
+
+--delay simulates per-message provider latency; with latency dominating, throughput
+should scale roughly linearly with pool size until --rate caps it.
+"""
+import argparse
+import smtplib
+import time
+from email.mime.text import MIMEText
+from app.utils.smtp_pool import SMTPSenderPool, TokenBucket
+from benchmarks.stub_smtp import StubSMTPServer
+
+
+def run(pool_size: int, messages: int, port: int, rate: float) -> float:
+    def connect():
+        return smtplib.SMTP("127.0.0.1", port, timeout=10)
+
+    def items():
+        for i in range(messages):
+            message = MIMEText(f"Benchmark message {i}")
+            message["From"] = "bench@example.com"
+            message["To"] = f"student{i}@example.com"
+            message["Subject"] = "Benchmark"
+            yield i, message
+
+    pool = SMTPSenderPool(pool_size, rate_limiter=TokenBucket(rate) if rate > 0 else None, connect=connect)
+    started = time.perf_counter()
+    with pool:
+        errors = sum(1 for _, error in pool.send(items()) if error)
+    elapsed = time.perf_counter() - started
+    if errors:
+        print(f"  {errors} messages failed")
+    return messages / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=400)
+    parser.add_argument("--delay", type=float, default=0.02, help="Stub server latency per message (seconds)")
+    parser.add_argument("--rate", type=float, default=0, help="Token bucket rate limit (messages/second, 0 = off)")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with StubSMTPServer(message_delay=args.delay) as server:
+        print(f"{args.messages} messages, {args.delay * 1000:.0f} ms server latency, rate limit {args.rate or 'off'}")
+        baseline = None
+        for size in args.pool_sizes:
+            throughput = run(size, args.messages, server.port, args.rate)
+            baseline = baseline or throughput
+            print(f"  pool size {size:>3}: {throughput:8.1f} msg/s  ({throughput / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Minimal local stand-in SMTP server for benchmarks.
+
+Speaks just enough SMTP (EHLO/HELO, AUTH, MAIL, RCPT, DATA, RSET, NOOP, QUIT)
+for smtplib.login and send_message, accepts any credentials and every message,
+and can add a fixed per-message delay to mimic a real provider's latency. No
+TLS: point the app at it with SMTP_USE_TLS=false.
+"""
+import socketserver
+import threading
+import time
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+    def handle(self):
+        server = self.server
+        self.reply("220 stub-smtp ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").strip().upper()
+
+            if command.startswith("EHLO"):
+                self.reply("250-stub-smtp")
+                self.reply("250 AUTH PLAIN LOGIN")
+            elif command.startswith("HELO"):
+                self.reply("250 stub-smtp")
+            elif command.startswith("AUTH"):
+                self.reply("235 Authentication successful")
+            elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                if server.message_delay:
+                    time.sleep(server.message_delay)
+                with server.lock:
+                    server.message_count += 1
+                self.reply("250 OK queued")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, message_delay: float = 0.0):
+        super().__init__((host, port), _SMTPHandler)
+        self.message_delay = message_delay
+        self.message_count = 0
+        self.lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,59 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app.database.connection import Base, get_database_url
+import app.models  # noqa: F401  registers every table on Base.metadata
+
+config = context.config
+
+# The app passes its own connection (see app.database.migrations) and has
+# already configured logging; the alembic CLI has not
+connection = config.attributes.get("connection")
+if connection is None and config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout (alembic upgrade head --sql) instead of running it"""
+    context.configure(
+        url=get_database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # One transaction per revision, so an index revision's autocommit
+        # block (CREATE INDEX CONCURRENTLY) does not commit earlier revisions
+        transaction_per_migration=True,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    if connection is not None:
+        run_migrations(connection)
+        return
+    engine = create_engine(get_database_url(), poolclass=NullPool)
+    with engine.connect() as new_connection:
+        run_migrations(new_connection)
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,151 @@
+"""Baseline: the original schema, as create_all produced it before migrations existed
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+
+Databases created by create_tables() before this history existed are
+stamped at this revision on startup (see app.database.migrations) and then
+brought to head with `alembic upgrade head`. Everything added since (the
+email and exam tables, the keyset and hot-path indexes and
+uq_students_drive_id_roll_number) is left to 0002: create_all never added
+indexes or constraints to tables that already existed.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('admins',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(), nullable=False),
+        sa.Column('password_hash', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_admins_id'), 'admins', ['id'], unique=False)
+    op.create_index(op.f('ix_admins_username'), 'admins', ['username'], unique=True)
+    op.create_table('colleges',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('is_approved', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_colleges_id'), 'colleges', ['id'], unique=False)
+    op.create_table('companies',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('company_name', sa.String(), nullable=False),
+        sa.Column('username', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('logo_url', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('admin_notes', sa.Text(), nullable=True),
+        sa.Column('reviewed_at', sa.DateTime(), nullable=True),
+        sa.Column('reviewed_by', sa.String(), nullable=True),
+        sa.Column('is_approved', sa.Boolean(), nullable=True),
+        sa.Column('email_subject_template', sa.Text(), nullable=True),
+        sa.Column('email_body_template', sa.Text(), nullable=True),
+        sa.Column('use_custom_template', sa.Boolean(), nullable=True),
+        sa.Column('template_updated_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_companies_email'), 'companies', ['email'], unique=True)
+    op.create_index(op.f('ix_companies_id'), 'companies', ['id'], unique=False)
+    op.create_index(op.f('ix_companies_username'), 'companies', ['username'], unique=True)
+    op.create_table('student_groups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('is_approved', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_student_groups_id'), 'student_groups', ['id'], unique=False)
+    op.create_table('drives',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('question_type', sa.String(), nullable=False),
+        sa.Column('duration_minutes', sa.Integer(), nullable=False),
+        sa.Column('scheduled_start', sa.DateTime(), nullable=True),
+        sa.Column('actual_start', sa.DateTime(), nullable=True),
+        sa.Column('actual_end', sa.DateTime(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('is_approved', sa.Boolean(), nullable=True),
+        sa.Column('admin_notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_drives_id'), 'drives', ['id'], unique=False)
+    op.create_table('drive_targets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('drive_id', sa.Integer(), nullable=False),
+        sa.Column('college_id', sa.Integer(), nullable=True),
+        sa.Column('custom_college_name', sa.String(), nullable=True),
+        sa.Column('student_group_id', sa.Integer(), nullable=True),
+        sa.Column('custom_student_group_name', sa.String(), nullable=True),
+        sa.Column('batch_year', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['college_id'], ['colleges.id']),
+        sa.ForeignKeyConstraint(['drive_id'], ['drives.id']),
+        sa.ForeignKeyConstraint(['student_group_id'], ['student_groups.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_drive_targets_id'), 'drive_targets', ['id'], unique=False)
+    op.create_table('questions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('drive_id', sa.Integer(), nullable=False),
+        sa.Column('question_text', sa.Text(), nullable=False),
+        sa.Column('option_a', sa.String(), nullable=False),
+        sa.Column('option_b', sa.String(), nullable=False),
+        sa.Column('option_c', sa.String(), nullable=False),
+        sa.Column('option_d', sa.String(), nullable=False),
+        sa.Column('correct_answer', sa.String(), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['drive_id'], ['drives.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_questions_id'), 'questions', ['id'], unique=False)
+    op.create_table('students',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('drive_id', sa.Integer(), nullable=False),
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('roll_number', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.ForeignKeyConstraint(['drive_id'], ['drives.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_students_email'), 'students', ['email'], unique=False)
+    op.create_index(op.f('ix_students_id'), 'students', ['id'], unique=False)
+    op.create_index(op.f('ix_students_roll_number'), 'students', ['roll_number'], unique=False)
+
+
+def downgrade() -> None:
+    # Indexes go with their tables
+    op.drop_table('students')
+    op.drop_table('questions')
+    op.drop_table('drive_targets')
+    op.drop_table('drives')
+    op.drop_table('student_groups')
+    op.drop_table('companies')
+    op.drop_table('colleges')
+    op.drop_table('admins')
@@ -0,0 +1,219 @@
+"""Email and exam tables, listing and hot-path indexes, and the students (drive_id, roll_number) unique constraint
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+
+Brings a baseline database up to the current schema. Tables that
+create_tables() already added on startup are left as they are.
+
+Every index here backs a filter the routes run per request: the keyset
+paginated drive and company listings, a drive's questions and targets, the
+admin review listing by status, and college / student group lookups by
+name. drives.company_id is the leading column of
+ix_drives_company_id_created_at_id, and students.drive_id leads
+uq_students_drive_id_roll_number, so neither gets an index of its own.
+
+On PostgreSQL indexes are built with CREATE INDEX CONCURRENTLY outside the
+migration transaction, so writes to these tables keep flowing during the
+build. A build that was interrupted leaves an INVALID index behind; it is
+dropped and rebuilt on the next run.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ('ix_drives_created_at_id', 'drives', ['created_at', 'id']),
+    ('ix_drives_company_id_created_at_id', 'drives', ['company_id', 'created_at', 'id']),
+    ('ix_companies_created_at_id', 'companies', ['created_at', 'id']),
+    ('ix_companies_status_created_at_id', 'companies', ['status', 'created_at', 'id']),
+    ('ix_questions_drive_id', 'questions', ['drive_id']),
+    ('ix_drive_targets_drive_id', 'drive_targets', ['drive_id']),
+    ('ix_drives_status_created_at_id', 'drives', ['status', 'created_at', 'id']),
+    ('ix_colleges_name', 'colleges', ['name']),
+    ('ix_student_groups_name', 'student_groups', ['name']),
+)
+STUDENTS_UNIQUE = 'uq_students_drive_id_roll_number'
+# In creation order; dropped in reverse
+NEW_TABLES = ('email_jobs', 'email_deliveries', 'exam_attempts', 'exam_results', 'student_answers')
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def _offline() -> bool:
+    """alembic upgrade --sql: nothing can be inspected, so emit every statement unconditionally"""
+    return op.get_context().as_sql
+
+
+def _drop_invalid_index(name: str):
+    """Remove what a failed CREATE INDEX CONCURRENTLY left behind, so IF NOT EXISTS does not keep it"""
+    invalid = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+        "WHERE pg_class.relname = :name AND NOT pg_index.indisvalid"
+    ), {'name': name}).first()
+    if invalid:
+        op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+def _missing(table: str) -> bool:
+    """Tables create_tables() added to a baseline database on startup already exist"""
+    return _offline() or not sa.inspect(op.get_bind()).has_table(table)
+
+
+def _create_tables():
+    # New tables are empty, so their indexes are built with them
+    if _missing('email_jobs'):
+        op.create_table('email_jobs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('drive_id', sa.Integer(), nullable=False),
+            sa.Column('company_id', sa.Integer(), nullable=False),
+            sa.Column('status', sa.String(), nullable=True),
+            sa.Column('total_count', sa.Integer(), nullable=False),
+            sa.Column('sent_count', sa.Integer(), nullable=False),
+            sa.Column('failed_count', sa.Integer(), nullable=False),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+            sa.ForeignKeyConstraint(['drive_id'], ['drives.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_email_jobs_drive_id'), 'email_jobs', ['drive_id'], unique=False)
+        op.create_index(op.f('ix_email_jobs_id'), 'email_jobs', ['id'], unique=False)
+    if _missing('email_deliveries'):
+        op.create_table('email_deliveries',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('job_id', sa.Integer(), nullable=False),
+            sa.Column('drive_id', sa.Integer(), nullable=False),
+            sa.Column('student_id', sa.Integer(), nullable=False),
+            sa.Column('status', sa.String(), nullable=False),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['drive_id'], ['drives.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['job_id'], ['email_jobs.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('drive_id', 'student_id', name='uq_email_deliveries_drive_id_student_id')
+        )
+        op.create_index(op.f('ix_email_deliveries_id'), 'email_deliveries', ['id'], unique=False)
+        op.create_index(op.f('ix_email_deliveries_job_id'), 'email_deliveries', ['job_id'], unique=False)
+    if _missing('exam_attempts'):
+        op.create_table('exam_attempts',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('drive_id', sa.Integer(), nullable=False),
+            sa.Column('student_id', sa.Integer(), nullable=False),
+            sa.Column('status', sa.String(), nullable=False),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('submitted_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['drive_id'], ['drives.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('drive_id', 'student_id', name='uq_exam_attempts_drive_id_student_id')
+        )
+        op.create_index(op.f('ix_exam_attempts_id'), 'exam_attempts', ['id'], unique=False)
+    if _missing('exam_results'):
+        op.create_table('exam_results',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('drive_id', sa.Integer(), nullable=False),
+            sa.Column('attempt_id', sa.Integer(), nullable=False),
+            sa.Column('student_id', sa.Integer(), nullable=False),
+            sa.Column('score', sa.Integer(), nullable=False),
+            sa.Column('max_score', sa.Integer(), nullable=False),
+            sa.Column('correct_count', sa.Integer(), nullable=False),
+            sa.Column('answered_count', sa.Integer(), nullable=False),
+            sa.Column('rank', sa.Integer(), nullable=False),
+            sa.Column('percentile', sa.Float(), nullable=False),
+            sa.Column('graded_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['attempt_id'], ['exam_attempts.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['drive_id'], ['drives.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('attempt_id')
+        )
+        op.create_index(op.f('ix_exam_results_drive_id'), 'exam_results', ['drive_id'], unique=False)
+        op.create_index(op.f('ix_exam_results_id'), 'exam_results', ['id'], unique=False)
+    if _missing('student_answers'):
+        op.create_table('student_answers',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('attempt_id', sa.Integer(), nullable=False),
+            sa.Column('question_id', sa.Integer(), nullable=False),
+            sa.Column('selected_option', sa.String(length=1), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['attempt_id'], ['exam_attempts.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('attempt_id', 'question_id', name='uq_student_answers_attempt_id_question_id')
+        )
+        op.create_index(op.f('ix_student_answers_id'), 'student_answers', ['id'], unique=False)
+
+
+def _create_index(name: str, table: str, columns, unique: bool = False):
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            if not _offline():
+                _drop_invalid_index(name)
+            op.create_index(name, table, columns, unique=unique, if_not_exists=True, postgresql_concurrently=True)
+    else:
+        op.create_index(name, table, columns, unique=unique, if_not_exists=True)
+
+
+def _drop_index(name: str, table: str):
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    else:
+        op.drop_index(name, table_name=table, if_exists=True)
+
+
+def _ensure_students_unique():
+    if not _offline():
+        existing = {constraint['name'] for constraint in sa.inspect(op.get_bind()).get_unique_constraints('students')}
+        if STUDENTS_UNIQUE in existing:
+            return
+
+        duplicates = op.get_bind().execute(sa.text(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM students GROUP BY drive_id, roll_number HAVING COUNT(*) > 1) AS d"
+        )).scalar()
+        if duplicates:
+            raise RuntimeError(
+                f"{duplicates} (drive_id, roll_number) pairs appear more than once in students; "
+                f"remove the extra rows before adding {STUDENTS_UNIQUE}"
+            )
+
+    if _is_postgresql():
+        # Build the index without blocking writes, then promote it to a
+        # constraint (a catalog change, no rebuild) to match create_all
+        _create_index(STUDENTS_UNIQUE, 'students', ['drive_id', 'roll_number'], unique=True)
+        op.execute(f'ALTER TABLE students ADD CONSTRAINT {STUDENTS_UNIQUE} UNIQUE USING INDEX {STUDENTS_UNIQUE}')
+    else:
+        # SQLite cannot add a constraint in place; batch mode rebuilds the table
+        with op.batch_alter_table('students') as batch_op:
+            batch_op.create_unique_constraint(STUDENTS_UNIQUE, ['drive_id', 'roll_number'])
+
+
+def upgrade() -> None:
+    _create_tables()
+    for name, table, columns in INDEXES:
+        _create_index(name, table, columns)
+    _ensure_students_unique()
+
+
+def downgrade() -> None:
+    # uq_students_drive_id_roll_number stays: bulk student imports depend on
+    # it for ON CONFLICT and predate this history
+    for name, table, _ in reversed(INDEXES):
+        _drop_index(name, table)
+    for table in reversed(NEW_TABLES):
+        op.drop_table(table)
@@ -0,0 +1,64 @@
+"""Email job leases and one active email job per drive
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+
+Every worker process runs an email dispatcher. email_jobs.heartbeat_at is
+the lease of the worker sending a job: it is refreshed as deliveries are
+recorded, and a running job is only taken over once it has gone stale.
+uq_email_jobs_active_drive_id lets the database, rather than a
+check-then-insert in the route, refuse a second queued or running job for
+the same drive.
+
+Drives that already have more than one active job keep the newest; the
+older ones are marked failed before the index is built. email_jobs holds
+a row per send request, so the index is built in place.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_JOBS_UNIQUE = 'uq_email_jobs_active_drive_id'
+ACTIVE_FILTER = "status IN ('queued', 'running')"
+
+
+def _has_heartbeat() -> bool:
+    """create_tables() builds email_jobs from the current model when it adds the table on startup"""
+    if op.get_context().as_sql:
+        return False
+    columns = sa.inspect(op.get_bind()).get_columns('email_jobs')
+    return any(column['name'] == 'heartbeat_at' for column in columns)
+
+
+def upgrade() -> None:
+    if not _has_heartbeat():
+        with op.batch_alter_table('email_jobs') as batch_op:
+            batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+    op.execute(
+        "UPDATE email_jobs SET status = 'failed', error = 'Superseded by a newer email job for this drive' "
+        f"WHERE {ACTIVE_FILTER} AND id NOT IN ("
+        f"SELECT MAX(id) FROM email_jobs WHERE {ACTIVE_FILTER} GROUP BY drive_id)"
+    )
+    op.create_index(
+        ACTIVE_JOBS_UNIQUE, 'email_jobs', ['drive_id'],
+        unique=True,
+        if_not_exists=True,
+        postgresql_where=sa.text(ACTIVE_FILTER),
+        sqlite_where=sa.text(ACTIVE_FILTER),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(ACTIVE_JOBS_UNIQUE, table_name='email_jobs')
+    with op.batch_alter_table('email_jobs') as batch_op:
+        batch_op.drop_column('heartbeat_at')
@@ -0,0 +1,57 @@
+"""drives.created_at and companies.created_at are NOT NULL
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+
+Keyset pagination orders and resumes listings on (created_at, id), so a
+row without created_at has no position. Rows missing it take their
+updated_at, or the migration time when that is missing too.
+
+On PostgreSQL the column is proven non-null by a NOT VALID check
+constraint validated without blocking writes; SET NOT NULL then uses the
+constraint instead of scanning the table under an exclusive lock, and the
+check is dropped.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('drives', 'companies')
+
+
+def _set_not_null(table: str):
+    if op.get_bind().dialect.name == 'postgresql':
+        check = f'ck_{table}_created_at_not_null'
+        # Each step commits on its own, so the exclusive locks are only held briefly
+        with op.get_context().autocommit_block():
+            op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {check} CHECK (created_at IS NOT NULL) NOT VALID')
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {check}')
+            op.alter_column(table, 'created_at', existing_type=sa.DateTime(), nullable=False)
+            op.drop_constraint(check, table, type_='check')
+    else:
+        # SQLite cannot change a column in place; batch mode rebuilds the table
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(
+            f"UPDATE {table} SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL"
+        )
+        _set_not_null(table)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
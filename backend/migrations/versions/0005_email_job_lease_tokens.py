@@ -0,0 +1,43 @@
+"""Email job lease owner and token
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+
+A worker whose lease expired could keep sending and recording progress
+after another worker had taken the job over. Each claim now writes the
+claiming worker (lease_owner) and a fresh lease_token, and every progress
+write is conditional on both still being the worker's own.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_lease_columns() -> bool:
+    """create_tables() builds email_jobs from the current model when it adds the table on startup"""
+    if op.get_context().as_sql:
+        return False
+    columns = sa.inspect(op.get_bind()).get_columns('email_jobs')
+    return any(column['name'] == 'lease_token' for column in columns)
+
+
+def upgrade() -> None:
+    if not _has_lease_columns():
+        with op.batch_alter_table('email_jobs') as batch_op:
+            batch_op.add_column(sa.Column('lease_owner', sa.String(), nullable=True))
+            batch_op.add_column(sa.Column('lease_token', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('email_jobs') as batch_op:
+        batch_op.drop_column('lease_token')
+        batch_op.drop_column('lease_owner')
@@ -0,0 +1,84 @@
+import itertools
+import os
+import tempfile
+
+# Point the app at a throwaway SQLite database before anything imports it
+_database_dir = tempfile.mkdtemp(prefix="cxp-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_database_dir, 'test.db')}"
+os.environ["ANSWER_SPILL_DIR"] = os.path.join(_database_dir, "answer_spill")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database.query_audit import query_auditor
+from app.main import app
+
+COMPANY_PASSWORD = "company-password"
+_company_numbers = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def query_budget():
+    """
+    query_auditor.budget, raising QueryBudgetExceeded for requests made in the block:
+
+        with query_budget(max_statements=4, max_repeats=1):
+            client.get("/api/company/drives", headers=headers)
+    """
+    return query_auditor.budget
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    response = client.post("/api/auth/admin/login", json={"username": "admin", "password": "admin123"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def company_headers(client, admin_headers):
+    """A newly registered and approved company with no drives yet"""
+    username = f"company{next(_company_numbers)}"
+    response = client.post("/api/auth/company/register", json={
+        "company_name": username.title(),
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": COMPANY_PASSWORD,
+    })
+    assert response.status_code == 200, response.text
+
+    company = next(
+        company for company in client.get("/api/admin/companies", headers=admin_headers).json()
+        if company["username"] == username
+    )
+    response = client.put(
+        f"/api/admin/companies/{company['id']}/approve", json={"is_approved": True}, headers=admin_headers
+    )
+    assert response.status_code == 200, response.text
+
+    response = client.post("/api/auth/company/login", json={"username": username, "password": COMPANY_PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def create_drive(client, company_headers):
+    """Create a drive with one seeded and one custom target for the company"""
+    def create(title: str, target_count: int = 2) -> dict:
+        targets = [{"college_id": n + 1, "student_group_id": n + 1} for n in range(target_count)]
+        targets.append({"custom_college_name": "Custom College", "custom_student_group_name": "Custom Group"})
+        response = client.post("/api/company/drives", json={
+            "title": title,
+            "question_type": "mcqs",
+            "duration_minutes": 60,
+            "targets": targets,
+        }, headers=company_headers)
+        assert response.status_code == 200, response.text
+        return response.json()
+    return create
@@ -0,0 +1,49 @@
+"""Drive listings resolve names and counts in a fixed number of statements, however many drives are listed"""
+
+
+def listing_statements(client, query_budget, path, headers, max_statements=None):
+    with query_budget(max_statements=max_statements, max_repeats=1) as budget:
+        response = client.get(path, headers=headers)
+    assert response.status_code == 200, response.text
+    (_, stats), = budget.requests
+    return response.json(), stats.statements
+
+
+def test_company_drive_list_does_not_query_per_drive(client, query_budget, company_headers, create_drive):
+    create_drive("First drive")
+    _, one_drive = listing_statements(client, query_budget, "/api/company/drives", company_headers)
+
+    for n in range(9):
+        create_drive(f"Drive {n}", target_count=3)
+    drives, ten_drives = listing_statements(client, query_budget, "/api/company/drives", company_headers, max_statements=one_drive)
+
+    assert len(drives) == 10
+    assert ten_drives == one_drive
+
+
+def test_admin_drive_list_does_not_query_per_drive(client, query_budget, admin_headers, company_headers, create_drive):
+    for n in range(5):
+        create_drive(f"Admin listed {n}")
+    _, few_drives = listing_statements(client, query_budget, "/api/admin/drives?status_filter=all", admin_headers)
+
+    for n in range(10):
+        create_drive(f"Admin listed more {n}", target_count=3)
+    drives, more_drives = listing_statements(
+        client, query_budget, "/api/admin/drives?status_filter=all", admin_headers, max_statements=few_drives
+    )
+
+    assert len(drives) >= 15
+    assert more_drives == few_drives
+
+
+def test_target_and_company_names(client, admin_headers, company_headers, create_drive):
+    drive = create_drive("Named targets", target_count=1)
+    seeded, custom = drive["targets"]
+    assert seeded["college_name"] and seeded["college_name"] != "Unknown College"
+    assert custom["college_name"] == "Custom College"
+    assert custom["student_group_name"] == "Custom Group"
+
+    admin_view = client.get("/api/admin/drives?status_filter=all", headers=admin_headers).json()
+    listed = next(d for d in admin_view if d["id"] == drive["id"])
+    assert listed["company_name"] == drive["company_name"]
+    assert [t["college_name"] for t in listed["targets"]] == [seeded["college_name"], "Custom College"]
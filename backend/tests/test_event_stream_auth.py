@@ -0,0 +1,38 @@
+"""Drive event streams are opened with a short-lived, single-purpose token"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.auth import get_event_stream_user
+
+
+def stream_token(client, headers):
+    response = client.post("/api/auth/stream-token", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["stream_token"]
+
+
+def test_stream_token_opens_only_event_streams(client, company_headers):
+    token = stream_token(client, company_headers)
+
+    principal = asyncio.run(get_event_stream_user(token))
+    assert principal["user_type"] == "company"
+
+    response = client.get("/api/company/drives", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+def test_access_token_does_not_open_event_streams(client, company_headers):
+    access_token = company_headers["Authorization"].removeprefix("Bearer ")
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(get_event_stream_user(access_token))
+    assert excinfo.value.status_code == 401
+
+    assert client.get("/api/company/events", params={"access_token": access_token}).status_code == 422
+    assert client.get("/api/company/events", params={"stream_token": access_token}).status_code == 401
+
+
+def test_stream_token_requires_authentication(client):
+    assert client.post("/api/auth/stream-token").status_code in (401, 403)
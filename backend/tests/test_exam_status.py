@@ -0,0 +1,43 @@
+"""Batch exam-status endpoints"""
+from app.utils.exam_status import MAX_BATCH_DRIVES
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+
+def approved_drive(client, admin_headers, create_drive, title):
+    drive = create_drive(title, target_count=0)
+    response = client.put(
+        f"/api/admin/drives/{drive['id']}/approve", json={"is_approved": True}, headers=admin_headers
+    )
+    assert response.status_code == 200, response.text
+    return drive["id"]
+
+
+def test_admin_exam_status_pages_approved_drives(client, admin_headers, company_headers, create_drive):
+    approved = {approved_drive(client, admin_headers, create_drive, f"Status {n}") for n in range(3)}
+    create_drive("Unapproved", target_count=0)
+
+    first = client.get("/api/admin/drives/exam-status", params={"limit": 2}, headers=admin_headers)
+    assert first.status_code == 200, first.text
+    assert len(first.json()) == 2
+    cursor = first.headers[NEXT_CURSOR_HEADER]
+
+    seen = [status["drive_id"] for status in first.json()]
+    while cursor:
+        page = client.get("/api/admin/drives/exam-status", params={"limit": 2, "cursor": cursor}, headers=admin_headers)
+        seen.extend(status["drive_id"] for status in page.json())
+        cursor = page.headers.get(NEXT_CURSOR_HEADER)
+
+    assert approved <= set(seen)
+    assert len(seen) == len(set(seen))
+
+
+def test_admin_exam_status_by_ids_is_capped(client, admin_headers, company_headers, create_drive):
+    drive_id = approved_drive(client, admin_headers, create_drive, "By id")
+
+    response = client.get("/api/admin/drives/exam-status", params={"drive_ids": [drive_id]}, headers=admin_headers)
+    assert [status["drive_id"] for status in response.json()] == [drive_id]
+
+    too_many = client.get(
+        "/api/admin/drives/exam-status", params={"drive_ids": list(range(1, MAX_BATCH_DRIVES + 2))}, headers=admin_headers
+    )
+    assert too_many.status_code == 400
@@ -0,0 +1,36 @@
+"""Keyset paginated listings"""
+from app.utils.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+
+
+def test_pages_cover_every_drive_once(client, company_headers, create_drive):
+    created = {create_drive(f"Paged {n}", target_count=0)["id"] for n in range(5)}
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/company/drives", params=params, headers=company_headers)
+        assert response.status_code == 200, response.text
+        seen.extend(drive["id"] for drive in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+
+    assert sorted(seen) == sorted(created)
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_out_of_range_limit_is_rejected(client, admin_headers, company_headers):
+    for path, headers in (
+        ("/api/company/drives", company_headers),
+        ("/api/admin/drives", admin_headers),
+        ("/api/admin/companies", admin_headers),
+    ):
+        assert client.get(path, params={"limit": MAX_PAGE_SIZE + 1}, headers=headers).status_code == 422
+        assert client.get(path, params={"limit": 0}, headers=headers).status_code == 422
+        assert client.get(path, params={"limit": MAX_PAGE_SIZE}, headers=headers).status_code == 200
+
+
+def test_invalid_cursor_is_rejected(client, company_headers):
+    response = client.get("/api/company/drives", params={"cursor": "not-a-cursor"}, headers=company_headers)
+    assert response.status_code == 400
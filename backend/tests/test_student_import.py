@@ -0,0 +1,64 @@
+"""Student CSV uploads"""
+
+
+def upload(client, drive_id, headers, csv_text):
+    return client.post(
+        f"/api/company/drives/{drive_id}/students/csv-upload",
+        files={"file": ("students.csv", csv_text.encode("utf-8"), "text/csv")},
+        headers=headers,
+    )
+
+
+def test_rows_missing_required_values_are_reported(client, company_headers, create_drive):
+    drive = create_drive("Import validation", target_count=0)
+    response = upload(client, drive["id"], company_headers, (
+        "roll_number,email,name\n"
+        "R1,r1@example.com,Student One\n"
+        "R2,,Student Two\n"
+        "R3,r3@example.com,\n"
+        "R1,again@example.com,Duplicate\n"
+        "R4,R4@Example.com,Student Four\n"
+    ))
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["inserted_count"] == 2
+    assert body["skipped_count"] == 1
+    assert body["errors"] == ["Row 3: Missing fields: email", "Row 4: Missing fields: name"]
+
+    students = client.get(f"/api/company/drives/{drive['id']}/students", headers=company_headers).json()
+    assert sorted((s["roll_number"], s["email"]) for s in students) == [
+        ("R1", "r1@example.com"), ("R4", "r4@example.com")
+    ]
+
+
+def test_upload_with_only_invalid_rows_is_rejected(client, company_headers, create_drive):
+    drive = create_drive("Import all invalid", target_count=0)
+    response = upload(client, drive["id"], company_headers, (
+        "roll_number,email,name\n"
+        "R1,,Nameless Email\n"
+        "R2,r2@example.com,\n"
+    ))
+
+    assert response.status_code == 400
+    body = response.json()
+    assert "Row 2: Missing fields: email" in body["detail"]
+    assert body["errors"] == ["Row 2: Missing fields: email", "Row 3: Missing fields: name"]
+
+
+def test_upload_students_reports_row_errors(client, company_headers, create_drive):
+    drive = create_drive("Upload students", target_count=0)
+    response = client.post(
+        f"/api/company/drives/{drive['id']}/upload-students",
+        files={"file": ("students.csv", (
+            "roll_number,email,name\nR1,r1@example.com,One\n"
+            + "".join(f"R{row},,Student {row}\n" for row in range(2, 14))
+        ).encode("utf-8"), "text/csv")},
+        headers=company_headers,
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["added_count"] == 1
+    assert body["error_count"] == 12
+    assert body["errors"] == [f"Row {row + 1}: Missing fields: email" for row in range(2, 14)]
@@ -0,0 +1,89 @@
+import api from './api';
+
+// Subscribe to the backend's Server-Sent Events stream of drive status changes.
+// path is '/company/events' or '/admin/events'. EventSource cannot send an
+// Authorization header, so each connection first asks the API for a
+// short-lived stream token and passes that as a query parameter. The token
+// is only checked when the stream opens; once it has expired EventSource's
+// own reconnect is refused, so we reconnect with a fresh one.
+//
+// Handlers:
+//   onDrive(event)    - a drive changed (status, exam_state, time_remaining, ...)
+//   onDeleted(event)  - a drive was deleted ({ drive_id })
+//   onResync()        - events may have been missed (reconnect / backlog); reload
+//
+// Returns a function that closes the stream.
+const RECONNECT_DELAY_MS = 3000;
+
+export function subscribeDriveEvents(path, { onDrive, onDeleted, onResync }) {
+  if (typeof EventSource === 'undefined') {
+    return () => {};
+  }
+
+  const base = (api.defaults.baseURL || '').replace(/\/$/, '');
+  let source = null;
+  let retryTimer = null;
+  let closed = false;
+  let connectedBefore = false;
+
+  const scheduleReconnect = () => {
+    if (!closed && !retryTimer) {
+      retryTimer = setTimeout(() => {
+        retryTimer = null;
+        connect();
+      }, RECONNECT_DELAY_MS);
+    }
+  };
+
+  const connect = async () => {
+    let streamToken;
+    try {
+      streamToken = (await api.post('/auth/stream-token')).data.stream_token;
+    } catch (err) {
+      // Logged out or session expired: stop; anything else: try again later
+      if (err?.response?.status !== 401) scheduleReconnect();
+      return;
+    }
+    if (closed) return;
+
+    source = new EventSource(
+      `${base}${path}?stream_token=${encodeURIComponent(streamToken)}`
+    );
+    source.addEventListener('ready', () => {
+      // Every (re)connect starts with "ready"; after a reconnect we may have missed events
+      if (connectedBefore && onResync) onResync();
+      connectedBefore = true;
+    });
+    source.addEventListener('drive', (e) => onDrive && onDrive(JSON.parse(e.data)));
+    source.addEventListener('drive_deleted', (e) => onDeleted && onDeleted(JSON.parse(e.data)));
+    source.addEventListener('resync', () => onResync && onResync());
+    source.addEventListener('error', () => {
+      // CLOSED means EventSource gave up (e.g. its token expired); it retries other errors itself
+      if (source.readyState === EventSource.CLOSED) scheduleReconnect();
+    });
+  };
+
+  connect();
+
+  return () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    if (source) source.close();
+  };
+}
+
+// Exam-status fields carried by a drive event, for merging into exam-status state
+export function examStatusFromEvent(event) {
+  return {
+    drive_id: event.drive_id,
+    exam_state: event.exam_state,
+    status: event.status,
+    scheduled_start: event.scheduled_start,
+    actual_start: event.actual_start,
+    actual_end: event.actual_end,
+    duration_minutes: event.duration_minutes,
+    time_remaining: event.time_remaining,
+    time_remaining_minutes: event.time_remaining_minutes,
+    can_end: event.can_end,
+  };
+}
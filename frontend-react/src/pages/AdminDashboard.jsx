@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react';
 import { toast } from 'react-toastify';
 import { useAuth } from '../contexts/AuthContext';
 import api from '../lib/api';
+import { subscribeDriveEvents, examStatusFromEvent } from '../lib/driveEvents';
 import AdminColleges from './AdminColleges';
 
 export default function AdminDashboard() {
@@ -85,13 +86,44 @@ export default function AdminDashboard() {
     if (activeTab === 'drives') {
       loadAllDrives();
       loadExamStatuses();
-      
-      // Refresh exam statuses every 15 seconds to check for auto-start/end
-      const interval = setInterval(() => {
+
+      const reloadAll = () => {
+        loadAllDrives();
         loadExamStatuses();
-      }, 15000);
-      
-      return () => clearInterval(interval);
+      };
+
+      // Live drive status updates for every company (replaces polling)
+      return subscribeDriveEvents('/admin/events', {
+        onDrive: (event) => {
+          const examTransitions = ['started', 'ended', 'auto_started', 'auto_ended'];
+          if (!examTransitions.includes(event.reason)) {
+            reloadAll();
+            return;
+          }
+          setAllDrivesList((prev) =>
+            prev.map((d) =>
+              d.id === event.drive_id
+                ? { ...d, status: event.status, actual_start: event.actual_start, actual_end: event.actual_end }
+                : d
+            )
+          );
+          setExamStatuses((prev) => ({
+            ...prev,
+            [event.drive_id]: {
+              ...prev[event.drive_id],
+              ...examStatusFromEvent(event),
+              // Admin exam-status reports ended exams as "completed"
+              exam_state: event.exam_state === 'ended' ? 'completed' : event.exam_state,
+            },
+          }));
+          setClientTimeRemaining((prev) => ({
+            ...prev,
+            [event.drive_id]: event.time_remaining || 0,
+          }));
+        },
+        onDeleted: reloadAll,
+        onResync: reloadAll,
+      });
     }
   }, [driveStatusFilter, activeTab]);
 
@@ -199,28 +231,13 @@ export default function AdminDashboard() {
 
   const loadExamStatuses = async () => {
     try {
-      const res = await api.get(
-        `/admin/drives?status_filter=${driveStatusFilter}&limit=500`
-      );
-      const drivesData = res.data || [];
-      
-      // Load exam status for approved drives
-      const statusPromises = drivesData
-        .filter(d => d.is_approved)
-        .map(async (drive) => {
-          try {
-            const statusRes = await api.get(`/admin/drives/${drive.id}/exam-status`);
-            return { driveId: drive.id, status: statusRes.data };
-          } catch (error) {
-            return { driveId: drive.id, status: null };
-          }
-        });
-      
-      const statuses = await Promise.all(statusPromises);
+      // One batch request for the newest approved drives (as many as the drives list shows)
+      const res = await api.get('/admin/drives/exam-status?limit=500');
       const statusMap = {};
       const timeMap = {};
       
-      statuses.forEach(({ driveId, status }) => {
+      (res.data || []).forEach((status) => {
+        const driveId = status.drive_id;
         statusMap[driveId] = status;
         // Initialize client-side countdown with server time
         if (status && status.time_remaining) {
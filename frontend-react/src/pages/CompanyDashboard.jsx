@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { toast } from 'react-toastify';
 import api from '../lib/api';
+import { subscribeDriveEvents, examStatusFromEvent } from '../lib/driveEvents';
 import { useAuth } from '../contexts/AuthContext';
 
 // Main component for the Company Dashboard
@@ -42,13 +43,44 @@ const CompanyDashboard = () => {
     loadDashboardData();
     loadDrives();
     loadExamStatuses();
-    
-    // Refresh exam statuses every 15 seconds to check for auto-start/end
-    const interval = setInterval(() => {
+  }, []);
+
+  // Live drive status updates pushed by the server (replaces polling)
+  useEffect(() => {
+    const reloadAll = () => {
+      loadDashboardData();
+      loadDrives();
       loadExamStatuses();
-    }, 15000);
-    
-    return () => clearInterval(interval);
+    };
+
+    return subscribeDriveEvents('/company/events', {
+      onDrive: (event) => {
+        const examTransitions = ['started', 'ended', 'auto_started', 'auto_ended'];
+        if (!examTransitions.includes(event.reason)) {
+          // Created, approved, submitted, ... : the drive list itself changed
+          reloadAll();
+          return;
+        }
+        setDrives((prev) =>
+          prev.map((d) =>
+            d.id === event.drive_id
+              ? { ...d, status: event.status, actual_start: event.actual_start, actual_end: event.actual_end }
+              : d
+          )
+        );
+        setExamStatuses((prev) => ({
+          ...prev,
+          [event.drive_id]: { ...prev[event.drive_id], ...examStatusFromEvent(event) },
+        }));
+        setClientTimeRemaining((prev) => ({
+          ...prev,
+          [event.drive_id]: event.time_remaining || 0,
+        }));
+        loadDashboardData();
+      },
+      onDeleted: reloadAll,
+      onResync: reloadAll,
+    });
   }, []);
 
   const loadDashboardData = async () => {
@@ -145,26 +177,13 @@ const CompanyDashboard = () => {
 
   const loadExamStatuses = async () => {
     try {
-      const response = await api.get('/company/drives');
-      const drivesData = response.data;
-      
-      // Load exam status for approved drives
-      const statusPromises = drivesData
-        .filter(d => d.is_approved)
-        .map(async (drive) => {
-          try {
-            const statusRes = await api.get(`/company/drives/${drive.id}/exam-status`);
-            return { driveId: drive.id, status: statusRes.data };
-          } catch (error) {
-            return { driveId: drive.id, status: null };
-          }
-        });
-      
-      const statuses = await Promise.all(statusPromises);
+      // One batch request for all of the company's drives
+      const response = await api.get('/company/drives/exam-status');
       const statusMap = {};
       const timeMap = {};
       
-      statuses.forEach(({ driveId, status }) => {
+      (response.data || []).forEach((status) => {
+        const driveId = status.drive_id;
         statusMap[driveId] = status;
         // Initialize client-side countdown with server time
         if (status && status.time_remaining) {
@@ -3,6 +3,7 @@ import { useNavigate, useSearchParams } from 'react-router-dom';
 import { toast } from 'react-toastify';
 import { useAuth } from '../contexts/AuthContext';
 import api from '../lib/api';
+import { subscribeDriveEvents } from '../lib/driveEvents';
 
 export default function CompanyDriveDetail() {
   const navigate = useNavigate();
@@ -26,13 +27,23 @@ export default function CompanyDriveDetail() {
       return;
     }
     loadDriveData();
-    
-    // Poll exam status every 30 seconds to check for auto-end
-    const intervalId = setInterval(() => {
-      loadExamStatus();
-    }, 30000);
-    
-    return () => clearInterval(intervalId);
+
+    // Server pushes status changes for this company's drives (replaces polling)
+    return subscribeDriveEvents('/company/events', {
+      onDrive: (event) => {
+        if (String(event.drive_id) !== String(driveId)) return;
+        if (event.reason === 'auto_ended') {
+          toast.info('Exam has automatically ended after duration elapsed');
+        } else if (event.reason === 'auto_started') {
+          toast.info('Exam has started as scheduled');
+        }
+        loadDriveData();
+      },
+      onDeleted: (event) => {
+        if (String(event.drive_id) === String(driveId)) navigate('/company-dashboard');
+      },
+      onResync: () => loadDriveData(),
+    });
   }, [driveId]);
 
   const loadDriveData = async () => {
@@ -65,21 +76,6 @@ export default function CompanyDriveDetail() {
     }
   };
 
-  const loadExamStatus = async () => {
-    try {
-      const res = await api.get(`/company/drives/${driveId}/exam-status`);
-      setExamStatus(res.data);
-      
-      // If exam auto-ended, reload drive data to update status
-      if (res.data.should_auto_end) {
-        toast.info('Exam has automatically ended after duration elapsed');
-        loadDriveData();
-      }
-    } catch (err) {
-      console.error('Failed to load exam status:', err);
-    }
-  };
-
   const handleEndExam = async () => {
     if (
       !window.confirm(
@@ -121,10 +121,27 @@ export default function CompanySendEmails() {
     setIsSendingEmails(true);
     try {
       const res = await api.post(`/company/drives/${driveId}/email-students`);
-
-      toast.success(
-        `Emails sent successfully to ${res.data?.sent_count || 0} students!`
-      );
+      toast.info(`Sending emails to ${res.data?.total_students || 0} students...`);
+
+      // Emails are sent by a background job; poll it until it finishes
+      let job = res.data;
+      while (job.status === 'queued' || job.status === 'running') {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        const jobRes = await api.get(
+          `/company/drives/${driveId}/email-jobs/${job.job_id}`
+        );
+        job = jobRes.data;
+      }
+
+      if (job.status === 'failed') {
+        toast.error(job.error || 'Failed to send emails');
+      } else if (job.failed_count > 0) {
+        toast.warning(
+          `Emails sent to ${job.sent_count} students, ${job.failed_count} failed. Send again to retry failed students.`
+        );
+      } else {
+        toast.success(`Emails sent successfully to ${job.sent_count} students!`);
+      }
       // Reload data to update exam status
       await loadData();
     } catch (err) {
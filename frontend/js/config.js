@@ -46,6 +46,7 @@ const API_CONFIG = {
         COMPANY_EMAIL_TEMPLATE: '/api/company/email-template',
         COMPANY_EMAIL_PREVIEW: '/api/company/email-template/preview',
         COMPANY_SEND_EMAILS: (driveId) => `/api/company/drives/${driveId}/email-students`,
+        COMPANY_EMAIL_JOB: (driveId, jobId) => `/api/company/drives/${driveId}/email-jobs/${jobId}`,
         COMPANY_EMAIL_STATUS: (driveId) => `/api/company/drives/${driveId}/email-status`,
         
         // Reference Data